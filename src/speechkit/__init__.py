@@ -7,8 +7,18 @@ __author__ = 'Tikhon Petrishchev'
 __version__ = '2.2.3'
 
 from speechkit._auth import Session
-from speechkit._recognition.streaming_recognition import DataStreamingRecognition
+from speechkit._cache import RecognitionCache, SynthesisCache
+from speechkit._pcm import PcmPreprocessor
+from speechkit._probe import AudioInfo, probe_audio
+from speechkit._recognition.auto_recognition import recognize_auto
+from speechkit._recognition.async_recognition import AsyncShortAudioRecognition, AsyncRecognitionLongAudio
+from speechkit._recognition.streaming_recognition import (
+    DataStreamingRecognition, AsyncDataStreamingRecognition, ChannelPool
+)
 from speechkit._recognition.sync_recognition import ShortAudioRecognition, RecognitionLongAudio
-from speechkit._synthesis import SpeechSynthesis
+from speechkit._synthesis import SpeechSynthesis, AsyncSpeechSynthesis
 
-__all__ = ['Session', 'SpeechSynthesis', 'ShortAudioRecognition', 'RecognitionLongAudio', 'DataStreamingRecognition']
+__all__ = ['Session', 'SpeechSynthesis', 'ShortAudioRecognition', 'RecognitionLongAudio', 'DataStreamingRecognition',
+           'AsyncSpeechSynthesis', 'AsyncShortAudioRecognition', 'AsyncRecognitionLongAudio',
+           'AsyncDataStreamingRecognition', 'ChannelPool', 'SynthesisCache', 'PcmPreprocessor',
+           'AudioInfo', 'probe_audio', 'recognize_auto', 'RecognitionCache']
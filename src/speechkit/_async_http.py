@@ -0,0 +1,59 @@
+class AsyncHttpTransport:
+    """
+    Pooled keep-alive HTTP transport for asyncio clients, built on `aiohttp`. All requests share one
+    connection pool, so many concurrent requests need neither threads nor new handshakes.
+
+    Underlying :py:class:`aiohttp.ClientSession` is created on first request, inside running event loop,
+    and is bound to that loop.
+    """
+
+    def __init__(self, limit_per_host=10, limit=100):
+        """
+        Initialize :py:class:`speechkit._async_http.AsyncHttpTransport`
+
+        :param integer limit_per_host: Maximum number of simultaneous connections per host. Default 10
+        :param integer limit: Maximum number of simultaneous connections in total. Default 100
+        """
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            raise ImportError("`aiohttp` is required for asyncio clients, install it with "
+                              "`pip install speechkit[async]`.")
+
+        self._limit_per_host = limit_per_host
+        self._limit = limit
+        self._client_session = None
+
+    def _get_client_session(self):
+        """Creates :py:class:`aiohttp.ClientSession` on first use"""
+
+        if self._client_session is None or self._client_session.closed:
+            import aiohttp
+
+            connector = aiohttp.TCPConnector(limit=self._limit, limit_per_host=self._limit_per_host)
+            self._client_session = aiohttp.ClientSession(connector=connector)
+        return self._client_session
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends request, same arguments as :py:meth:`aiohttp.ClientSession.request`.
+        Use result as `async with transport.request(...) as answer:`.
+        """
+        return self._get_client_session().request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Sends GET request"""
+
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Sends POST request"""
+
+        return self.request('POST', url, **kwargs)
+
+    async def close(self):
+        """Closes all pooled connections."""
+
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
@@ -1,24 +1,21 @@
+import calendar
+import logging
+import re
+import threading
 import time
 import uuid
 
 import jwt
-import requests
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 
+from speechkit._async_http import AsyncHttpTransport
+from speechkit._http import HttpTransport, get_default_transport
 from speechkit.exceptions import RequestError
 
 
-def generate_jwt(service_account_id, key_id, private_key, exp_time=360):
-    """
-    Generating JWT token for authorisation
+def _validate_jwt_params(service_account_id, key_id, private_key, exp_time):
+    """Checks :py:meth:`speechkit.auth.generate_jwt` params, raises ValueError"""
 
-    :param string service_account_id: The ID of the service account whose key the JWT is signed with.
-    :param string key_id: The ID of the Key resource belonging to the service account.
-    :param bytes private_key: Private key given from Yandex Cloud console in bytes
-    :param integer exp_time: Optional. The token expiration time delta in seconds. The expiration
-        time must not exceed the issue time by more than one hour, meaning exp_time ≤ 3600. Default 360
-    :return: JWT token
-    :rtype: string
-    """
     if not isinstance(service_account_id, str) or not isinstance(key_id, str):
         raise ValueError("service_account_id, key_id, must be strings.")
     if 0 in (len(service_account_id), len(key_id)):
@@ -30,6 +27,14 @@ def generate_jwt(service_account_id, key_id, private_key, exp_time=360):
     if exp_time > 3600:
         raise ValueError("exp_time ≤ 3600, but got {}".format(exp_time))
 
+
+def _encode_jwt(service_account_id, key_id, private_key, exp_time):
+    """
+    Signs JWT payload with PS256
+
+    :param private_key: PEM bytes or already loaded private key object
+    :return: tuple (jwt, exp), where exp is unix timestamp of expiration
+    """
     now = int(time.time())
     payload = {
         'aud': 'https://iam.api.cloud.yandex.net/iam/v1/tokens',
@@ -37,24 +42,110 @@ def generate_jwt(service_account_id, key_id, private_key, exp_time=360):
         'iat': now,
         'exp': now + exp_time
     }
-    return jwt.encode(
+    token = jwt.encode(
         payload,
         private_key,
         algorithm='PS256',
         headers={'kid': key_id}
     )
+    return token, payload['exp']
 
 
-def get_iam_token(yandex_passport_oauth_token=None, jwt_token=None):
+def generate_jwt(service_account_id, key_id, private_key, exp_time=360):
     """
-    Creates an IAM token for the specified identity.
-    `Getting IAM for Yandex account <https://cloud.yandex.com/en/docs/iam/operations/iam-token/create>`_
+    Generating JWT token for authorisation
 
-    :param string yandex_passport_oauth_token: OAuth token from Yandex OAuth
-    :param string jwt_token: Json Web Token, can be generated by :py:meth:`speechkit.generate_jwt`
-    :return: IAM token
+    :param string service_account_id: The ID of the service account whose key the JWT is signed with.
+    :param string key_id: The ID of the Key resource belonging to the service account.
+    :param bytes private_key: Private key given from Yandex Cloud console in bytes
+    :param integer exp_time: Optional. The token expiration time delta in seconds. The expiration
+        time must not exceed the issue time by more than one hour, meaning exp_time ≤ 3600. Default 360
+    :return: JWT token
     :rtype: string
     """
+    _validate_jwt_params(service_account_id, key_id, private_key, exp_time)
+    return _encode_jwt(service_account_id, key_id, private_key, exp_time)[0]
+
+
+class JwtSigner:
+    """
+    Generates JWT for service account key like :py:meth:`speechkit.auth.generate_jwt`, but parses the private
+    key once and reuses signed JWT until shortly before its expiration.
+
+    :Example:
+
+    >>> signer = JwtSigner('<service_account_id>', '<key_id>', private_key)
+    >>> iam_token = get_iam_token(jwt_token=signer.get_jwt())
+    >>> signer.hits, signer.misses
+    (0, 1)
+    """
+
+    def __init__(self, service_account_id, key_id, private_key, exp_time=360, reuse_margin=60):
+        """
+        Loads private key
+
+        :param string service_account_id: The ID of the service account whose key the JWT is signed with.
+        :param string key_id: The ID of the Key resource belonging to the service account.
+        :param bytes private_key: Private key given from Yandex Cloud console in bytes
+        :param integer exp_time: Optional. The token expiration time delta in seconds, exp_time ≤ 3600. Default 360
+        :param integer reuse_margin: Signed JWT is not reused when less than `reuse_margin` seconds
+            left before expiration. Default 60
+        """
+        _validate_jwt_params(service_account_id, key_id, private_key, exp_time)
+        if not isinstance(reuse_margin, int) or not 0 <= reuse_margin < exp_time:
+            raise ValueError("reuse_margin must be int in range [0, exp_time), but got {}".format(reuse_margin))
+
+        self._service_account_id = service_account_id
+        self._key_id = key_id
+        self._private_key = load_pem_private_key(private_key, password=None)
+        self._exp_time = exp_time
+        self._reuse_margin = reuse_margin
+
+        self._lock = threading.Lock()
+        self._jwt = None
+        self._exp = 0
+        self._hits = 0
+        self._misses = 0
+
+    def get_jwt(self):
+        """
+        Returns cached JWT or signs new one
+
+        :return: JWT token
+        :rtype: string
+        """
+        with self._lock:
+            if self._jwt is not None and time.time() < self._exp - self._reuse_margin:
+                self._hits += 1
+                return self._jwt
+
+            self._misses += 1
+            self._jwt, self._exp = _encode_jwt(self._service_account_id, self._key_id, self._private_key,
+                                               self._exp_time)
+            return self._jwt
+
+    @property
+    def hits(self):
+        """Number of :py:meth:`JwtSigner.get_jwt` calls served with cached JWT"""
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of :py:meth:`JwtSigner.get_jwt` calls that signed new JWT"""
+
+        return self._misses
+
+
+def _create_iam_token(yandex_passport_oauth_token=None, jwt_token=None):
+    """
+    Requests IAM token for the specified identity.
+
+    :param string yandex_passport_oauth_token: OAuth token from Yandex OAuth
+    :param string jwt_token: Json Web Token
+    :return: Response data in format `{'iamToken': '...', 'expiresAt': '...'}`
+    :rtype: dict
+    """
     if not type(yandex_passport_oauth_token) in (str, type(None)):
         raise TypeError("__init__() yandex_passport_oauth_token: got {} but expected \
                         type is str or None".format(type(yandex_passport_oauth_token).__name__))
@@ -72,12 +163,26 @@ def get_iam_token(yandex_passport_oauth_token=None, jwt_token=None):
         data = {'jwt': str(jwt_token)}
 
     url = "https://iam.api.cloud.yandex.net/iam/v1/tokens"
-    answer = requests.post(url, json=data)
+    answer = get_default_transport().post(url, json=data)
 
     if answer.ok:
-        return answer.json().get('iamToken')
+        return answer.json()
     else:
-        raise RequestError(answer.json())
+        raise RequestError(answer.json(), status_code=answer.status_code)
+
+
+def get_iam_token(yandex_passport_oauth_token=None, jwt_token=None):
+    """
+    Creates an IAM token for the specified identity.
+    `Getting IAM for Yandex account <https://cloud.yandex.com/en/docs/iam/operations/iam-token/create>`_
+
+    :param string yandex_passport_oauth_token: OAuth token from Yandex OAuth
+    :param string jwt_token: Json Web Token, can be generated by :py:meth:`speechkit.generate_jwt`
+    :return: IAM token
+    :rtype: string
+    """
+    return _create_iam_token(yandex_passport_oauth_token=yandex_passport_oauth_token,
+                             jwt_token=jwt_token).get('iamToken')
 
 
 def get_api_key(yandex_passport_oauth_token=None, service_account_id=None,
@@ -100,11 +205,141 @@ def get_api_key(yandex_passport_oauth_token=None, service_account_id=None,
     }
     data = {'serviceAccountId': service_account_id, 'description': description}
 
-    answer = requests.post(url, headers=headers, json=data)
+    answer = get_default_transport().post(url, headers=headers, json=data)
     if answer.ok:
         return answer.json().get('secret')
     else:
-        raise RequestError(answer.json())
+        raise RequestError(answer.json(), status_code=answer.status_code)
+
+
+_RFC3339 = re.compile(r'(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?(?:[Zz]|([+-])(\d\d):(\d\d))$')
+
+
+def _parse_expires_at(value):
+    """
+    Converts `expiresAt` RFC3339 string to unix timestamp, falls back to maximum IAM token lifetime.
+    Fraction may have nanosecond precision, so it is parsed by hand instead of `datetime.fromisoformat`.
+    """
+    match = _RFC3339.match(value) if isinstance(value, str) else None
+    if match is None:
+        return time.time() + IamTokenProvider.IAM_TOKEN_LIFETIME
+
+    timestamp = calendar.timegm(time.strptime(match.group(1), '%Y-%m-%dT%H:%M:%S')) + float(match.group(2) or 0)
+    if match.group(3):
+        offset = int(match.group(4)) * 3600 + int(match.group(5)) * 60
+        timestamp -= offset if match.group(3) == '+' else -offset
+    return timestamp
+
+
+class IamTokenProvider:
+    """
+    Keeps valid IAM token for :py:class:`speechkit.Session`, re-minting it in the background before it expires.
+
+    Token is requested once on init, after that a daemon thread refreshes it, so reading
+    :py:meth:`IamTokenProvider.token` never blocks on network.
+
+    :Example:
+
+    >>> provider = IamTokenProvider(yandex_passport_oauth_token='<oauth_token>')
+    >>> session = Session(Session.IAM_TOKEN, provider, '<folder_id>')
+    """
+
+    IAM_TOKEN_LIFETIME = 12 * 60 * 60
+    """Maximum IAM token lifetime in seconds, value: 43200"""
+
+    def __init__(self, yandex_passport_oauth_token=None, service_account_id=None, key_id=None, private_key=None,
+                 refresh_interval=3600, retry_interval=10):
+        """
+        Requests first IAM token and starts refreshing thread. Pass `yandex_passport_oauth_token` or
+        service account key (`service_account_id`, `key_id`, `private_key`), JWT is signed with
+        :py:class:`speechkit.auth.JwtSigner`.
+
+        :param string yandex_passport_oauth_token: OAuth token from Yandex OAuth
+        :param string service_account_id: The ID of the service account whose key the JWT is signed with.
+        :param string key_id: The ID of the Key resource belonging to the service account.
+        :param bytes private_key: Private key given from Yandex Cloud console in bytes
+        :param integer refresh_interval: Maximum time in seconds between token refreshes. Default 3600,
+            as recommended by Yandex Cloud.
+        :param integer retry_interval: Initial delay in seconds before retrying failed refresh,
+            doubled on every failure. Default 10
+        """
+        key_fields = (service_account_id, key_id, private_key)
+        if bool(yandex_passport_oauth_token) == any(key_fields):
+            raise ValueError("Includes only one of `yandex_passport_oauth_token` or service account key fields.")
+        if not yandex_passport_oauth_token and not all(key_fields):
+            raise ValueError("`service_account_id`, `key_id` and `private_key` required.")
+        if refresh_interval <= 0 or retry_interval <= 0:
+            raise ValueError("refresh_interval and retry_interval must be positive.")
+
+        self._yandex_passport_oauth_token = yandex_passport_oauth_token
+        self._jwt_signer = None if yandex_passport_oauth_token else JwtSigner(service_account_id, key_id, private_key)
+        self._refresh_interval = refresh_interval
+        self._retry_interval = retry_interval
+
+        self._token = None
+        self._expires_at = None
+        self.refresh()
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='speechkit-iam-token-refresh', daemon=True)
+        self._thread.start()
+
+    def _mint(self):
+        """Requests new IAM token, returns response data"""
+
+        if self._yandex_passport_oauth_token:
+            return _create_iam_token(yandex_passport_oauth_token=self._yandex_passport_oauth_token)
+
+        return _create_iam_token(jwt_token=self._jwt_signer.get_jwt())
+
+    def refresh(self):
+        """Synchronously requests new IAM token and replaces current one."""
+
+        data = self._mint()
+        token = data.get('iamToken')
+        if not token:
+            raise RequestError(data)
+
+        self._expires_at = _parse_expires_at(data.get('expiresAt'))
+        self._token = token
+
+    def _next_refresh_delay(self):
+        """Seconds until next refresh: refresh interval or half of remaining lifetime, whichever is less."""
+
+        return min(self._refresh_interval, max(0.0, (self._expires_at - time.time()) / 2))
+
+    def _run(self):
+        """Refreshing thread loop"""
+
+        retry_interval = self._retry_interval
+        delay = self._next_refresh_delay()
+        while not self._stop_event.wait(delay):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error("IAM token refresh failed: %s", e)
+                delay = retry_interval
+                retry_interval = min(retry_interval * 2, self._refresh_interval)
+            else:
+                delay = self._next_refresh_delay()
+                retry_interval = self._retry_interval
+
+    @property
+    def token(self):
+        """Current IAM token, never blocks"""
+
+        return self._token
+
+    @property
+    def expires_at(self):
+        """Unix timestamp when current token expires"""
+
+        return self._expires_at
+
+    def close(self):
+        """Stops refreshing thread."""
+
+        self._stop_event.set()
 
 
 class Session:
@@ -117,14 +352,15 @@ class Session:
     """Api key if api-key auth, value: 'api_key'"""
 
     def __init__(self, auth_type, credential, folder_id, x_client_request_id_header=False,
-                 x_data_logging_enabled=False):
+                 x_data_logging_enabled=False, pool_maxsize=10):
         """
         Stores credentials for given auth method
 
         :param string auth_type: Type of auth may be :py:meth:`Session.IAM_TOKEN` or :py:meth:`Session.API_KEY`
         :param string | None folder_id: Id of the folder that you have access to. Don't specify this field if
             you make a request on behalf of a service account.
-        :param string credential: Auth key iam or api key
+        :param string | IamTokenProvider credential: Auth key iam or api key. For `Session.IAM_TOKEN` may be
+            :py:class:`speechkit.auth.IamTokenProvider` instance, then token is refreshed automatically.
         :param boolean x_client_request_id_header: include x-client-request-id. `x-client-request-id` is a unique
             request ID. It is generated using uuid. Send this ID to the technical support team to help us find
             a specific request in the system and assist you. To get x_client_request_id_header use
@@ -133,6 +369,8 @@ class Session:
             By default, we do not save any audio or text that you send. If you pass the true value in this header,
             your data is saved. This data, along with the request ID, will help the Yandex technical support team solve
             your problem.
+        :param integer pool_maxsize: Maximum number of kept-alive HTTP connections per host in session
+            connection pool. Default 10
         """
         if auth_type not in (self.IAM_TOKEN, self.API_KEY):
             raise ValueError(
@@ -141,7 +379,10 @@ class Session:
 
         self._auth_method = auth_type
 
-        if not isinstance(credential, str):
+        if isinstance(credential, IamTokenProvider):
+            if auth_type != self.IAM_TOKEN:
+                raise ValueError("IamTokenProvider can be used only with `Session.IAM_TOKEN` auth_type.")
+        elif not isinstance(credential, str):
             raise ValueError("_credential must be string, but got {}".format(type(credential)))
 
         self._credential = credential
@@ -150,8 +391,13 @@ class Session:
         self._x_client_request_id = str(uuid.uuid4()) if x_client_request_id_header else None
         self._x_data_logging_enabled = x_data_logging_enabled
 
+        self._pool_maxsize = pool_maxsize
+        self._transport = HttpTransport(pool_maxsize=pool_maxsize)
+        self._async_transport = None
+
     @classmethod
-    def from_api_key(cls, api_key, folder_id=None, x_client_request_id_header=False, x_data_logging_enabled=False):
+    def from_api_key(cls, api_key, folder_id=None, x_client_request_id_header=False, x_data_logging_enabled=False,
+                     pool_maxsize=10):
         """
         Creates session from api key
 
@@ -166,6 +412,8 @@ class Session:
             By default, we do not save any audio or text that you send. If you pass the true value in this header,
             your data is saved. This data, along with the request ID, will help the Yandex technical support team solve
             your problem.
+        :param integer pool_maxsize: Maximum number of kept-alive HTTP connections per host in session
+            connection pool. Default 10
         :return: Session instance
         :rtype: Session
         """
@@ -181,11 +429,11 @@ class Session:
                 raise ValueError("folder_id must not be empty.")
 
         return cls(cls.API_KEY, api_key, folder_id=folder_id, x_client_request_id_header=x_client_request_id_header,
-                   x_data_logging_enabled=x_data_logging_enabled)
+                   x_data_logging_enabled=x_data_logging_enabled, pool_maxsize=pool_maxsize)
 
     @classmethod
     def from_yandex_passport_oauth_token(cls, yandex_passport_oauth_token, folder_id, x_client_request_id_header=False,
-                                         x_data_logging_enabled=False):
+                                         x_data_logging_enabled=False, auto_refresh=False, pool_maxsize=10):
         """
         Creates Session from oauth token Yandex account
 
@@ -200,6 +448,10 @@ class Session:
             By default, we do not save any audio or text that you send. If you pass the true value in this header,
             your data is saved. This data, along with the request ID, will help the Yandex technical support team solve
             your problem.
+        :param boolean auto_refresh: Re-mint IAM token in the background before it expires,
+            see :py:class:`speechkit.auth.IamTokenProvider`. Useful for long-running processes.
+        :param integer pool_maxsize: Maximum number of kept-alive HTTP connections per host in session
+            connection pool. Default 10
         :return: Session instance
         :rtype: Session
         """
@@ -215,13 +467,17 @@ class Session:
         if len(folder_id) == 0:
             raise ValueError("folder_id must not be empty.")
 
-        iam_token = get_iam_token(yandex_passport_oauth_token=yandex_passport_oauth_token)
+        if auto_refresh:
+            iam_token = IamTokenProvider(yandex_passport_oauth_token=yandex_passport_oauth_token)
+        else:
+            iam_token = get_iam_token(yandex_passport_oauth_token=yandex_passport_oauth_token)
 
         return cls(cls.IAM_TOKEN, iam_token, folder_id=folder_id, x_client_request_id_header=x_client_request_id_header,
-                   x_data_logging_enabled=x_data_logging_enabled)
+                   x_data_logging_enabled=x_data_logging_enabled, pool_maxsize=pool_maxsize)
 
     @classmethod
-    def from_jwt(cls, jwt_token, folder_id=None, x_client_request_id_header=False, x_data_logging_enabled=False):
+    def from_jwt(cls, jwt_token, folder_id=None, x_client_request_id_header=False, x_data_logging_enabled=False,
+                 pool_maxsize=10):
         """
         Creates Session from JWT token
 
@@ -236,6 +492,8 @@ class Session:
             By default, we do not save any audio or text that you send. If you pass the true value in this header,
             your data is saved. This data, along with the request ID, will help the Yandex technical support team solve
             your problem.
+        :param integer pool_maxsize: Maximum number of kept-alive HTTP connections per host in session
+            connection pool. Default 10
         :return: Session instance
         :rtype: Session
         """
@@ -253,7 +511,50 @@ class Session:
         iam_token = get_iam_token(jwt_token=jwt_token)
 
         return cls(cls.IAM_TOKEN, iam_token, folder_id=folder_id, x_client_request_id_header=x_client_request_id_header,
-                   x_data_logging_enabled=x_data_logging_enabled)
+                   x_data_logging_enabled=x_data_logging_enabled, pool_maxsize=pool_maxsize)
+
+    @classmethod
+    def from_service_account_key(cls, service_account_id, key_id, private_key, folder_id=None,
+                                 x_client_request_id_header=False, x_data_logging_enabled=False, pool_maxsize=10):
+        """
+        Creates Session from service account authorized key. IAM token is re-minted in the background
+        before it expires, see :py:class:`speechkit.auth.IamTokenProvider`.
+
+        :param string service_account_id: The ID of the service account whose key the JWT is signed with.
+        :param string key_id: The ID of the Key resource belonging to the service account.
+        :param bytes private_key: Private key given from Yandex Cloud console in bytes
+        :param string | None folder_id: Id of the folder that you have access to. Don't specify this field if
+            you make a request on behalf of a service account.
+        :param boolean x_client_request_id_header: include x-client-request-id. `x-client-request-id` is a unique
+            request ID. It is generated using uuid. Send this ID to the technical support team to help us find
+            a specific request in the system and assist you. To get x_client_request_id_header use
+            `Session.get_x_client_request_id()` method.
+        :param boolean x_data_logging_enabled: A flag that allows data passed by the user in the request to be saved.
+            By default, we do not save any audio or text that you send. If you pass the true value in this header,
+            your data is saved. This data, along with the request ID, will help the Yandex technical support team solve
+            your problem.
+        :param integer pool_maxsize: Maximum number of kept-alive HTTP connections per host in session
+            connection pool. Default 10
+        :return: Session instance
+        :rtype: Session
+        """
+        if folder_id:
+            if not isinstance(folder_id, str):
+                raise ValueError("folder_id must be string, but got {}".format(type(folder_id)))
+            if len(folder_id) == 0:
+                raise ValueError("folder_id must not be empty.")
+
+        provider = IamTokenProvider(service_account_id=service_account_id, key_id=key_id, private_key=private_key)
+
+        return cls(cls.IAM_TOKEN, provider, folder_id=folder_id, x_client_request_id_header=x_client_request_id_header,
+                   x_data_logging_enabled=x_data_logging_enabled, pool_maxsize=pool_maxsize)
+
+    def _get_credential(self):
+        """Current iam token or api key"""
+
+        if isinstance(self._credential, IamTokenProvider):
+            return self._credential.token
+        return self._credential
 
     @property
     def header(self):
@@ -264,9 +565,9 @@ class Session:
         :rtype: dict
         """
         if self._auth_method == self.IAM_TOKEN:
-            h = {'Authorization': 'Bearer {iam}'.format(iam=self._credential)}
+            h = {'Authorization': 'Bearer {iam}'.format(iam=self._get_credential())}
         elif self._auth_method == self.API_KEY:
-            h = {'Authorization': 'Api-Key {api_key}'.format(api_key=self._credential)}
+            h = {'Authorization': 'Api-Key {api_key}'.format(api_key=self._get_credential())}
         else:
             return
         if self._x_client_request_id is not None:
@@ -285,9 +586,9 @@ class Session:
         """
 
         if self._auth_method == self.IAM_TOKEN:
-            h = tuple(('authorization', 'Bearer {iam}'.format(iam=self._credential),))
+            h = tuple(('authorization', 'Bearer {iam}'.format(iam=self._get_credential()),))
         elif self._auth_method == self.API_KEY:
-            h = tuple(('authorization', 'Api-Key {api_key}'.format(api_key=self._credential),))
+            h = tuple(('authorization', 'Api-Key {api_key}'.format(api_key=self._get_credential()),))
         else:
             return
 
@@ -307,3 +608,50 @@ class Session:
         """Get generated x_client_request_id value, if enabled on init, else `None`"""
 
         return self._x_client_request_id
+
+    @property
+    def transport(self):
+        """
+        Pooled keep-alive HTTP transport shared by all clients created with this session.
+
+        :rtype: speechkit._http.HttpTransport
+        """
+        return self._transport
+
+    @property
+    def async_transport(self):
+        """
+        Pooled keep-alive HTTP transport shared by all asyncio clients created with this session.
+        Created on first access, requires `aiohttp`.
+
+        :rtype: speechkit._async_http.AsyncHttpTransport
+        """
+        if self._async_transport is None:
+            self._async_transport = AsyncHttpTransport(limit_per_host=self._pool_maxsize)
+        return self._async_transport
+
+    async def aclose(self):
+        """Same as :py:meth:`Session.close`, also closes asyncio pooled connections."""
+
+        self.close()
+        if self._async_transport is not None:
+            await self._async_transport.close()
+
+    def close(self):
+        """Stops background IAM token refreshing if enabled and closes pooled connections."""
+
+        if isinstance(self._credential, IamTokenProvider):
+            self._credential.close()
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
@@ -0,0 +1,113 @@
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+BatchResult = collections.namedtuple('BatchResult', ['index', 'request', 'data', 'error'])
+BatchResult.__doc__ = """
+Result of one batch item: position in input, request, result data and exception.
+Exactly one of `data` and `error` is set.
+"""
+
+
+def _call(func, request):
+    """Calls func with request kwargs, returns (data, error)"""
+
+    try:
+        return func(**request), None
+    except Exception as e:
+        return None, e
+
+
+def iter_bounded(func, requests, max_workers=8, ordered=True):
+    """
+    Calls `func(**request)` for every request on a thread pool. At most `2 * max_workers` requests are taken from
+    input ahead of output, so input may be a lazy iterable of any length. Exceptions are returned in results,
+    one failed request doesn't stop others.
+
+    :param callable func: Function to call
+    :param iterable requests: Iterable of kwargs dicts
+    :param integer max_workers: Maximum number of concurrent calls
+    :param boolean ordered: Yield results in input order if True, in completion order otherwise
+    :return: Yields results
+    :rtype: BatchResult
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be positive int, but got {}".format(max_workers))
+
+    requests = enumerate(requests)
+    window = 2 * max_workers
+    pending = collections.OrderedDict()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def fill():
+            while len(pending) < window:
+                try:
+                    index, request = next(requests)
+                except StopIteration:
+                    return
+                pending[executor.submit(_call, func, request)] = (index, request)
+
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    done = [next(iter(pending))]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, request = pending.pop(future)
+                    data, error = future.result()
+                    fill()
+                    yield BatchResult(index, request, data, error)
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def _acall(func, request):
+    """Awaits func with request kwargs, returns (data, error)"""
+
+    try:
+        return await func(**request), None
+    except Exception as e:
+        return None, e
+
+
+async def aiter_bounded(func, requests, max_workers=8, ordered=True):
+    """
+    asyncio version of :py:func:`speechkit._batch.iter_bounded`, `func` is a coroutine function and
+    `max_workers` limits number of concurrent coroutines.
+
+    :return: Yields results
+    :rtype: BatchResult
+    """
+    if not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("max_workers must be positive int, but got {}".format(max_workers))
+
+    requests = enumerate(requests)
+    pending = collections.OrderedDict()
+
+    def fill():
+        while len(pending) < max_workers:
+            try:
+                index, request = next(requests)
+            except StopIteration:
+                return
+            pending[asyncio.ensure_future(_acall(func, request))] = (index, request)
+
+    try:
+        fill()
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+                await asyncio.wait(done)
+            else:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, request = pending.pop(task)
+                data, error = task.result()
+                fill()
+                yield BatchResult(index, request, data, error)
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,425 @@
+import collections
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+
+
+class _MemoryLru:
+    """In-memory LRU of bytes values limited by total size of values"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        """Stores value, returns number of evicted items"""
+
+        if key in self._items:
+            self.size -= len(self._items.pop(key))
+        if len(data) > self.max_bytes:
+            return 0
+
+        self._items[key] = data
+        self.size += len(data)
+        evicted = 0
+        while self.size > self.max_bytes:
+            _, old = self._items.popitem(last=False)
+            self.size -= len(old)
+            evicted += 1
+        return evicted
+
+    def remove(self, key):
+        if key in self._items:
+            self.size -= len(self._items.pop(key))
+
+    def clear(self):
+        self._items.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+class _DiskLru:
+    """
+    LRU of files in directory limited by total size of files. Existing files are picked up on start
+    in modification time order, access time is tracked with modification time so order survives restarts.
+    Index methods are called under lock of the owner, file methods are called without it, so lookups in memory
+    tier don't wait for disk I/O.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = collections.OrderedDict()
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and not entry.name.startswith('.'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._items[name] = size
+            self.size += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def touch(self, key):
+        """Marks key as recently used, returns False if it is not stored"""
+
+        if key not in self._items:
+            return False
+        self._items.move_to_end(key)
+        return True
+
+    def add(self, key, size):
+        """Adds written file to index, returns keys evicted from index, their files must be unlinked"""
+
+        self.discard(key)
+        self._items[key] = size
+        self.size += size
+        evicted = []
+        while self.size > self.max_bytes:
+            old_key, old_size = self._items.popitem(last=False)
+            self.size -= old_size
+            evicted.append(old_key)
+        return evicted
+
+    def discard(self, key):
+        """Removes key from index, returns False if it was not stored"""
+
+        if key not in self._items:
+            return False
+        self.size -= self._items.pop(key)
+        return True
+
+    def drain(self):
+        """Removes all keys from index and returns them, their files must be unlinked"""
+
+        keys = list(self._items)
+        self._items.clear()
+        self.size = 0
+        return keys
+
+    def read(self, key):
+        """Reads file and updates its modification time, returns None if file is gone"""
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            return None
+        return data
+
+    def write(self, key, data):
+        """Writes file with atomic rename, readers see either old or new content"""
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def unlink(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self._items)
+
+
+class _TieredCache:
+    """
+    Two-level LRU cache of bytes: memory tier in front of optional disk tier. Safe to share between threads,
+    lock is held only for index updates, files are read and written outside it.
+    """
+
+    def __init__(self, max_memory_bytes=64 * 1024 * 1024, directory=None, max_disk_bytes=1024 * 1024 * 1024):
+        """
+        :param integer max_memory_bytes: Size limit of in-memory tier in bytes, 0 disables it. Default 64 MiB
+        :param string directory: Directory for on-disk tier, disk tier is disabled if not set
+        :param integer max_disk_bytes: Size limit of on-disk tier in bytes. Default 1 GiB
+        """
+        if max_memory_bytes < 0 or max_disk_bytes < 0:
+            raise ValueError("Cache size limits must be non-negative.")
+
+        self._memory = _MemoryLru(max_memory_bytes)
+        self._disk = _DiskLru(directory, max_disk_bytes) if directory is not None else None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def hits(self):
+        """Number of lookups served from cache"""
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of lookups not found in cache"""
+
+        return self._misses
+
+    @property
+    def evictions(self):
+        """Number of values evicted from memory and disk tiers to stay in size limits"""
+
+        return self._evictions
+
+    def stats(self):
+        """
+        Cache counters and sizes
+
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'memory_items': len(self._memory),
+                'memory_bytes': self._memory.size,
+                'disk_items': len(self._disk) if self._disk is not None else 0,
+                'disk_bytes': self._disk.size if self._disk is not None else 0,
+            }
+
+    def get(self, key):
+        """
+        Looks value up in memory tier, then in disk tier. Values found on disk are promoted to memory.
+
+        :param string key: Cache key
+        :return: Cached value or None
+        :rtype: bytes | None
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._hits += 1
+                return data
+            if self._disk is None or not self._disk.touch(key):
+                self._misses += 1
+                return None
+
+        data = self._disk.read(key)
+
+        with self._lock:
+            if data is None:
+                # File was removed by eviction or from outside
+                self._disk.discard(key)
+                self._misses += 1
+            else:
+                self._evictions += self._memory.put(key, data)
+                self._hits += 1
+            return data
+
+    def put(self, key, data):
+        """
+        Stores value in both tiers
+
+        :param string key: Cache key
+        :param bytes data: Value
+        """
+        data = bytes(data)
+        with self._lock:
+            self._evictions += self._memory.put(key, data)
+        if self._disk is None:
+            return
+
+        if len(data) > self._disk.max_bytes:
+            with self._lock:
+                stored = self._disk.discard(key)
+            if stored:
+                self._disk.unlink(key)
+            return
+
+        self._disk.write(key, data)
+        with self._lock:
+            evicted = self._disk.add(key, len(data))
+            self._evictions += len(evicted)
+        for old_key in evicted:
+            self._disk.unlink(old_key)
+
+    def _expire(self, key):
+        """Removes expired value found by :py:meth:`get`, counts lookup as miss"""
+
+        with self._lock:
+            self._memory.remove(key)
+            stored = self._disk is not None and self._disk.discard(key)
+            self._hits -= 1
+            self._misses += 1
+        if stored:
+            self._disk.unlink(key)
+
+    def clear(self):
+        """Removes all values from both tiers, counters are kept"""
+
+        with self._lock:
+            self._memory.clear()
+            keys = self._disk.drain() if self._disk is not None else []
+        for key in keys:
+            self._disk.unlink(key)
+
+
+class SynthesisCache(_TieredCache):
+    """
+    Content-addressed cache of synthesized audio for :py:class:`speechkit.SpeechSynthesis`. Audio is stored under
+    SHA-256 of canonical request parameters, so same text with same voice, language, speed, emotion, format and
+    sample rate is synthesized only once. In-memory tier is backed by optional on-disk tier, both are limited in
+    size and evict least recently used audio.
+
+    :Example:
+
+    >>> cache = SynthesisCache(max_memory_bytes=32 * 1024 * 1024, directory='/var/cache/tts')
+    >>> synthesize_audio = SpeechSynthesis(session, cache=cache)
+    >>> cache.hits, cache.misses, cache.evictions
+    (0, 0, 0)
+    """
+
+    DEFAULTS = {
+        'lang': 'ru-RU',
+        'voice': 'oksana',
+        'speed': '1.0',
+        'emotion': 'neutral',
+        'format': 'oggopus',
+        'sampleRateHertz': '48000',
+    }
+    """Synthesis API parameter defaults, filled in before hashing so omitted and explicit defaults hit same entry"""
+
+    IGNORED_PARAMS = frozenset(['folderId'])
+    """Parameters that don't change audio and are not a part of the key"""
+
+    @classmethod
+    def make_key(cls, params):
+        """
+        Canonical key of synthesis request
+
+        :param dict params: Synthesis request parameters
+        :return: Hex SHA-256 digest
+        :rtype: string
+        """
+        canonical = dict(cls.DEFAULTS)
+        canonical.update((k, v) for k, v in params.items() if k not in cls.IGNORED_PARAMS and v is not None)
+        if canonical['format'] != 'lpcm':
+            canonical.pop('sampleRateHertz')
+        try:
+            canonical['speed'] = repr(float(canonical['speed']))
+        except (TypeError, ValueError):
+            pass
+        canonical = {k: str(v) for k, v in canonical.items()}
+
+        data = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class RecognitionCache(_TieredCache):
+    """
+    Cache of short audio recognition results for :py:class:`speechkit.ShortAudioRecognition`. Text is stored under
+    BLAKE2b hash of audio together with recognition parameters, so same clip recognized with same language, model,
+    format, sample rate and profanity filter is sent only once. In-memory tier is backed by optional on-disk tier,
+    both evict least recently used results, results older than `ttl` are not returned.
+
+    :Example:
+
+    >>> cache = RecognitionCache(ttl=24 * 3600, directory='/var/cache/stt')
+    >>> recognize_short_audio = ShortAudioRecognition(session, cache=cache)
+    """
+
+    DEFAULTS = {
+        'lang': 'ru-RU',
+        'topic': 'general',
+        'profanityFilter': 'false',
+        'format': 'oggopus',
+        'sampleRateHertz': '48000',
+    }
+    """Recognition API parameter defaults, filled in before hashing so omitted and explicit defaults hit same entry"""
+
+    IGNORED_PARAMS = frozenset(['folderId'])
+    """Parameters that don't change result and are not a part of the key"""
+
+    _EXPIRES = struct.Struct('<d')
+
+    def __init__(self, max_memory_bytes=16 * 1024 * 1024, directory=None, max_disk_bytes=256 * 1024 * 1024,
+                 ttl=None):
+        """
+        :param integer max_memory_bytes: Size limit of in-memory tier in bytes, 0 disables it. Default 16 MiB
+        :param string directory: Directory for on-disk tier, disk tier is disabled if not set
+        :param integer max_disk_bytes: Size limit of on-disk tier in bytes. Default 256 MiB
+        :param float ttl: Seconds result is valid, results never expire if not set
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive, but got {}".format(ttl))
+
+        super().__init__(max_memory_bytes, directory, max_disk_bytes)
+        self.ttl = ttl
+
+    @classmethod
+    def make_key(cls, data, params):
+        """
+        Key of recognition request
+
+        :param data: Audio as bytes-like object, hashed without copy
+        :param dict params: Recognition request parameters
+        :return: Hex BLAKE2b digest
+        :rtype: string
+        """
+        canonical = dict(cls.DEFAULTS)
+        canonical.update((k, v) for k, v in params.items() if k not in cls.IGNORED_PARAMS and v is not None)
+        if canonical['format'] != 'lpcm':
+            canonical.pop('sampleRateHertz')
+        canonical = {k: str(v).lower() if isinstance(v, bool) else str(v) for k, v in canonical.items()}
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Looks result up, expired results are removed
+
+        :param string key: Cache key
+        :return: Recognized text or None
+        :rtype: string | None
+        """
+        data = super().get(key)
+        if data is None:
+            return None
+
+        expires_at, = self._EXPIRES.unpack_from(data)
+        if expires_at and expires_at <= time.time():
+            self._expire(key)
+            return None
+        return data[self._EXPIRES.size:].decode('utf-8')
+
+    def put(self, key, text):
+        """
+        Stores result, expiration time is stored with it, so it survives restarts with disk tier
+
+        :param string key: Cache key
+        :param string text: Recognized text
+        """
+        expires_at = time.time() + self.ttl if self.ttl is not None else 0
+        super().put(key, self._EXPIRES.pack(expires_at) + text.encode('utf-8'))
@@ -0,0 +1,72 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpTransport:
+    """
+    Pooled keep-alive HTTP transport for Yandex Cloud REST API. Connections are reused between requests,
+    so only first request to each host pays TCP and TLS handshake. Safe to share between threads.
+    """
+
+    def __init__(self, pool_maxsize=10, pool_connections=10):
+        """
+        Initialize :py:class:`speechkit._http.HttpTransport`
+
+        :param integer pool_maxsize: Maximum number of kept-alive connections per host. Default 10
+        :param integer pool_connections: Number of hosts to keep connection pools for. Default 10
+        """
+        if not isinstance(pool_maxsize, int) or pool_maxsize < 1:
+            raise ValueError("pool_maxsize must be positive int, but got {}".format(pool_maxsize))
+
+        self._pool_maxsize = pool_maxsize
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    @property
+    def pool_maxsize(self):
+        """Maximum number of kept-alive connections per host"""
+
+        return self._pool_maxsize
+
+    def request(self, method, url, **kwargs):
+        """Sends request, same arguments as :py:meth:`requests.request`"""
+
+        return self._session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        """Sends GET request, same arguments as :py:meth:`requests.get`"""
+
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Sends POST request, same arguments as :py:meth:`requests.post`"""
+
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections."""
+
+        self._session.close()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """
+    Process-wide transport for requests made without :py:class:`speechkit.Session`, e.g. IAM token requests.
+
+    :rtype: HttpTransport
+    """
+    global _default_transport
+
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+    return _default_transport
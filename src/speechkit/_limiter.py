@@ -0,0 +1,123 @@
+import asyncio
+import random
+import threading
+
+from speechkit.exceptions import RequestError
+
+OVERLOAD_STATUS_CODES = (429, 503)
+"""HTTP statuses that mean service is overloaded and client should slow down"""
+
+
+def is_overloaded(error):
+    """
+    Checks if exception is overload response of API
+
+    :param Exception error: Exception raised by request
+    :rtype: boolean
+    """
+    return isinstance(error, RequestError) and error.status_code in OVERLOAD_STATUS_CODES
+
+
+def backoff_delay(attempt, base=0.5, cap=30):
+    """
+    Exponential backoff with jitter
+
+    :param integer attempt: Number of the failed attempt, starting from 0
+    :param float base: Delay after the first attempt in seconds. Default 0.5
+    :param float cap: Maximum delay in seconds. Default 30
+    :rtype: float
+    """
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease: limit grows by one after a limit's worth
+    of successful requests and is halved on overload. Requests that were already in flight when limit was halved
+    don't halve it again, so one burst of overload responses counts once. Safe to share between threads.
+    """
+
+    def __init__(self, max_limit, min_limit=1):
+        """
+        :param integer max_limit: Maximum number of concurrent requests, also initial limit
+        :param integer min_limit: Minimum number of concurrent requests. Default 1
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit, but got {} and {}".format(
+                min_limit, max_limit))
+
+        self._max_limit = max_limit
+        self._min_limit = min_limit
+        self._limit = float(max_limit)
+        self._active = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """Current number of allowed concurrent requests"""
+
+        return int(self._limit)
+
+    def _update(self, epoch, overloaded):
+        """Adjusts limit after request, must be called with lock held"""
+
+        self._active -= 1
+        if overloaded:
+            if epoch == self._epoch:
+                self._limit = max(self._min_limit, self._limit / 2)
+                self._epoch += 1
+        else:
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+
+    def acquire(self):
+        """
+        Waits for free slot
+
+        :return: Token to pass to :py:meth:`release`
+        """
+        with self._condition:
+            while self._active >= int(self._limit):
+                self._condition.wait()
+            self._active += 1
+            return self._epoch
+
+    def release(self, token, overloaded=False):
+        """
+        Frees slot and adjusts limit
+
+        :param token: Token returned by :py:meth:`acquire`
+        :param boolean overloaded: Request got overload response
+        """
+        with self._condition:
+            self._update(token, overloaded)
+            self._condition.notify_all()
+
+
+class AsyncAdaptiveLimiter(AdaptiveLimiter):
+    """asyncio version of :py:class:`speechkit._limiter.AdaptiveLimiter` for requests on one event loop"""
+
+    def __init__(self, max_limit, min_limit=1):
+        super().__init__(max_limit, min_limit)
+        self._condition = None
+
+    def _get_condition(self):
+        """Creates condition on first use, inside running event loop"""
+
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            while self._active >= int(self._limit):
+                await condition.wait()
+            self._active += 1
+            return self._epoch
+
+    async def release(self, token, overloaded=False):
+        condition = self._get_condition()
+        async with condition:
+            self._update(token, overloaded)
+            condition.notify_all()
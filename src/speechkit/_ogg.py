@@ -0,0 +1,188 @@
+"""Minimal Ogg Opus container utilities, audio is never decoded."""
+
+import struct
+import zlib
+
+_PAGE_HEADER = struct.Struct('<4sBBqIIIB')
+_CAPTURE_PATTERN = b'OggS'
+_FIRST_PAGE = 0x02
+_LAST_PAGE = 0x04
+_NO_GRANULE = -1
+_REVERSED_BITS = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+
+
+def _crc32(data):
+    """
+    Ogg CRC32: polynomial 0x04c11db7, no reflection, zero initial value and no final xor.
+    Calculated with :py:meth:`zlib.crc32` on bit-reversed bytes, zlib initial value and final xor
+    are cancelled by CRC of zeros of the same length.
+    """
+    data = bytes(data).translate(_REVERSED_BITS)
+    crc = zlib.crc32(data) ^ zlib.crc32(bytes(len(data)))
+    return int('{:032b}'.format(crc)[::-1], 2)
+
+
+class OggPage:
+    """One Ogg page, see `RFC 3533 <https://www.rfc-editor.org/rfc/rfc3533>`_"""
+
+    __slots__ = ('header_type', 'granule_position', 'serial', 'sequence', 'lacing', 'body')
+
+    def __init__(self, header_type, granule_position, serial, sequence, lacing, body):
+        self.header_type = header_type
+        self.granule_position = granule_position
+        self.serial = serial
+        self.sequence = sequence
+        self.lacing = lacing
+        self.body = body
+
+    def packets(self):
+        """
+        Yields packet fragments of the page
+
+        :return: tuple (fragment, complete), complete is False if packet continues on next page
+        """
+        offset = 0
+        start = 0
+        for value in self.lacing:
+            offset += value
+            if value < 255:
+                yield self.body[start:offset], True
+                start = offset
+        if self.lacing and self.lacing[-1] == 255:
+            yield self.body[start:], False
+
+    def to_bytes(self):
+        """Serializes page with recalculated CRC"""
+
+        header = _PAGE_HEADER.pack(_CAPTURE_PATTERN, 0, self.header_type, self.granule_position, self.serial,
+                                   self.sequence, 0, len(self.lacing))
+        page = bytearray(header)
+        page += bytes(self.lacing)
+        page += self.body
+        struct.pack_into('<I', page, 22, _crc32(page))
+        return bytes(page)
+
+
+def iter_pages(data):
+    """
+    Parses Ogg pages
+
+    :param bytes data: Ogg stream
+    :return: Yields pages
+    :rtype: OggPage
+    """
+    data = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        if len(data) - offset < _PAGE_HEADER.size:
+            raise ValueError("Truncated Ogg page header at {}".format(offset))
+        capture, version, header_type, granule, serial, sequence, _, segments = \
+            _PAGE_HEADER.unpack_from(data, offset)
+        if capture != _CAPTURE_PATTERN or version != 0:
+            raise ValueError("Invalid Ogg page at {}".format(offset))
+
+        offset += _PAGE_HEADER.size
+        lacing = bytes(data[offset:offset + segments])
+        offset += segments
+        size = sum(lacing)
+        if len(lacing) != segments or len(data) - offset < size:
+            raise ValueError("Truncated Ogg page at {}".format(offset))
+
+        yield OggPage(header_type, granule, serial, sequence, lacing, bytes(data[offset:offset + size]))
+        offset += size
+
+
+def opus_packet_samples(packet):
+    """
+    Number of 48 kHz samples in Opus packet, read from TOC byte, see
+    `RFC 6716 section 3.1 <https://www.rfc-editor.org/rfc/rfc6716#section-3.1>`_
+
+    :param bytes packet: Opus packet, at least first two bytes
+    :rtype: integer
+    """
+    if not packet:
+        return 0
+    config = packet[0] >> 3
+    if config < 12:
+        frame_size = (480, 960, 1920, 2880)[config % 4]
+    elif config < 16:
+        frame_size = (480, 960)[config % 2]
+    else:
+        frame_size = (120, 240, 480, 960)[config % 4]
+
+    code = packet[0] & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F if len(packet) > 1 else 0
+    return frames * frame_size
+
+
+def _split_headers(pages):
+    """Splits Opus stream pages to header pages (OpusHead and OpusTags) and audio pages"""
+
+    completed = 0
+    for i, page in enumerate(pages):
+        completed += sum(1 for _, complete in page.packets() if complete)
+        if completed >= 2:
+            return pages[:i + 1], pages[i + 1:]
+    raise ValueError("Ogg Opus stream has no OpusHead and OpusTags headers.")
+
+
+def concatenate_opus(streams):
+    """
+    Joins Ogg Opus streams into one logical stream: headers are taken from the first stream,
+    pages of the following streams are renumbered with the first stream serial number, granule positions
+    are recalculated from packet durations and CRC is updated. Streams must have same channel count.
+    Pre-skip of the following streams (few milliseconds of encoder delay) is played, end trimming is kept
+    only for the last stream.
+
+    :param list[bytes] streams: Ogg Opus streams
+    :return: Ogg Opus stream
+    :rtype: bytes
+    """
+    streams = [list(iter_pages(stream)) for stream in streams if stream]
+    if not streams:
+        return b''
+
+    headers, _ = _split_headers(streams[0])
+    serial = headers[0].serial
+    output = []
+    for page in headers:
+        page.header_type &= ~_LAST_PAGE
+        output.append(page)
+
+    samples = 0
+    trim = 0
+    for pages in streams:
+        _, audio_pages = _split_headers(pages)
+        original_granule = audio_pages[-1].granule_position if audio_pages else _NO_GRANULE
+        stream_samples = 0
+        packet_start = b''
+        for page in audio_pages:
+            completed = False
+            for fragment, complete in page.packets():
+                packet_start = (packet_start + fragment)[:2]
+                if complete:
+                    stream_samples += opus_packet_samples(packet_start)
+                    packet_start = b''
+                    completed = True
+
+            page.header_type &= ~(_FIRST_PAGE | _LAST_PAGE)
+            page.serial = serial
+            page.granule_position = samples + stream_samples if completed else _NO_GRANULE
+            output.append(page)
+
+        trim = max(0, stream_samples - original_granule) if original_granule != _NO_GRANULE else 0
+        samples += stream_samples
+
+    last = output[-1]
+    last.header_type |= _LAST_PAGE
+    if last.granule_position != _NO_GRANULE:
+        last.granule_position -= trim
+
+    for i, page in enumerate(output):
+        page.sequence = i
+    return b''.join(page.to_bytes() for page in output)
@@ -0,0 +1,524 @@
+"""Helpers for raw 16-bit little-endian mono PCM audio as returned by synthesis with `format='lpcm'`."""
+
+import bisect
+import copy
+import math
+import sys
+from array import array
+
+SILENCE_THRESHOLD = 64
+"""Absolute sample value treated as silence when trimming, about -54 dBFS"""
+
+
+def _import_numpy():
+    """Imports optional `numpy` dependency"""
+
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("`numpy` is required for array output, install it with `pip install speechkit[numpy]`.")
+    return numpy
+
+
+def _find_numpy():
+    """Returns `numpy` module if it is installed, None otherwise"""
+
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def to_array(data, dtype='int16'):
+    """
+    Converts PCM bytes to NumPy array. `int16` array is a read-only view over data without copy,
+    `float32` array is normalized to [-1.0, 1.0) in one vectorized pass.
+
+    :param bytes data: PCM audio
+    :param string dtype: `int16` or `float32`
+    :rtype: numpy.ndarray
+    """
+    np = _import_numpy()
+    if dtype not in ('int16', 'float32'):
+        raise ValueError("dtype must be 'int16' or 'float32', but got {}".format(dtype))
+
+    samples = np.frombuffer(data, dtype='<i2', count=len(data) // 2)
+    if dtype == 'int16':
+        return samples
+    return np.multiply(samples, np.float32(1 / 32768), dtype=np.float32)
+
+
+def _to_samples(data):
+    """Converts little-endian PCM bytes to array of int16 samples"""
+
+    samples = array('h')
+    samples.frombytes(bytes(data[:len(data) - len(data) % 2]))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples
+
+
+def _to_bytes(samples):
+    """Converts array of int16 samples to little-endian PCM bytes"""
+
+    if sys.byteorder == 'big':
+        samples = array('h', samples)
+        samples.byteswap()
+    return samples.tobytes()
+
+
+_SCAN_CHUNK = 1024
+
+
+def _is_loud(chunk, threshold):
+    return max(chunk) > threshold or min(chunk) < -threshold
+
+
+def _loud_bounds(samples, threshold):
+    """
+    Index of the first loud sample and index after the last one or None if all samples are silent.
+    Chunks are checked with C-level `max` and `min`, only chunks at bounds are scanned sample by sample.
+    """
+    first = next((offset for offset in range(0, len(samples), _SCAN_CHUNK)
+                  if _is_loud(samples[offset:offset + _SCAN_CHUNK], threshold)), None)
+    if first is None:
+        return None
+    last = next(offset for offset in range((len(samples) - 1) // _SCAN_CHUNK * _SCAN_CHUNK, first - 1, -_SCAN_CHUNK)
+                if _is_loud(samples[offset:offset + _SCAN_CHUNK], threshold))
+
+    chunk = samples[first:first + _SCAN_CHUNK]
+    start = first + next(i for i, s in enumerate(chunk) if abs(s) > threshold)
+    chunk = samples[last:last + _SCAN_CHUNK]
+    end = last + len(chunk) - next(i for i, s in enumerate(reversed(chunk)) if abs(s) > threshold)
+    return start, end
+
+
+def _crossfade(tail, head):
+    """Linear crossfade of two sample arrays of equal length, vectorized if `numpy` is installed"""
+
+    overlap = len(tail)
+    np = _find_numpy()
+    if np is None:
+        return array('h', (int(round(t * (1 - w) + h * w)) for t, h, w in zip(
+            tail, head, ((i + 1) / (overlap + 1) for i in range(overlap)))))
+
+    weights = np.arange(1, overlap + 1) / (overlap + 1)
+    mixed = np.rint(np.frombuffer(tail, np.int16) * (1 - weights) + np.frombuffer(head, np.int16) * weights)
+    return array('h', mixed.astype(np.int16).tobytes())
+
+
+def trim_silence(data, sample_rate, pad_ms=30, threshold=SILENCE_THRESHOLD):
+    """
+    Removes leading and trailing silence, keeping `pad_ms` of it on both sides
+
+    :param bytes data: PCM audio
+    :param integer sample_rate: Sample rate in Hz
+    :param integer pad_ms: Milliseconds of silence to keep on both sides
+    :param integer threshold: Maximum absolute sample value of silence
+    :rtype: bytes
+    """
+    samples = _to_samples(data)
+    bounds = _loud_bounds(samples, threshold)
+    if bounds is None:
+        return b''
+
+    start, end = bounds
+    pad = sample_rate * pad_ms // 1000
+    return _to_bytes(samples[max(0, start - pad):min(len(samples), end + pad)])
+
+
+def splice(pieces, sample_rate, crossfade_ms=10):
+    """
+    Joins PCM pieces with linear crossfade of `crossfade_ms` between neighbours
+
+    :param list[bytes] pieces: PCM audio pieces
+    :param integer sample_rate: Sample rate in Hz
+    :param integer crossfade_ms: Crossfade duration in milliseconds, 0 for plain concatenation
+    :rtype: bytes
+    """
+    crossfade = sample_rate * crossfade_ms // 1000
+    output = array('h')
+    for piece in pieces:
+        samples = _to_samples(piece)
+        overlap = min(crossfade, len(output), len(samples))
+        if overlap:
+            output[-overlap:] = _crossfade(output[-overlap:], samples[:overlap])
+        output.extend(samples[overlap:])
+    return _to_bytes(output)
+
+
+def _frame_energy(samples, frame):
+    """Mean square sample value of every whole frame, computed in one vectorized pass"""
+
+    np = _import_numpy()
+    count = len(samples) // frame
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float32)
+    return np.einsum('ij,ij->i', frames, frames) / frame
+
+
+def _speech_threshold(energy):
+    """Energy threshold 10 dB above noise floor, but not higher than 20 dB below loud speech"""
+
+    np = _import_numpy()
+    floor, peak = np.percentile(energy, [10, 99])
+    return max(min(float(floor) * 10, float(peak) / 100), SILENCE_THRESHOLD ** 2)
+
+
+def _silent_runs(voiced):
+    """Start and end frame indices of runs of silent frames"""
+
+    np = _import_numpy()
+    silent = np.concatenate(([0], (~voiced).astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(silent))
+    return edges[::2], edges[1::2]
+
+
+def _split_long(energy, start, end, max_frames):
+    """Splits frame range longer than max_frames at the quietest frame of the second half of each window"""
+
+    bounds = []
+    while end - start > max_frames:
+        low = start + max_frames // 2
+        cut = low + int(energy[low:start + max_frames].argmin())
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, end))
+    return bounds
+
+
+def vad_segments(data, sample_rate, max_seconds=30, max_bytes=1024 * 1024, frame_ms=20, min_silence_ms=300,
+                 threshold=None):
+    """
+    Splits PCM audio into speech segments at pauses with energy based voice activity detection, requires `numpy`.
+    Frame energies are computed in one vectorized pass. Audio is cut in the middle of pauses not shorter than
+    `min_silence_ms`, neighbouring pieces are merged while segment fits into `max_seconds` and `max_bytes`,
+    longer speech without pauses is cut at the quietest frame. Segments without speech are dropped.
+
+    :param bytes data: PCM audio
+    :param integer sample_rate: Sample rate in Hz
+    :param float max_seconds: Maximum segment duration. Default 30
+    :param integer max_bytes: Maximum segment size in bytes. Default 1 MiB
+    :param integer frame_ms: Analysis frame duration in milliseconds. Default 20
+    :param integer min_silence_ms: Minimum pause duration to cut at in milliseconds. Default 300
+    :param float threshold: Mean square sample value of speech frames. If not set it is 10 dB above noise floor,
+        but not higher than 20 dB below loud speech
+    :return: List of tuples (start, end) in samples
+    :rtype: list[tuple[integer, integer]]
+    """
+    np = _import_numpy()
+    samples = to_array(data)
+    frame = max(1, sample_rate * frame_ms // 1000)
+    max_frames = min(int(max_seconds * sample_rate), max_bytes // 2) // frame - 1
+    if max_frames < 1:
+        raise ValueError("Segment limits must be longer than two frames.")
+
+    count = len(samples) // frame
+    if count == 0:
+        return []
+
+    energy = _frame_energy(samples, frame)
+    voiced = energy > (_speech_threshold(energy) if threshold is None else threshold)
+    starts, ends = _silent_runs(voiced)
+    pauses = (ends - starts) * frame_ms >= min_silence_ms
+    cuts = ((starts[pauses] + ends[pauses]) // 2).tolist()
+    bounds = [0] + [cut for cut in cuts if 0 < cut < count] + [count]
+
+    pieces = []
+    for start, end in zip(bounds, bounds[1:]):
+        pieces.extend(_split_long(energy, start, end, max_frames))
+
+    segments = []
+    for start, end in pieces:
+        if segments and end - segments[-1][0] <= max_frames:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end])
+
+    result = []
+    for start, end in segments:
+        if voiced[start:end].any():
+            result.append((start * frame, len(samples) if end == count else end * frame))
+    return result
+
+
+class TimeMap:
+    """
+    Maps time in audio with removed pauses back to time in original audio
+
+    :Example:
+
+    >>> trimmed, time_map = trim_pauses(data, 16000)
+    >>> time_map.to_original(12.5)
+    21.74
+    """
+
+    def __init__(self, spans, sample_rate, original_samples):
+        """
+        :param list[tuple[integer, integer, integer]] spans: Kept parts of original audio as tuples
+            (original start, trimmed start, length) in samples, ordered by start
+        :param integer sample_rate: Sample rate in Hz
+        :param integer original_samples: Length of original audio in samples
+        """
+        self.spans = spans
+        self.sample_rate = sample_rate
+        self._original_samples = original_samples
+        self._starts = [trimmed_start for _, trimmed_start, _ in spans]
+
+    @property
+    def original_seconds(self):
+        """Duration of original audio"""
+
+        return self._original_samples / self.sample_rate
+
+    @property
+    def trimmed_seconds(self):
+        """Duration of audio with removed pauses"""
+
+        return sum(length for _, _, length in self.spans) / self.sample_rate
+
+    def to_original(self, seconds):
+        """
+        Converts time in trimmed audio to time in original audio
+
+        :param float seconds: Offset in trimmed audio
+        :rtype: float
+        """
+        if not self.spans:
+            return seconds
+        position = seconds * self.sample_rate
+        index = max(0, bisect.bisect_right(self._starts, position) - 1)
+        original_start, trimmed_start, _ = self.spans[index]
+        return (original_start + position - trimmed_start) / self.sample_rate
+
+
+def pause_map(data, sample_rate, min_silence_ms=1000, keep_ms=250, frame_ms=20, threshold=None):
+    """
+    Finds pauses in PCM audio with energy based voice activity detection, requires `numpy`. Frame energies are
+    computed in one vectorized pass. Pauses not shorter than `min_silence_ms` are removed except `keep_ms` next to
+    speech, leading and trailing silence is removed the same way.
+
+    :param bytes data: PCM audio
+    :param integer sample_rate: Sample rate in Hz
+    :param integer min_silence_ms: Minimum pause duration to remove in milliseconds. Default 1000
+    :param integer keep_ms: Milliseconds of pause to keep next to speech. Default 250
+    :param integer frame_ms: Analysis frame duration in milliseconds. Default 20
+    :param float threshold: Mean square sample value of speech frames, same default as in
+        :py:func:`speechkit._pcm.vad_segments`
+    :return: Map of kept parts of audio
+    :rtype: TimeMap
+    """
+    samples = to_array(data)
+    frame = max(1, sample_rate * frame_ms // 1000)
+    keep = sample_rate * keep_ms // 1000
+    if min_silence_ms <= 2 * keep_ms:
+        raise ValueError("min_silence_ms must be longer than two keep_ms.")
+
+    spans = []
+    count = len(samples) // frame
+    if count == 0:
+        return TimeMap(spans, sample_rate, len(samples))
+
+    energy = _frame_energy(samples, frame)
+    voiced = energy > (_speech_threshold(energy) if threshold is None else threshold)
+    if not voiced.any():
+        return TimeMap(spans, sample_rate, len(samples))
+
+    starts, ends = _silent_runs(voiced)
+    pauses = (ends - starts) * frame_ms >= min_silence_ms
+    position, trimmed = 0, 0
+    for start, end in zip((starts[pauses] * frame).tolist(), (ends[pauses] * frame).tolist()):
+        cut_start = start if start == 0 else start + keep
+        cut_end = len(samples) if end == count * frame else end - keep
+        if cut_start > position:
+            spans.append((position, trimmed, cut_start - position))
+            trimmed += cut_start - position
+        position = cut_end
+    if position < len(samples):
+        spans.append((position, trimmed, len(samples) - position))
+    return TimeMap(spans, sample_rate, len(samples))
+
+
+def trim_pauses(data, sample_rate, **kwargs):
+    """
+    Removes long pauses from PCM audio, accepts same params as :py:func:`speechkit._pcm.pause_map`
+
+    :param bytes data: PCM audio
+    :param integer sample_rate: Sample rate in Hz
+    :return: Tuple (audio without pauses, map of kept parts)
+    :rtype: tuple[bytes, TimeMap]
+    """
+    time_map = pause_map(data, sample_rate, **kwargs)
+    view = memoryview(data).cast('B')
+    return b''.join(view[start * 2:(start + length) * 2] for start, _, length in time_map.spans), time_map
+
+
+class PcmPreprocessor:
+    """
+    Converts 16-bit little-endian PCM audio to mono with target sample rate before upload, requires `numpy`.
+    Channels are averaged and audio is resampled with polyphase windowed-sinc filter, both vectorized.
+    Works on whole audio with :py:meth:`process` or on stream of chunks with :py:meth:`feed` and :py:meth:`flush`,
+    chunks may be of any size.
+
+    :Example:
+
+    >>> preprocessor = PcmPreprocessor(48000, channels=2, target_rate=16000)
+    >>> text = recognize_short_audio.recognize(stereo_48k, format='lpcm', preprocessor=preprocessor)
+    """
+
+    def __init__(self, sample_rate, channels=1, target_rate=16000, taps_per_phase=32):
+        """
+        Initialize :py:class:`speechkit.PcmPreprocessor`
+
+        :param integer sample_rate: Sample rate of input audio in Hz
+        :param integer channels: Number of interleaved channels of input audio. Default 1
+        :param integer target_rate: Sample rate of output audio in Hz. Default 16000
+        :param integer taps_per_phase: Filter length per polyphase branch, longer filter is sharper and slower.
+            Default 32
+        """
+        np = _import_numpy()
+        if sample_rate <= 0 or target_rate <= 0 or channels <= 0 or taps_per_phase <= 0:
+            raise ValueError("sample_rate, target_rate, channels and taps_per_phase must be positive.")
+
+        self._np = np
+        self.sample_rate = int(sample_rate)
+        self.channels = int(channels)
+        self.target_rate = int(target_rate)
+
+        divisor = math.gcd(self.sample_rate, self.target_rate)
+        self._up = self.target_rate // divisor
+        self._down = self.sample_rate // divisor
+        self._taps = taps_per_phase
+
+        if self._up != self._down:
+            length = taps_per_phase * self._up
+            # Cutoff slightly below Nyquist of the lower rate, so transition band doesn't alias
+            cutoff = 0.45 / max(self._up, self._down)
+            self._delay = (length - 1) // 2
+            # Window is centered at delay, so output isn't shifted by half sample for even length
+            window = np.zeros(length)
+            window[:2 * self._delay + 1] = np.kaiser(2 * self._delay + 1, 8.0)
+            h = 2 * cutoff * np.sinc(2 * cutoff * (np.arange(length) - self._delay)) * window
+            h *= self._up / h.sum()
+            self._phases = h.reshape(taps_per_phase, self._up).T.astype(np.float32)
+        self.reset()
+
+    @property
+    def params(self):
+        """Recognition params describing output audio"""
+
+        return {'format': 'lpcm', 'sampleRateHertz': str(self.target_rate)}
+
+    def reset(self):
+        """Drops stream state, next :py:meth:`feed` starts new stream"""
+
+        self._remainder = b''
+        self._consumed = 0
+        self._next = 0
+        self._history = self._np.zeros(self._taps, dtype=self._np.float32)
+        self._offset = -self._taps
+
+    def copy(self):
+        """
+        Preprocessor with same settings and fresh stream state
+
+        :rtype: PcmPreprocessor
+        """
+        other = copy.copy(self)
+        other.reset()
+        return other
+
+    def _downmix(self, data):
+        """Converts whole frames of data to mono float32 samples, keeps partial frame for next call"""
+
+        np = self._np
+        data = self._remainder + bytes(data)
+        frame_size = 2 * self.channels
+        usable = len(data) - len(data) % frame_size
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data, dtype='<i2', count=usable // 2)
+        if self.channels == 1:
+            return samples.astype(np.float32)
+        return samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+
+    def _resample(self, x):
+        """Computes all output samples available after appending x to stream"""
+
+        np = self._np
+        if self._up == self._down:
+            return x
+
+        buffer = np.concatenate((self._history, x))
+        end = self._offset + len(buffer)
+        last = (end * self._up - 1 - self._delay) // self._down
+        n = np.arange(self._next, max(self._next, last + 1), dtype=np.int64)
+
+        position = n * self._down + self._delay
+        indices = (position // self._up - self._offset)[:, None] - np.arange(self._taps)[None, :]
+        y = np.einsum('nk,nk->n', self._phases[position % self._up], buffer[indices])
+
+        self._next += len(n)
+        keep = max(0, min((self._next * self._down + self._delay) // self._up - self._taps + 1 - self._offset,
+                          len(buffer)))
+        self._history = buffer[keep:]
+        self._offset += keep
+        return y
+
+    def _to_bytes(self, y):
+        np = self._np
+        return np.clip(np.rint(y), -32768, 32767).astype('<i2').tobytes()
+
+    def feed(self, data):
+        """
+        Processes next chunk of stream
+
+        :param bytes data: Chunk of input audio
+        :return: Output audio available so far, may be empty
+        :rtype: bytes
+        """
+        x = self._downmix(data)
+        self._consumed += len(x)
+        return self._to_bytes(self._resample(x))
+
+    def flush(self):
+        """
+        Returns rest of output audio and resets stream state
+
+        :rtype: bytes
+        """
+        output = b''
+        if self._up != self._down:
+            expected = -(-self._consumed * self._up // self._down)
+            padding = self._np.zeros(self._delay // self._up + self._taps + 1, dtype=self._np.float32)
+            y = self._resample(padding)
+            output = self._to_bytes(y[:max(0, expected - (self._next - len(y)))])
+        self.reset()
+        return output
+
+    def process(self, data):
+        """
+        Converts whole audio, stream state is not used
+
+        :param bytes data: Input audio
+        :return: Output audio
+        :rtype: bytes
+        """
+        preprocessor = self.copy()
+        return preprocessor.feed(data) + preprocessor.flush()
+
+    def stream(self, chunks):
+        """
+        Converts stream of chunks with separate stream state
+
+        :param iterable chunks: Chunks of input audio
+        :return: Yields chunks of output audio, empty chunks are skipped
+        :rtype: bytes
+        """
+        preprocessor = self.copy()
+        for chunk in chunks:
+            output = preprocessor.feed(chunk)
+            if output:
+                yield output
+        output = preprocessor.flush()
+        if output:
+            yield output
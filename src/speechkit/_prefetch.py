@@ -0,0 +1,142 @@
+import collections
+import logging
+import threading
+import time
+
+
+class Prefetcher:
+    """
+    Renders hinted requests on one background worker thread into bounded in-memory store. Stored audio expires
+    after `ttl` seconds, least recently used audio is dropped when store exceeds `max_bytes`. If hinted request is
+    being rendered when it is needed, caller waits for it instead of starting the same request again.
+    """
+
+    def __init__(self, fetch, max_bytes=16 * 1024 * 1024, ttl=300, max_pending=16):
+        """
+        :param callable fetch: Function `fetch(params)` returning audio bytes
+        :param integer max_bytes: Size limit of stored audio in bytes. Default 16 MiB
+        :param float ttl: Seconds stored audio is kept. Default 300
+        :param integer max_pending: Maximum number of hints waiting for worker, oldest hints are dropped. Default 16
+        """
+        if max_bytes < 0 or ttl <= 0 or max_pending < 1:
+            raise ValueError("max_bytes must be non-negative, ttl and max_pending must be positive.")
+
+        self._fetch = fetch
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._pending = collections.OrderedDict()
+        self._max_pending = max_pending
+        self._store = collections.OrderedDict()
+        self._size = 0
+        self._in_flight = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._hits = 0
+        self._evictions = 0
+        self._thread = threading.Thread(target=self._run, name='speechkit-prefetch', daemon=True)
+        self._thread.start()
+
+    @property
+    def hits(self):
+        """Number of requests served from prefetched audio"""
+
+        return self._hits
+
+    @property
+    def evictions(self):
+        """Number of prefetched audio dropped because of ttl or size limit"""
+
+        return self._evictions
+
+    def hint(self, key, params):
+        """
+        Queues request for background rendering, does nothing if it is stored, queued or in flight
+
+        :param string key: Request key
+        :param dict params: Params passed to fetch function
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Prefetcher is closed.")
+            self._expire()
+            if key in self._store or key in self._in_flight or key in self._pending:
+                return
+            self._pending[key] = params
+            while len(self._pending) > self._max_pending:
+                self._pending.popitem(last=False)
+            self._condition.notify()
+
+    def get(self, key, wait=True):
+        """
+        Returns prefetched audio
+
+        :param string key: Request key
+        :param boolean wait: Wait for the request if it is being rendered now
+        :return: Audio or None if request wasn't prefetched
+        :rtype: bytes | None
+        """
+        with self._condition:
+            self._pending.pop(key, None)
+            while wait and key in self._in_flight:
+                self._condition.wait()
+            self._expire()
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            self._store.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def _expire(self):
+        """Drops expired audio, must be called with lock held"""
+
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self._store.items() if expires_at <= now]:
+            self._drop(key)
+
+    def _drop(self, key):
+        _, data = self._store.pop(key)
+        self._size -= len(data)
+        self._evictions += 1
+
+    def _put(self, key, data):
+        """Stores audio, must be called with lock held"""
+
+        if len(data) > self._max_bytes:
+            return
+        self._store[key] = (time.monotonic() + self._ttl, data)
+        self._size += len(data)
+        while self._size > self._max_bytes:
+            self._drop(next(iter(self._store)))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                key, params = self._pending.popitem(last=False)
+                self._in_flight[key] = params
+
+            data = None
+            try:
+                data = self._fetch(params)
+            except Exception:
+                logging.warning("Prefetch of %s failed", key, exc_info=True)
+            finally:
+                with self._condition:
+                    del self._in_flight[key]
+                    if data is not None:
+                        self._put(key, data)
+                    self._condition.notify_all()
+
+    def close(self):
+        """Stops worker and drops stored audio"""
+
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._store.clear()
+            self._size = 0
+            self._condition.notify_all()
@@ -0,0 +1,119 @@
+"""Reads audio parameters from WAV and Ogg Opus headers, audio is never decoded."""
+
+import collections
+import os
+import struct
+
+from speechkit._ogg import _PAGE_HEADER, _CAPTURE_PATTERN, _NO_GRANULE
+
+AudioInfo = collections.namedtuple(
+    'AudioInfo', ['encoding', 'channels', 'sample_rate', 'duration', 'data_offset', 'data_size']
+)
+AudioInfo.__doc__ = """
+Audio parameters: `encoding` is `lpcm` or `oggopus`, `duration` is in seconds, `data_offset` and `data_size`
+locate audio payload in bytes: samples of WAV data chunk or whole Ogg stream.
+"""
+
+_CHUNK_HEADER = struct.Struct('<4sI')
+_FMT = struct.Struct('<HHIIHH')
+_WAVE_FORMAT_PCM = 1
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+_OPUS_HEAD = struct.Struct('<8sBBHI')
+_MAX_PAGE_SIZE = _PAGE_HEADER.size + 255 + 255 * 255
+_OPUS_RATE = 48000
+_HEAD_SIZE = 64 * 1024
+
+
+def _probe_wav(view, total_size):
+    """Walks RIFF chunks up to data chunk, view is the beginning of file of total_size bytes"""
+
+    fmt = None
+    offset = 12
+    while offset + _CHUNK_HEADER.size <= len(view):
+        chunk_id, size = _CHUNK_HEADER.unpack_from(view, offset)
+        offset += _CHUNK_HEADER.size
+        if chunk_id == b'fmt ':
+            if size < _FMT.size or offset + _FMT.size > len(view):
+                raise ValueError("Truncated WAV fmt chunk.")
+            fmt = _FMT.unpack_from(view, offset)
+            if fmt[0] == _WAVE_FORMAT_EXTENSIBLE and size >= 40:
+                # Sub format GUID starts with format tag
+                fmt = struct.unpack_from('<H', view, offset + 24) + fmt[1:]
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk comes before fmt chunk.")
+            format_tag, channels, sample_rate, _, block_align, bits = fmt
+            if format_tag != _WAVE_FORMAT_PCM or bits != 16:
+                raise ValueError("Only 16-bit PCM WAV is supported, got format {} with {} bits.".format(
+                    format_tag, bits))
+            # Streaming writers leave size 0xFFFFFFFF, audio lasts until end of file then
+            size = min(size, total_size - offset)
+            size -= size % block_align
+            return AudioInfo('lpcm', channels, sample_rate, size / block_align / sample_rate, offset, size)
+        offset += size + size % 2
+    raise ValueError("WAV has no data chunk in the first {} bytes.".format(len(view)))
+
+
+def _last_granule(tail, serial):
+    """Granule position of the last page of logical stream, pages are searched from the end"""
+
+    position = len(tail)
+    while True:
+        position = tail.rfind(_CAPTURE_PATTERN, 0, position)
+        if position < 0:
+            return _NO_GRANULE
+        if position + _PAGE_HEADER.size <= len(tail):
+            _, version, _, granule, page_serial, _, _, _ = _PAGE_HEADER.unpack_from(tail, position)
+            if version == 0 and page_serial == serial and granule != _NO_GRANULE:
+                return granule
+
+
+def _probe_ogg(view, tail, total_size):
+    """Reads OpusHead from the first page and duration from granule position of the last page in tail"""
+
+    if len(view) < _PAGE_HEADER.size:
+        raise ValueError("Truncated Ogg page header.")
+    _, _, _, _, serial, _, _, segments = _PAGE_HEADER.unpack_from(view, 0)
+    body = _PAGE_HEADER.size + segments
+    if len(view) < body + _OPUS_HEAD.size:
+        raise ValueError("Truncated Ogg page.")
+    magic, _, channels, pre_skip, input_rate = _OPUS_HEAD.unpack_from(view, body)
+    if magic != b'OpusHead':
+        raise ValueError("Only Ogg Opus is supported.")
+
+    granule = _last_granule(tail, serial)
+    duration = max(0, granule - pre_skip) / _OPUS_RATE if granule != _NO_GRANULE else 0.0
+    return AudioInfo('oggopus', channels, input_rate or _OPUS_RATE, duration, 0, total_size)
+
+
+def probe_audio(data):
+    """
+    Reads encoding, channels, sample rate and exact duration from RIFF WAV or Ogg Opus headers without decoding.
+    WAV is read up to data chunk header, Ogg only on the first and the last pages, so files are not read whole.
+
+    :Example:
+
+    >>> info = probe_audio('call.wav')
+    >>> info.duration, info.sample_rate
+    (12.5, 8000)
+
+    :type data: string | os.PathLike | bytes | bytearray | memoryview | mmap.mmap
+    :param data: Path to audio file or its content
+    :rtype: AudioInfo
+    """
+    if isinstance(data, (str, os.PathLike)):
+        with open(data, 'rb') as f:
+            total_size = os.fstat(f.fileno()).st_size
+            head = f.read(_HEAD_SIZE)
+            f.seek(max(0, total_size - _MAX_PAGE_SIZE))
+            tail = f.read()
+    else:
+        head = memoryview(data).cast('B')
+        total_size = len(head)
+        tail = bytes(head[-_MAX_PAGE_SIZE:])
+
+    if bytes(head[:4]) == b'RIFF' and bytes(head[8:12]) == b'WAVE':
+        return _probe_wav(head, total_size)
+    if bytes(head[:4]) == _CAPTURE_PATTERN:
+        return _probe_ogg(head, tail, total_size)
+    raise ValueError("Unknown audio format, expected WAV or Ogg Opus.")
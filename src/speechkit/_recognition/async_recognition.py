@@ -0,0 +1,198 @@
+import asyncio
+import time
+
+from speechkit._recognition.sync_recognition import (
+    ShortAudioRecognition, RecognitionLongAudio, SHORT_RECOGNITION_URL, LONG_RECOGNITION_URL, _audio_payload,
+    _preprocess, _error_answer, RecognitionResult
+)
+from speechkit._batch import aiter_bounded
+from speechkit._limiter import AsyncAdaptiveLimiter, is_overloaded, backoff_delay
+from speechkit.exceptions import RequestError
+
+
+def _query_params(params):
+    """aiohttp accepts only str, int and float query values, convert the rest like requests does"""
+
+    return {k: v if isinstance(v, (str, int, float)) and not isinstance(v, bool) else str(v)
+            for k, v in params.items()}
+
+
+class AsyncShortAudioRecognition(ShortAudioRecognition):
+    """
+    asyncio version of :py:class:`speechkit.ShortAudioRecognition`. Requests share
+    :py:meth:`speechkit.Session.async_transport` connection pool and don't block event loop.
+
+    :Example:
+
+    >>> recognize_short_audio = AsyncShortAudioRecognition(session)
+    >>> text = await recognize_short_audio.recognize(data, format='lpcm', sampleRateHertz='48000')
+    """
+
+    async def recognize(self, data, preprocessor=None, remove_pauses=False, pause_options=None, **kwargs):
+        """
+        Recognize text from audio data. Accepts same params as :py:meth:`speechkit.ShortAudioRecognition.recognize`.
+
+        :type data: bytes | bytearray | memoryview | mmap.mmap | io.BytesIO | io.BufferedIOBase
+        :param data: Data with audio samples to recognize
+        :param speechkit.PcmPreprocessor | None preprocessor: Downmixes and resamples `lpcm` audio before upload
+        :param boolean remove_pauses: Remove long pauses from `lpcm` audio before upload. Default False
+        :param dict pause_options: Options of pause detection, see `speechkit._pcm.pause_map`
+        :return: The recognized text
+        :rtype: string
+        """
+        data, kwargs = _preprocess(data, preprocessor, kwargs, (pause_options or {}) if remove_pauses else None)
+        data, key, text = self._cache_lookup(data, kwargs)
+        if text is not None:
+            return text
+
+        body, size = _audio_payload(data)
+        params = self._request_params(size, **kwargs)
+
+        async with self._session.async_transport.post(
+                SHORT_RECOGNITION_URL, params=_query_params(params), data=body, headers=self._headers
+        ) as answer:
+            if answer.ok:
+                text = (await answer.json(content_type=None)).get('result')
+                self._cache_put(key, text)
+                return text
+            else:
+                raise RequestError(_error_answer(await answer.text()), status_code=answer.status)
+
+    async def _recognize_adaptive(self, limiter, max_retries, request):
+        """Recognizes one batch item under limiter, retries overload responses, returns (text, error, latency)"""
+
+        data = request.get('data')
+        # Files are read by request, retry has to send them from the same position
+        position = data.tell() if hasattr(data, 'seek') else None
+        start = time.monotonic()
+        for attempt in range(max_retries + 1):
+            if position is not None:
+                data.seek(position)
+            token = await limiter.acquire()
+            overloaded = False
+            try:
+                return await self.recognize(**request), None, time.monotonic() - start
+            except Exception as e:
+                overloaded = is_overloaded(e)
+                if not overloaded or attempt == max_retries:
+                    return None, e, time.monotonic() - start
+            finally:
+                await limiter.release(token, overloaded)
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def recognize_many(self, requests, max_workers=8, ordered=True, max_retries=3):
+        """
+        Recognizes many short audios concurrently on event loop.
+        Accepts same params as :py:meth:`speechkit.ShortAudioRecognition.recognize_many`.
+
+        :Example:
+
+        >>> async for result in recognize_short_audio.recognize_many(commands, max_workers=32, ordered=False):
+        ...     print(result.index, result.text, result.latency)
+        ...
+
+        :return: Asynchronously yields named tuples `(index, request, text, error, latency)`
+        :rtype: speechkit._recognition.sync_recognition.RecognitionResult
+        """
+        limiter = AsyncAdaptiveLimiter(max_workers)
+
+        async def recognize(**request):
+            return await self._recognize_adaptive(limiter, max_retries, request)
+
+        async for result in aiter_bounded(recognize, requests, max_workers=max_workers, ordered=ordered):
+            if result.error is not None:
+                raise result.error
+            yield RecognitionResult(result.index, result.request, *result.data)
+
+    async def recognize_segmented(self, data, max_workers=8, vad_options=None, **kwargs):
+        """
+        Recognize `lpcm` audio longer than 30 seconds with concurrent short audio recognition requests.
+        Accepts same params as :py:meth:`speechkit.ShortAudioRecognition.recognize_segmented`.
+
+        :return: List of tuples (start, end, text), start and end are offsets in seconds
+        :rtype: list[tuple[float, float, string]]
+        """
+        bounds, requests = self._segment_requests(data, vad_options or {}, kwargs)
+        texts = []
+        async for result in aiter_bounded(self.recognize, requests, max_workers=max_workers):
+            if result.error is not None:
+                raise result.error
+            texts.append(result.data)
+        return [(start, end, text) for (start, end), text in zip(bounds, texts)]
+
+
+class AsyncRecognitionLongAudio(RecognitionLongAudio):
+    """
+    asyncio version of :py:class:`speechkit.RecognitionLongAudio`. API requests share
+    :py:meth:`speechkit.Session.async_transport` connection pool, object storage calls run in default executor
+    because `boto3` is blocking. Initialization is blocking too, so create instance once and reuse it.
+
+    :Example:
+
+    >>> recognize_long_audio = AsyncRecognitionLongAudio(session, '<service_account_id>')
+    >>> chunks = await recognize_long_audio.recognize('file/path', audioEncoding='LINEAR16_PCM',
+    ...                                               sampleRateHertz='48000')
+    >>> recognize_long_audio.get_raw_text()
+    ...'raw recognized text'
+    """
+
+    async def send_for_recognition(self, file_path, preprocessor=None, remove_pauses=False, pause_options=None,
+                                   **kwargs):
+        """
+        Send a file for recognition.
+        Accepts same params as :py:meth:`speechkit.RecognitionLongAudio.send_for_recognition`.
+
+        :param string file_path: Path to input file
+        :param speechkit.PcmPreprocessor | None preprocessor: Downmixes and resamples LPCM file before upload
+        :param boolean remove_pauses: Remove long pauses from single-channel LPCM file before upload. Default False
+        :param dict pause_options: Options of pause detection, see `speechkit._pcm.pause_map`
+        :rtype: None
+        """
+        kwargs = self._preprocessed_params(preprocessor, kwargs, remove_pauses)
+        loop = asyncio.get_event_loop()
+        aws_presigned_url = await loop.run_in_executor(
+            None, self._upload, file_path, preprocessor, (pause_options or {}) if remove_pauses else None,
+            int(kwargs.get('sampleRateHertz', 48000))
+        )
+        data = self._recognition_request_data(aws_presigned_url, **kwargs)
+
+        async with self._session.async_transport.post(LONG_RECOGNITION_URL, headers=self._headers, json=data) as answer:
+            if answer.ok:
+                self._id = (await answer.json(content_type=None)).get('id')
+            else:
+                raise RequestError(await answer.json(content_type=None), status_code=answer.status)
+
+    async def get_recognition_results(self):
+        """
+        Monitor the recognition results using the received ID.
+        Same as :py:meth:`speechkit.RecognitionLongAudio.get_recognition_results`.
+
+        :return: State of recognition is done or not
+        :rtype: boolean
+        """
+        url = self._operation_url()
+        async with self._session.async_transport.get(url, headers=self._headers) as answer:
+            if not answer.ok:
+                raise RequestError(await answer.json(content_type=None), status_code=answer.status)
+            self._answer_data = await answer.json(content_type=None)
+
+        done = self._answer_data.get('done')
+        if done:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._delete_object, self._aws_bucket_name, self._aws_file_name)
+        return done
+
+    async def recognize(self, file_path, poll_interval=10, **kwargs):
+        """
+        Send a file for recognition and wait for results without blocking event loop.
+        Accepts same params as :py:meth:`speechkit.RecognitionLongAudio.send_for_recognition`.
+
+        :param string file_path: Path to input file
+        :param float poll_interval: Seconds between result monitoring requests. Default 10
+        :return: Recognition results, same as :py:meth:`speechkit.RecognitionLongAudio.get_data`
+        :rtype: list
+        """
+        await self.send_for_recognition(file_path, **kwargs)
+        while not await self.get_recognition_results():
+            await asyncio.sleep(poll_interval)
+        return self.get_data()
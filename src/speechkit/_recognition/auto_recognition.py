@@ -0,0 +1,127 @@
+import importlib.util
+import os
+import tempfile
+import time
+
+from speechkit._probe import probe_audio
+
+SHORT_MAX_SECONDS = 30
+SHORT_MAX_BYTES = 1024 * 1024
+SAMPLE_RATES = (8000, 16000, 48000)
+"""Sample rates of LPCM audio accepted by recognition"""
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _payload(data, info):
+    """Audio payload: zero-copy slice of data chunk for WAV in memory, read from file for path"""
+
+    if isinstance(data, (str, os.PathLike)):
+        with open(data, 'rb') as f:
+            f.seek(info.data_offset)
+            return f.read(info.data_size)
+    return memoryview(data).cast('B')[info.data_offset:info.data_offset + info.data_size]
+
+
+def _write_payload(data, info, f):
+    """Writes audio payload to file, payload of file at path is copied in bounded chunks"""
+
+    if not isinstance(data, (str, os.PathLike)):
+        f.write(_payload(data, info))
+        return
+
+    with open(data, 'rb') as source:
+        source.seek(info.data_offset)
+        remaining = info.data_size
+        while remaining:
+            chunk = source.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                return
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def _numpy_available():
+    return importlib.util.find_spec('numpy') is not None
+
+
+def _short_params(info):
+    if info.encoding == 'lpcm':
+        return {'format': 'lpcm', 'sampleRateHertz': str(info.sample_rate)}
+    return {'format': 'oggopus'}
+
+
+def _long_params(info):
+    if info.encoding == 'lpcm':
+        return {'audioEncoding': 'LINEAR16_PCM', 'sampleRateHertz': info.sample_rate,
+                'audioChannelCount': info.channels}
+    return {'audioEncoding': 'OGG_OPUS'}
+
+
+def _choose_backend(info, long_available=False):
+    """Picks the fastest recognition that accepts audio: `short`, `segmented` or `long`"""
+
+    supported_rate = info.encoding != 'lpcm' or info.sample_rate in SAMPLE_RATES
+    if info.channels == 1 and supported_rate:
+        if info.duration <= SHORT_MAX_SECONDS and info.data_size <= SHORT_MAX_BYTES:
+            return 'short'
+        # Segmented recognition needs numpy, long audio recognition is used instead if it is available
+        if info.encoding == 'lpcm' and (not long_available or _numpy_available()):
+            return 'segmented'
+    if long_available and supported_rate:
+        return 'long'
+    raise ValueError("Audio {} needs long audio recognition with supported sample rate.".format(info))
+
+
+def recognize_auto(data, short_recognition, long_recognition=None, poll_interval=10, short_options=None,
+                   long_options=None):
+    """
+    Recognizes WAV or Ogg Opus audio with the fastest eligible recognition. Format, sample rate, channels and
+    duration are read from headers with :py:func:`speechkit.probe_audio`. Mono audio up to 30 seconds and 1 MB
+    goes to short audio recognition, longer mono WAV is cut at pauses and recognized with parallel short
+    requests (requires `numpy`, without it such audio goes to long audio recognition if it is given), the rest
+    goes to long audio recognition. Only samples of WAV data chunk are sent, WAV in memory is sent to short audio
+    recognition as zero-copy slice.
+
+    :Example:
+
+    >>> text = recognize_auto('call.wav', ShortAudioRecognition(session),
+    ...                       RecognitionLongAudio(session, '<service_account_id>'))
+
+    :type data: string | os.PathLike | bytes | bytearray | memoryview | mmap.mmap
+    :param data: Path to audio file or its content
+    :param speechkit.ShortAudioRecognition short_recognition: Short audio recognition instance
+    :param speechkit.RecognitionLongAudio | None long_recognition: Long audio recognition instance, if None
+        audio that needs it raises `ValueError`
+    :param float poll_interval: Seconds between long audio result monitoring requests. Default 10
+    :param dict short_options: Params of :py:meth:`speechkit.ShortAudioRecognition.recognize`, format and sample
+        rate are set from headers
+    :param dict long_options: Params of :py:meth:`speechkit.RecognitionLongAudio.send_for_recognition`,
+        encoding, sample rate and channels are set from headers
+    :return: Recognized text
+    :rtype: string
+    """
+    info = probe_audio(data)
+    backend = _choose_backend(info, long_recognition is not None)
+
+    if backend == 'short':
+        return short_recognition.recognize(_payload(data, info), **dict(short_options or {}, **_short_params(info)))
+    if backend == 'segmented':
+        segments = short_recognition.recognize_segmented(_payload(data, info),
+                                                         **dict(short_options or {}, **_short_params(info)))
+        return ' '.join(text for _, _, text in segments if text)
+
+    params = dict(long_options or {}, **_long_params(info))
+    if isinstance(data, (str, os.PathLike)) and info.data_offset == 0 and info.data_size == os.path.getsize(data):
+        long_recognition.send_for_recognition(data, **params)
+    else:
+        # WAV header and other RIFF chunks would be decoded as samples, only data chunk is uploaded
+        with tempfile.NamedTemporaryFile(suffix='.' + info.encoding, delete=False) as f:
+            _write_payload(data, info, f)
+        try:
+            long_recognition.send_for_recognition(f.name, **params)
+        finally:
+            os.remove(f.name)
+
+    while not long_recognition.get_recognition_results():
+        time.sleep(poll_interval)
+    return long_recognition.get_raw_text().strip()
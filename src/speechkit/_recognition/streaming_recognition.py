@@ -1,10 +1,256 @@
 import logging
+import threading
 
 import grpc
 
 import speechkit._recognition.yandex.cloud.ai.stt.v2.stt_service_pb2 as stt_service_pb2
 import speechkit._recognition.yandex.cloud.ai.stt.v2.stt_service_pb2_grpc as stt_service_pb2_grpc
 
+STT_ENDPOINT = 'stt.api.cloud.yandex.net:443'
+
+
+def _channel_options(keepalive_time_ms=60000, keepalive_timeout_ms=20000, keepalive_permit_without_calls=False,
+                     max_message_length=None, options=None):
+    """gRPC channel options list, params are described in :py:class:`speechkit.ChannelPool`"""
+
+    channel_options = [
+        ('grpc.keepalive_time_ms', keepalive_time_ms),
+        ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+        ('grpc.keepalive_permit_without_calls', int(keepalive_permit_without_calls)),
+    ]
+    if max_message_length is not None:
+        channel_options += [
+            ('grpc.max_send_message_length', max_message_length),
+            ('grpc.max_receive_message_length', max_message_length),
+        ]
+    return channel_options + list(options or [])
+
+
+class ChannelPool:
+    """
+    Pool of persistent gRPC channels to SpeechKit streaming recognition. Channels are created on first use and
+    reused by every call, so only first utterance pays DNS, TCP, TLS and HTTP/2 setup. Calls are distributed
+    over channels round-robin. Safe to share between threads and :py:class:`speechkit.DataStreamingRecognition`
+    instances.
+
+    :Example:
+
+    >>> with ChannelPool(size=2, keepalive_time_ms=30000) as channel_pool:
+    ...     data_streaming_recognition = DataStreamingRecognition(session, channel_pool=channel_pool, timeout=60)
+    ...     for text, final, end_of_utterance in data_streaming_recognition.recognize(gen_audio_function):
+    ...         print(text)
+    ...
+    """
+
+    def __init__(self, size=1, endpoint=STT_ENDPOINT, keepalive_time_ms=60000, keepalive_timeout_ms=20000,
+                 keepalive_permit_without_calls=False, max_message_length=None, options=None):
+        """
+        Initialize :py:class:`speechkit.ChannelPool`
+
+        :param integer size: Number of channels. Each channel multiplexes calls over one HTTP/2 connection. Default 1
+        :param string endpoint: Host and port of streaming recognition service
+        :param integer keepalive_time_ms: Interval of keepalive pings in milliseconds. Default 60000
+        :param integer keepalive_timeout_ms: Time to wait for keepalive ping ack before closing connection
+            in milliseconds. Default 20000
+        :param boolean keepalive_permit_without_calls: Send keepalive pings when there are no active calls,
+            keeps idle connections warm. Server can close connection if pings are too frequent. Default False
+        :param integer | None max_message_length: Maximum size of sent and received message in bytes.
+            Default is gRPC default
+        :param list | None options: Additional gRPC channel options, list of (key, value) tuples
+        """
+        if not isinstance(size, int) or size < 1:
+            raise ValueError("size must be positive int, but got {}".format(size))
+
+        self._endpoint = endpoint
+        self._options = _channel_options(keepalive_time_ms, keepalive_timeout_ms, keepalive_permit_without_calls,
+                                         max_message_length, options)
+
+        self._lock = threading.Lock()
+        self._stubs = [None] * size
+        self._channels = [None] * size
+        self._next = 0
+        self._closed = False
+
+    def get_stub(self):
+        """
+        Stub for next channel, creates channel on first use
+
+        :rtype: speechkit._recognition.yandex.cloud.ai.stt.v2.stt_service_pb2_grpc.SttServiceStub
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ChannelPool is closed.")
+
+            i = self._next
+            self._next = (self._next + 1) % len(self._stubs)
+            if self._stubs[i] is None:
+                self._channels[i] = grpc.secure_channel(self._endpoint, grpc.ssl_channel_credentials(), self._options)
+                self._stubs[i] = stt_service_pb2_grpc.SttServiceStub(self._channels[i])
+            return self._stubs[i]
+
+    def close(self):
+        """Closes all channels, active calls are cancelled."""
+
+        with self._lock:
+            self._closed = True
+            for channel in self._channels:
+                if channel is not None:
+                    channel.close()
+            self._channels = [None] * len(self._channels)
+            self._stubs = [None] * len(self._stubs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _RolloverStream:
+    """
+    Recognizes one audio stream in consecutive StreamingRecognize sessions, see `rollover` option of
+    :py:class:`speechkit.DataStreamingRecognition`.
+
+    Audio sent in current session is kept until recognition results acknowledge it (last word end time of final
+    result). After `soft_limit` bytes current session is cancelled on next utterance boundary and unacknowledged
+    tail is replayed in new session. Audio source is never read after `hard_limit` bytes in one session.
+    """
+
+    REPLAY_CHUNK_SIZE = 32000
+
+    def __init__(self, recognition, audio, bytes_per_second, soft_limit, hard_limit, max_replay):
+        self._recognition = recognition
+        self._audio = iter(audio)
+        self._bytes_per_second = bytes_per_second
+        self._soft_limit = soft_limit
+        self._hard_limit = hard_limit
+        self._max_replay = max_replay
+
+        self._pull_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._tail = bytearray()
+        self._tail_start = 0
+        self._exhausted = False
+        self._audio_error = None
+
+    @property
+    def _tail_end(self):
+        """Absolute offset of the end of audio read from source"""
+
+        return self._tail_start + len(self._tail)
+
+    def _requests(self, session_start, stop, sent_all):
+        """Requests for one session: config, unacknowledged tail, new audio from source"""
+
+        yield stt_service_pb2.StreamingRecognitionRequest(config=self._recognition._streaming_config)
+
+        position = session_start
+        while not stop.is_set():
+            with self._pull_lock:
+                with self._lock:
+                    position = max(position, self._tail_start)
+                    offset = position - self._tail_start
+                    data = bytes(self._tail[offset:offset + self.REPLAY_CHUNK_SIZE])
+
+                if not data:
+                    if self._exhausted or position - session_start >= self._hard_limit:
+                        sent_all.set()
+                        return
+                    try:
+                        data = next(self._audio)
+                    except StopIteration:
+                        self._exhausted = True
+                        sent_all.set()
+                        return
+                    except Exception as e:
+                        logging.error(e)
+                        self._audio_error = e
+                        raise e
+                    with self._lock:
+                        self._tail += data
+
+            position += len(data)
+            yield stt_service_pb2.StreamingRecognitionRequest(audio_content=data)
+
+    def _acknowledge(self, position):
+        """Drops audio before given absolute offset from tail"""
+
+        with self._lock:
+            size = min(position, self._tail_end) - self._tail_start
+            if size > 0:
+                del self._tail[:size]
+                self._tail_start += size
+
+    def _rebase(self, response, session_start):
+        """
+        Shifts word timestamps by session start, so they are relative to the beginning of the whole stream.
+
+        :return: Absolute offset of audio acknowledged by final result or None
+        """
+        offset_ns = session_start * 10 ** 9 // self._bytes_per_second
+        acknowledged = None
+        for chunk in response.chunks:
+            for i, alternative in enumerate(chunk.alternatives):
+                for word in alternative.words:
+                    word.start_time.FromNanoseconds(word.start_time.ToNanoseconds() + offset_ns)
+                    word.end_time.FromNanoseconds(word.end_time.ToNanoseconds() + offset_ns)
+                    if chunk.final and i == 0:
+                        end = word.end_time.ToNanoseconds() * self._bytes_per_second // 10 ** 9
+                        acknowledged = max(acknowledged or 0, end - end % 2)
+        return acknowledged
+
+    def __iter__(self):
+        session_start = 0
+        while True:
+            stop, sent_all = threading.Event(), threading.Event()
+            last_read, last_acknowledged = self._tail_end, self._tail_start
+            call = self._recognition._get_channel_pool().get_stub().StreamingRecognize(
+                self._requests(session_start, stop, sent_all), metadata=(self._recognition._headers,),
+                timeout=self._recognition._timeout
+            )
+            rolled_over = failed = False
+            try:
+                for response in call:
+                    acknowledged = self._rebase(response, session_start)
+                    if acknowledged is not None:
+                        self._acknowledge(acknowledged)
+                    yield response
+
+                    utterance_end = acknowledged is not None and any(c.end_of_utterance for c in response.chunks)
+                    if utterance_end and self._tail_end - session_start >= self._soft_limit:
+                        rolled_over = True
+                        break
+            except grpc.RpcError as e:
+                if self._audio_error is not None:
+                    raise self._audio_error
+                if self._tail_end <= last_read and self._tail_start <= last_acknowledged:
+                    raise
+                failed = True
+                logging.warning("Streaming recognition session failed, replaying unacknowledged audio: %s", e)
+            finally:
+                stop.set()
+                call.cancel()
+
+            if self._audio_error is not None:
+                raise self._audio_error
+
+            if not rolled_over and not failed:
+                if sent_all.is_set():
+                    self._acknowledge(self._tail_end)
+                elif self._tail_end <= last_read and self._tail_start <= last_acknowledged:
+                    return
+
+            with self._lock:
+                if len(self._tail) > self._max_replay:
+                    dropped = len(self._tail) - self._max_replay
+                    logging.warning("Unacknowledged audio is too long to replay, dropped %d bytes", dropped)
+                    del self._tail[:dropped]
+                    self._tail_start += dropped
+
+                if self._exhausted and not self._tail:
+                    return
+                session_start = self._tail_start
+
 
 class DataStreamingRecognition:
     """
@@ -55,9 +301,16 @@ class DataStreamingRecognition:
     `Yandex streaming recognition docs <https://cloud.yandex.com/en/docs/speechkit/stt/streaming>`_
     """
 
+    MAX_SESSION_SECONDS = 300
+    """Maximum duration of transmitted audio for the entire session, value: 300"""
+
+    MAX_SESSION_BYTES = 10 * 1024 * 1024
+    """Maximum size of transmitted audio data for the entire session, value: 10 MB"""
+
     def __init__(
             self, session, language_code=None, model=None, profanity_filter=None, partial_results=None,
-            single_utterance=None, audio_encoding=None, sample_rate_hertz=None, raw_results=None
+            single_utterance=None, audio_encoding=None, sample_rate_hertz=None, raw_results=None,
+            channel_pool=None, timeout=None, rollover=False, rollover_after=240, preprocessor=None
     ):
         """
         Initialize :py:class:`speechkit.DataStreamingRecognition`
@@ -93,9 +346,33 @@ class DataStreamingRecognition:
 
         :param boolean | None raw_results: Flag that indicates how to write numbers. `true`: In words.
             `false` (default): In figures.
+
+        :param speechkit.ChannelPool | None channel_pool: Pool of gRPC channels to share between instances.
+            If None, instance creates its own pool, closed by :py:meth:`DataStreamingRecognition.close`.
+
+        :param float | None timeout: Deadline for every recognition call in seconds.
+
+        :param boolean rollover: Recognize streams longer than session limits. After `rollover_after` seconds
+            current session is closed on utterance boundary and next session is opened, audio that is not covered
+            by final results yet is sent again. Word timestamps are shifted to be relative to the beginning of the
+            whole stream. Requires `LINEAR16_PCM` audio encoding and `sample_rate_hertz`, incompatible with
+            `single_utterance`.
+
+        :param integer rollover_after: Seconds of audio in one session before rollover on next utterance boundary,
+            less than 280. If there is no utterance boundary, session is closed just before limits. Default 240
+
+        :param speechkit.PcmPreprocessor | None preprocessor: Downmixes and resamples audio chunks before sending,
+            every stream is converted with its own state. `audio_encoding` and `sample_rate_hertz` are set from it
         """
-        self._headers = session.streaming_recognition_header
+        self._session = session
+        self._preprocessor = preprocessor
+        if preprocessor is not None:
+            audio_encoding, sample_rate_hertz = 'LINEAR16_PCM', preprocessor.target_rate
+
         self._folder_id = session.folder_id
+        self._timeout = timeout
+        self._channel_pool = channel_pool
+        self._owns_channel_pool = channel_pool is None
 
         specification_options = {k: v for k, v in {
             'language_code': language_code, 'model': model, 'profanity_filter': profanity_filter,
@@ -109,6 +386,57 @@ class DataStreamingRecognition:
 
         self._streaming_config = stt_service_pb2.RecognitionConfig(**config)
 
+        self._rollover = rollover
+        if rollover:
+            if audio_encoding != 'LINEAR16_PCM' or not sample_rate_hertz:
+                raise ValueError("rollover requires `LINEAR16_PCM` audio_encoding and sample_rate_hertz.")
+            if single_utterance:
+                raise ValueError("rollover can't be used with single_utterance.")
+            if not 0 < rollover_after < self.MAX_SESSION_SECONDS - 20:
+                raise ValueError("rollover_after must be in range (0, 280), but got {}".format(rollover_after))
+
+            bytes_per_second = sample_rate_hertz * 2
+            hard_limit = min((self.MAX_SESSION_SECONDS - 10) * bytes_per_second, self.MAX_SESSION_BYTES - 512 * 1024)
+            self._rollover_options = {
+                'bytes_per_second': bytes_per_second,
+                'soft_limit': min(rollover_after * bytes_per_second, hard_limit - 10 * bytes_per_second),
+                'hard_limit': hard_limit,
+                'max_replay': 30 * bytes_per_second,
+            }
+
+    @property
+    def _headers(self):
+        """Actual auth metadata, read from session on every call so refreshed IAM token is used"""
+
+        return self._session.streaming_recognition_header
+
+    def _get_channel_pool(self):
+        """Channel pool given on init or own pool created on first use"""
+
+        if self._channel_pool is None:
+            self._channel_pool = ChannelPool()
+        return self._channel_pool
+
+    def close(self):
+        """Closes own channel pool, pool given on init is left open."""
+
+        if self._owns_channel_pool and self._channel_pool is not None:
+            self._channel_pool.close()
+            self._channel_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _audio(self, chunks):
+        """Applies preprocessor to audio chunks if it is set"""
+
+        if self._preprocessor is None:
+            return chunks
+        return self._preprocessor.stream(chunks)
+
     def _gen(self, gen_audio_function, *args, **kwargs):
         """
         Generate audio fragments. Pass args and kwargs to pass it into :py:meth:`gen_audio_function`.
@@ -122,7 +450,7 @@ class DataStreamingRecognition:
 
             yield stt_service_pb2.StreamingRecognitionRequest(config=self._streaming_config)
 
-            for data in gen_audio_function(*args, **kwargs):
+            for data in self._audio(gen_audio_function(*args, **kwargs)):
                 yield stt_service_pb2.StreamingRecognitionRequest(audio_content=data)
 
         except Exception as e:
@@ -142,14 +470,20 @@ class DataStreamingRecognition:
         if not callable(gen_audio_function):
             raise RuntimeError("`gen_audio_function` must be callable.")
 
-        cred = grpc.ssl_channel_credentials()
-        channel = grpc.secure_channel('stt.api.cloud.yandex.net:443', cred)
-        stub = stt_service_pb2_grpc.SttServiceStub(channel)
+        if self._rollover:
+            yield from _RolloverStream(self, self._audio(gen_audio_function(*args, **kwargs)),
+                                       **self._rollover_options)
+            return
 
-        it = stub.StreamingRecognize(self._gen(gen_audio_function, *args, **kwargs), metadata=(self._headers,))
+        it = self._get_channel_pool().get_stub().StreamingRecognize(
+            self._gen(gen_audio_function, *args, **kwargs), metadata=(self._headers,), timeout=self._timeout
+        )
 
-        for chunk in it:
-            yield chunk
+        try:
+            for chunk in it:
+                yield chunk
+        finally:
+            it.cancel()
 
     def recognize(self, gen_audio_function, *args, **kwargs):
         """
@@ -166,3 +500,158 @@ class DataStreamingRecognition:
             final = item.chunks[0].final
             end_of_utterance = item.chunks[0].end_of_utterance
             yield alternatives, final, end_of_utterance
+
+
+class AsyncDataStreamingRecognition(DataStreamingRecognition):
+    """
+    asyncio version of :py:class:`speechkit.DataStreamingRecognition` built on `grpc.aio`. Audio is taken
+    from async iterator and results are yielded as async iterator, so streams don't hold OS threads.
+    All streams of one instance are multiplexed over one HTTP/2 channel, call
+    :py:meth:`AsyncDataStreamingRecognition.close` when it is not needed anymore.
+
+    :Example:
+
+    >>> data_streaming_recognition = AsyncDataStreamingRecognition(
+    ...     session,
+    ...     language_code='ru-RU',
+    ...     audio_encoding='LINEAR16_PCM',
+    ...     sample_rate_hertz=8000,
+    ... )
+    ...
+    >>> async def gen_audio():
+    ...     while True:
+    ...         yield await telephony_stream.read(4000)
+    ...
+    >>> async for text, final, end_of_utterance in data_streaming_recognition.recognize(gen_audio()):
+    ...     print(text)
+    ...
+    >>> await data_streaming_recognition.close()
+    """
+
+    def __init__(self, session, endpoint=STT_ENDPOINT, keepalive_time_ms=60000, keepalive_timeout_ms=20000,
+                 keepalive_permit_without_calls=False, max_message_length=None, options=None, **kwargs):
+        """
+        Initialize :py:class:`speechkit.AsyncDataStreamingRecognition`, accepts same params as
+        :py:class:`speechkit.DataStreamingRecognition`, except `channel_pool` and `rollover`. Channel options
+        are the same as in :py:class:`speechkit.ChannelPool`.
+
+        :param speechkit._auth.Session session: Session instance for auth
+        :param string endpoint: Host and port of streaming recognition service
+        :param integer keepalive_time_ms: Interval of keepalive pings in milliseconds. Default 60000
+        :param integer keepalive_timeout_ms: Time to wait for keepalive ping ack before closing connection
+            in milliseconds. Default 20000
+        :param boolean keepalive_permit_without_calls: Send keepalive pings when there are no active calls.
+            Default False
+        :param integer | None max_message_length: Maximum size of sent and received message in bytes.
+            Default is gRPC default
+        :param list | None options: Additional gRPC channel options, list of (key, value) tuples
+        """
+        if kwargs.get('rollover'):
+            raise ValueError("rollover is not supported by AsyncDataStreamingRecognition.")
+        if kwargs.get('channel_pool') is not None:
+            raise ValueError("channel_pool is not supported by AsyncDataStreamingRecognition, "
+                             "pass channel options instead.")
+
+        super().__init__(session, **kwargs)
+        self._endpoint = endpoint
+        self._options = _channel_options(keepalive_time_ms, keepalive_timeout_ms, keepalive_permit_without_calls,
+                                         max_message_length, options)
+        self._channel = None
+        self._stub = None
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with AsyncDataStreamingRecognition.")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def _get_stub(self):
+        """Creates channel on first use, inside running event loop"""
+
+        if self._stub is None:
+            self._channel = grpc.aio.secure_channel(self._endpoint, grpc.ssl_channel_credentials(), self._options)
+            self._stub = stt_service_pb2_grpc.SttServiceStub(self._channel)
+        return self._stub
+
+    async def _aaudio(self, audio):
+        """Applies preprocessor to async audio chunks if it is set"""
+
+        if self._preprocessor is None:
+            async for data in audio:
+                yield data
+            return
+
+        preprocessor = self._preprocessor.copy()
+        async for data in audio:
+            output = preprocessor.feed(data)
+            if output:
+                yield output
+        output = preprocessor.flush()
+        if output:
+            yield output
+
+    async def _gen(self, audio):
+        """
+        Generate audio fragments.
+
+        :param audio: Async iterator of audio data
+        :return: Serialized data for sending
+        """
+        try:
+            yield stt_service_pb2.StreamingRecognitionRequest(config=self._streaming_config)
+
+            async for data in self._aaudio(audio):
+                yield stt_service_pb2.StreamingRecognitionRequest(audio_content=data)
+
+        except Exception as e:
+            logging.error(e)
+            raise e
+
+    async def recognize_raw(self, audio):
+        """
+        Recognize streaming data, audio must yield audio data with parameters given in init.
+        Answer type read in `Yandex Docs <https://cloud.yandex.com/en/docs/speechkit/stt/streaming#response>`_.
+
+        :param audio: Async iterator of audio data
+        :return: Yields recognized data in raw format
+        :rtype: speechkit._recognition.yandex.cloud.ai.stt.v2.stt_service_pb2.StreamingRecognitionResponse
+        """
+        if not hasattr(audio, '__aiter__'):
+            raise RuntimeError("`audio` must be async iterator.")
+
+        call = self._get_stub().StreamingRecognize(self._gen(audio), metadata=(self._headers,), timeout=self._timeout)
+        try:
+            async for chunk in call:
+                yield chunk
+        finally:
+            # Stops reading of audio iterator and frees the stream if consumer stopped early or task was cancelled
+            call.cancel()
+
+    async def recognize(self, audio):
+        """
+        Recognize streaming data, audio must yield audio data with parameters given in init.
+
+        :param audio: Async iterator of audio data
+        :return: yields tuple, where first element is list of alternatives text, second final (boolean) flag,
+            third endOfUtterance (boolean) flag, ex. (['text'], False, False)
+        :rtype: tuple
+        """
+        async for item in self.recognize_raw(audio):
+            alternatives = [i.text for i in item.chunks[0].alternatives]
+            final = item.chunks[0].final
+            end_of_utterance = item.chunks[0].end_of_utterance
+            yield alternatives, final, end_of_utterance
+
+    async def close(self):
+        """Closes channel."""
+
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+            self._stub = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
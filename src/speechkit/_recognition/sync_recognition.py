@@ -1,13 +1,107 @@
+import collections
+import copy
 import io
-import sys
+import json
+import mmap
+import os
+import tempfile
+import time
 import uuid
 from pathlib import Path
 
 import boto3
-import requests
 
+from speechkit._batch import iter_bounded
+from speechkit._limiter import AdaptiveLimiter, is_overloaded, backoff_delay
+from speechkit._pcm import vad_segments, pause_map, trim_pauses
 from speechkit.exceptions import RequestError
 
+SHORT_RECOGNITION_URL = 'https://stt.api.cloud.yandex.net/speech/v1/stt:recognize'
+LONG_RECOGNITION_URL = 'https://transcribe.api.cloud.yandex.net/speech/stt/v2/longRunningRecognize'
+OPERATION_URL = 'https://operation.api.cloud.yandex.net/operations/{id}'
+
+RecognitionResult = collections.namedtuple('RecognitionResult', ['index', 'request', 'text', 'error', 'latency'])
+RecognitionResult.__doc__ = """
+Result of one batch recognition item: position in input, request, recognized text, exception and seconds spent
+on the item including retries. Exactly one of `text` and `error` is set.
+"""
+
+
+class _BufferReader:
+    """
+    Read-only file-like wrapper over memoryview, `read` returns slices of the view, so buffer is sent
+    as request body without copying. `__len__` lets HTTP client set Content-Length.
+    """
+
+    def __init__(self, view):
+        self._view = view
+        self._position = 0
+
+    def __len__(self):
+        return len(self._view) - self._position
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._position + size, len(self._view))
+        chunk = self._view[self._position:end]
+        self._position = end
+        return chunk
+
+
+def _audio_payload(data):
+    """
+    Converts audio data to request body without copying
+
+    :type data: bytes | bytearray | memoryview | mmap.mmap | io.BytesIO | io.BufferedIOBase
+    :return: tuple (body, size in bytes), body is bytes, memoryview or binary file positioned at audio start
+    """
+    if isinstance(data, bytes):
+        return data, len(data)
+    if isinstance(data, io.BytesIO):
+        view = data.getbuffer()[data.tell():]
+        return view, len(view)
+    if isinstance(data, (bytearray, memoryview, mmap.mmap)):
+        view = memoryview(data).cast('B')
+        return view, len(view)
+    if hasattr(data, 'read') and hasattr(data, 'fileno') and not isinstance(data, io.TextIOBase):
+        return data, os.fstat(data.fileno()).st_size - data.tell()
+    raise ValueError("Data must be bytes, bytearray, memoryview, mmap, bytes io or binary file.")
+
+
+def _audio_buffer(data):
+    """Returns audio data as bytes or memoryview, reads files"""
+
+    body, _ = _audio_payload(data)
+    return body.read() if hasattr(body, 'read') else body
+
+
+def _error_answer(text):
+    """Error response body as dict, overloaded gateways may answer with plain text"""
+
+    try:
+        answer = json.loads(text)
+    except ValueError:
+        answer = None
+    return answer if isinstance(answer, dict) else {'message': text}
+
+
+def _preprocess(data, preprocessor, kwargs, pause_options=None):
+    """
+    Converts `lpcm` audio with preprocessor and removes pauses if `pause_options` is set,
+    returns audio data and recognition params describing it
+    """
+    if preprocessor is None and pause_options is None:
+        return data, kwargs
+    # Preprocessor sets `lpcm` format, without it API default is `oggopus` and format must be given explicitly
+    if kwargs.get('format', 'lpcm' if preprocessor is not None else None) != 'lpcm':
+        raise ValueError("Preprocessor and pause removal support only `format='lpcm'`.")
+
+    data = _audio_buffer(data)
+    if preprocessor is not None:
+        data, kwargs = preprocessor.process(data), dict(kwargs, **preprocessor.params)
+    if pause_options is not None:
+        data, _ = trim_pauses(data, int(kwargs.get('sampleRateHertz', '48000')), **pause_options)
+    return data, kwargs
+
 
 class ShortAudioRecognition:
     """
@@ -21,21 +115,44 @@ class ShortAudioRecognition:
     If your file is larger, longer, or has more audio channels, use :py:class:`speechkit.RecognitionLongAudio`.
     """
 
-    def __init__(self, session):
+    def __init__(self, session, cache=None):
         """
         Initialization :py:class:`speechkit.ShortAudioRecognition`
 
         :param speechkit.Session session: Session instance for auth
+        :param speechkit.RecognitionCache cache: Cache of recognized text, repeated audio is not sent again
         """
-        self._headers = session.header
+        self._session = session
         self._folder_id = session.folder_id
+        self._cache = cache
+
+    @property
+    def _headers(self):
+        """Actual auth headers, read from session on every request so refreshed IAM token is used"""
+
+        return self._session.header
+
+    def _cache_lookup(self, data, kwargs):
+        """Returns audio, cache key and cached text, key is None if cache is disabled"""
+
+        if self._cache is None:
+            return data, None, None
+        # Files are read once here, so the same bytes are hashed and sent
+        data = _audio_buffer(data)
+        key = self._cache.make_key(data, kwargs)
+        return data, key, self._cache.get(key)
+
+    def _cache_put(self, key, text):
+        if key is not None and text is not None:
+            self._cache.put(key, text)
 
-    def recognize(self, data, **kwargs):
+    def recognize(self, data, preprocessor=None, remove_pauses=False, pause_options=None, **kwargs):
         """
         Recognize text from BytesIO data given, which is audio
 
-        :type data: io.BytesIO, bytes
-        :param data: Data with audio samples to recognize
+        :type data: bytes | bytearray | memoryview | mmap.mmap | io.BytesIO | io.BufferedIOBase
+        :param data: Data with audio samples to recognize. Buffers and open binary files are sent
+            without copying, file is sent from its current position
 
         :type lang: string
         :param lang: The language to use for recognition. Acceptable values:
@@ -71,11 +188,136 @@ class ShortAudioRecognition:
         :param string folderId: ID of the folder that you have access to. Don't specify this field if
             you make a request on behalf of a service account.
 
+        :param speechkit.PcmPreprocessor | None preprocessor: Downmixes and resamples `lpcm` audio before upload,
+            `format` and `sampleRateHertz` are set from it
+
+        :param boolean remove_pauses: Remove long pauses from `lpcm` audio before upload, requires `numpy`.
+            Upload is smaller and billed duration is shorter. Default False
+
+        :param dict pause_options: Options of pause detection, see `speechkit._pcm.pause_map`
+
         :return: The recognized text
         :rtype: string
         """
-        if not isinstance(data, (io.BytesIO, bytes)):
-            raise ValueError("Data must be bytes io or bytes.")
+        data, kwargs = _preprocess(data, preprocessor, kwargs, (pause_options or {}) if remove_pauses else None)
+        data, key, text = self._cache_lookup(data, kwargs)
+        if text is not None:
+            return text
+
+        body, size = _audio_payload(data)
+        params = self._request_params(size, **kwargs)
+        if isinstance(body, memoryview):
+            body = _BufferReader(body)
+        answer = self._session.transport.post(SHORT_RECOGNITION_URL, params=params, data=body, headers=self._headers)
+
+        if answer.ok:
+            text = answer.json().get('result')
+            self._cache_put(key, text)
+            return text
+        else:
+            raise RequestError(_error_answer(answer.text), status_code=answer.status_code)
+
+    def _recognize_adaptive(self, limiter, max_retries, request):
+        """Recognizes one batch item under limiter, retries overload responses, returns (text, error, latency)"""
+
+        data = request.get('data')
+        # Files are read by request, retry has to send them from the same position
+        position = data.tell() if hasattr(data, 'seek') else None
+        start = time.monotonic()
+        for attempt in range(max_retries + 1):
+            if position is not None:
+                data.seek(position)
+            token = limiter.acquire()
+            overloaded = False
+            try:
+                return self.recognize(**request), None, time.monotonic() - start
+            except Exception as e:
+                overloaded = is_overloaded(e)
+                if not overloaded or attempt == max_retries:
+                    return None, e, time.monotonic() - start
+            finally:
+                limiter.release(token, overloaded)
+            time.sleep(backoff_delay(attempt))
+
+    def recognize_many(self, requests, max_workers=8, ordered=True, max_retries=3):
+        """
+        Recognizes many short audios concurrently over session connection pool. Requests are taken from iterable
+        lazily, so it may be a queue consumer of any length. Number of requests in flight is at most `max_workers`
+        and is adapted to service load: it is halved when service answers 429 or 503 and grows back by one
+        step per successful round. Overloaded requests are retried with exponential backoff. Errors are reported
+        per item and don't stop the batch.
+
+        :Example:
+
+        >>> commands = ({'data': audio, 'format': 'lpcm', 'sampleRateHertz': '16000'} for audio in queue)
+        >>> for result in recognize_short_audio.recognize_many(commands, max_workers=32, ordered=False):
+        ...     print(result.index, result.text, result.latency)
+        ...
+
+        :param iterable requests: Iterable of dicts with `data` and other params of
+            :py:meth:`speechkit.ShortAudioRecognition.recognize`
+        :param integer max_workers: Maximum number of concurrent requests, keep it not greater than
+            `pool_maxsize` of session to reuse connections. Default 8
+        :param boolean ordered: Yield results in input order if True, as soon as they are ready otherwise.
+            Default True
+        :param integer max_retries: Maximum number of retries of one item after overload response. Default 3
+        :return: Yields named tuples `(index, request, text, error, latency)`
+        :rtype: RecognitionResult
+        """
+        limiter = AdaptiveLimiter(max_workers)
+
+        def recognize(**request):
+            return self._recognize_adaptive(limiter, max_retries, request)
+
+        for result in iter_bounded(recognize, requests, max_workers=max_workers, ordered=ordered):
+            if result.error is not None:
+                raise result.error
+            yield RecognitionResult(result.index, result.request, *result.data)
+
+    @staticmethod
+    def _segment_requests(data, vad_options, kwargs):
+        """Splits `lpcm` audio at pauses, returns segment bounds in seconds and recognition requests"""
+
+        data, kwargs = _preprocess(data, kwargs.pop('preprocessor', None), kwargs)
+        if kwargs.get('format') != 'lpcm':
+            raise ValueError("Segmented recognition supports only `format='lpcm'`.")
+
+        view = memoryview(_audio_buffer(data)).cast('B')
+        sample_rate = int(kwargs.get('sampleRateHertz', '48000'))
+        segments = vad_segments(view, sample_rate, **vad_options)
+        bounds = [(start / sample_rate, end / sample_rate) for start, end in segments]
+        requests = [dict(kwargs, data=view[start * 2:end * 2]) for start, end in segments]
+        return bounds, requests
+
+    def recognize_segmented(self, data, max_workers=8, vad_options=None, **kwargs):
+        """
+        Recognize `lpcm` audio longer than 30 seconds with short audio recognition, requires `numpy`. Audio is cut
+        at pauses into segments that fit into short recognition limits, segments are recognized in parallel.
+        Accepts same params as :py:meth:`speechkit.ShortAudioRecognition.recognize`, `format` must be `lpcm`.
+
+        :Example:
+
+        >>> for start, end, text in recognize_short_audio.recognize_segmented(voicemail, format='lpcm',
+        ...                                                                    sampleRateHertz='8000'):
+        ...     print('{:.1f}-{:.1f}: {}'.format(start, end, text))
+        ...
+
+        :param data: Audio data, same types as in :py:meth:`speechkit.ShortAudioRecognition.recognize`
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :param dict vad_options: Options of voice activity detection, see `speechkit._pcm.vad_segments`
+        :return: List of tuples (start, end, text), start and end are offsets in seconds
+        :rtype: list[tuple[float, float, string]]
+        """
+        bounds, requests = self._segment_requests(data, vad_options or {}, kwargs)
+        texts = []
+        for result in iter_bounded(self.recognize, requests, max_workers=max_workers):
+            if result.error is not None:
+                raise result.error
+            texts.append(result.data)
+        return [(start, end, text) for (start, end), text in zip(bounds, texts)]
+
+    def _request_params(self, size, **kwargs):
+        """Checks audio size and params for :py:meth:`ShortAudioRecognition.recognize`, returns query params"""
 
         if 'lang' in kwargs:
             if not type(kwargs['lang']) is str:
@@ -85,12 +327,12 @@ class ShortAudioRecognition:
         if self._headers is None:
             raise RuntimeError("You must call `ShortAudioRecognition.__init__()` first.")
 
-        if sys.getsizeof(data) > 1024 * 1024:
-            raise ValueError("Maximum file size: 1 MB. Got {} bytes.".format(sys.getsizeof(data)))
+        if size > 1024 * 1024:
+            raise ValueError("Maximum file size: 1 MB. Got {} bytes.".format(size))
 
         if kwargs.get('format') == 'lpcm':
-            sample_rate_hertz = int(kwargs.get('sample_rate_hertz', '48000'))
-            seconds_duration = (sys.getsizeof(data) * 8) / (sample_rate_hertz * 1 * 16)
+            sample_rate_hertz = int(kwargs.get('sampleRateHertz', '48000'))
+            seconds_duration = (size * 8) / (sample_rate_hertz * 1 * 16)
 
             if seconds_duration > 30:
                 raise ValueError(
@@ -99,13 +341,7 @@ class ShortAudioRecognition:
 
         params = {'folderId': self._folder_id} if self._folder_id else {}
         params.update(kwargs)
-        url = 'https://stt.api.cloud.yandex.net/speech/v1/stt:recognize'
-        answer = requests.post(url, params=params, data=data, headers=self._headers)
-
-        if answer.ok:
-            return answer.json().get('result')
-        else:
-            raise RequestError(answer.json())
+        return params
 
 
 class RecognitionLongAudio:
@@ -128,6 +364,9 @@ class RecognitionLongAudio:
     ...'raw recognized text'
     """
 
+    SPOOL_SIZE = 8 * 1024 * 1024
+    """Preprocessed audio up to this size in bytes is kept in memory before upload, larger goes to temporary file"""
+
     def __init__(self, session, service_account_id, aws_bucket_name=None,
                  aws_credentials_description='Default AWS credentials created by `speechkit` python SDK',
                  aws_region_name='ru-central1', aws_access_key_id=None, aws_secret=None):
@@ -146,9 +385,10 @@ class RecognitionLongAudio:
         """
         self._id = None
         self._answer_data = None
+        self._time_map = None
         self._aws_file_name = None
 
-        self._headers = session.header
+        self._session = session
         if session.folder_id:
             raise ValueError("folder_id specify is not supported, use jwt.")
         if session.auth_method == session.API_KEY:
@@ -174,6 +414,12 @@ class RecognitionLongAudio:
             self._aws_bucket_name = 'py_speechkit_' + str(uuid.uuid4())
             self._s3.create_bucket(Bucket=self._aws_bucket_name)
 
+    @property
+    def _headers(self):
+        """Actual auth headers, read from session on every request so refreshed IAM token is used"""
+
+        return self._session.header
+
     @staticmethod
     def _init_aws(**kwargs):
         """Get s3 session
@@ -219,10 +465,10 @@ class RecognitionLongAudio:
 
         url_aws_credentials = 'https://iam.api.cloud.yandex.net/iam/aws-compatibility/v1/accessKeys'
         data_aws_credentials = {'description': aws_credentials_description, 'serviceAccountId': service_account_id}
-        answer = requests.post(url_aws_credentials, headers=session.header, json=data_aws_credentials)
+        answer = session.transport.post(url_aws_credentials, headers=session.header, json=data_aws_credentials)
 
         if not answer.ok:
-            raise RequestError(answer.json())
+            raise RequestError(answer.json(), status_code=answer.status_code)
 
         answer = answer.json()
         access_key_id = answer.get('accessKey', {}).get('keyId')
@@ -276,7 +522,7 @@ class RecognitionLongAudio:
         return self._s3.delete_objects(
             Bucket=bucket_name, Delete={'Objects': [{'Key': aws_file_name}]})
 
-    def send_for_recognition(self, file_path, **kwargs):
+    def send_for_recognition(self, file_path, preprocessor=None, remove_pauses=False, pause_options=None, **kwargs):
         """
         Send a file for recognition
 
@@ -315,17 +561,88 @@ class RecognitionLongAudio:
         :param boolean rawResults: Flag that indicates how to write numbers.
             `true`: In words. `false` (default): In figures.
 
+        :param speechkit.PcmPreprocessor | None preprocessor: Downmixes and resamples LPCM file before upload,
+            `audioEncoding`, `sampleRateHertz` and `audioChannelCount` are set from it
+
+        :param boolean remove_pauses: Remove long pauses from single-channel LPCM file before upload, requires
+            `numpy`. Upload is smaller and billed duration is shorter, word timestamps returned by
+            :py:meth:`speechkit.RecognitionLongAudio.get_data` are mapped back to original file. Default False
+
+        :param dict pause_options: Options of pause detection, see `speechkit._pcm.pause_map`
+
         :rtype: None
         """
-        self._aws_file_name = Path(file_path).name + str(uuid.uuid4())
-        self._aws_upload_file(file_path, self._aws_bucket_name, self._aws_file_name)
-        aws_presigned_url = self._create_presigned_url(self._aws_bucket_name, self._aws_file_name)
+        kwargs = self._preprocessed_params(preprocessor, kwargs, remove_pauses)
+        aws_presigned_url = self._upload(file_path, preprocessor, (pause_options or {}) if remove_pauses else None,
+                                         int(kwargs.get('sampleRateHertz', 48000)))
+        data = self._recognition_request_data(aws_presigned_url, **kwargs)
+        answer = self._session.transport.post(LONG_RECOGNITION_URL, headers=self._headers, json=data)
+        if answer.ok:
+            self._id = answer.json().get('id')
+        else:
+            raise RequestError(answer.json(), status_code=answer.status_code)
 
-        url = "https://transcribe.api.cloud.yandex.net/" \
-              "speech/stt/v2/longRunningRecognize"
+    @staticmethod
+    def _preprocessed_params(preprocessor, kwargs, remove_pauses=False):
+        """Recognition params describing audio converted by preprocessor"""
+
+        if remove_pauses and preprocessor is None:
+            if kwargs.get('audioEncoding') != 'LINEAR16_PCM' or int(kwargs.get('audioChannelCount', 1)) != 1:
+                raise ValueError("Pause removal supports only single-channel `audioEncoding='LINEAR16_PCM'`.")
+        if preprocessor is None:
+            return kwargs
+        if kwargs.get('audioEncoding', 'LINEAR16_PCM') != 'LINEAR16_PCM':
+            raise ValueError("Preprocessor supports only `audioEncoding='LINEAR16_PCM'`.")
+        return dict(kwargs, audioEncoding='LINEAR16_PCM', sampleRateHertz=preprocessor.target_rate,
+                    audioChannelCount=1)
+
+    def _upload(self, file_path, preprocessor=None, pause_options=None, sample_rate=None):
+        """
+        Uploads file to object storage, converts it with preprocessor and removes pauses on the way,
+        returns presigned URL
+        """
+        self._aws_file_name = Path(file_path).name + str(uuid.uuid4())
+        self._time_map = None
+        if preprocessor is None and pause_options is None:
+            self._aws_upload_file(file_path, self._aws_bucket_name, self._aws_file_name)
+        else:
+            with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE) as converted:
+                self._convert(file_path, converted, preprocessor, pause_options, sample_rate)
+                converted.seek(0)
+                self._s3.upload_fileobj(converted, self._aws_bucket_name, self._aws_file_name)
+        return self._create_presigned_url(self._aws_bucket_name, self._aws_file_name)
+
+    def _convert(self, file_path, output, preprocessor, pause_options, sample_rate):
+        """Writes file converted with preprocessor and without pauses to output, stores map of kept audio"""
+
+        with open(file_path, 'rb') as source:
+            chunks = iter(lambda: source.read(self.SPOOL_SIZE), b'')
+            if pause_options is None:
+                for chunk in preprocessor.stream(chunks):
+                    output.write(chunk)
+                return
+
+            if preprocessor is not None:
+                data = b''.join(preprocessor.stream(chunks))
+            elif os.fstat(source.fileno()).st_size:
+                data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = b''
+
+            try:
+                with memoryview(data) as view:
+                    self._time_map = pause_map(view, sample_rate, **pause_options)
+                    for start, _, length in self._time_map.spans:
+                        output.write(view[start * 2:(start + length) * 2])
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
 
-        data = {
+    @staticmethod
+    def _recognition_request_data(aws_presigned_url, **kwargs):
+        """Request body for long running recognition"""
 
+        return {
             "config": {
                 "specification": {
                     **kwargs
@@ -335,11 +652,14 @@ class RecognitionLongAudio:
                 "uri": aws_presigned_url
             }
         }
-        answer = requests.post(url, headers=self._headers, json=data)
-        if answer.ok:
-            self._id = answer.json().get('id')
-        else:
-            raise RequestError(answer.json())
+
+    def _operation_url(self):
+        """URL to monitor recognition operation"""
+
+        if self._id is None:
+            raise RuntimeError("You must send for recognition first.")
+
+        return OPERATION_URL.format(id=self._id)
 
     def get_recognition_results(self):
         """
@@ -349,11 +669,8 @@ class RecognitionLongAudio:
         :return: State of recognition is done or not
         :rtype: boolean
         """
-        if self._id is None:
-            raise RuntimeError("You must send for recognition first.")
-
-        url = "https://operation.api.cloud.yandex.net/operations/{id}".format(id=self._id)
-        self._answer_data = requests.get(url, headers=self._headers)
+        url = self._operation_url()
+        self._answer_data = self._session.transport.get(url, headers=self._headers)
         if self._answer_data.ok:
             self._answer_data = self._answer_data.json()
             done = self._answer_data.get('done')
@@ -362,7 +679,7 @@ class RecognitionLongAudio:
 
             return done
         else:
-            raise RequestError(self._answer_data.json())
+            raise RequestError(self._answer_data.json(), status_code=self._answer_data.status_code)
 
     def get_data(self):
         """
@@ -398,7 +715,23 @@ class RecognitionLongAudio:
 
         if self._answer_data is None:
             raise ValueError("You must call `RecognitionLongAudio.get_recognition_results` first")
-        return self._answer_data.get('response', {}).get('chunks', [])
+        chunks = self._answer_data.get('response', {}).get('chunks', [])
+        if self._time_map is None:
+            return chunks
+        return self._original_timestamps(chunks)
+
+    def _original_timestamps(self, chunks):
+        """Copy of chunks with word timestamps mapped from audio without pauses to original audio"""
+
+        chunks = copy.deepcopy(chunks)
+        for chunk in chunks:
+            for alternative in chunk.get('alternatives', []):
+                for word in alternative.get('words', []):
+                    for field in ('startTime', 'endTime'):
+                        if field in word:
+                            seconds = self._time_map.to_original(float(word[field].rstrip('s')))
+                            word[field] = '{:.3f}s'.format(seconds)
+        return chunks
 
     def get_raw_text(self):
         """
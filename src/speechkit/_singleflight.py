@@ -0,0 +1,121 @@
+import asyncio
+import threading
+
+
+class _Call:
+    """In-flight call shared by callers with the same key"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: first caller runs the function, callers that come while it is
+    running wait and get the same result or exception. Nothing is kept after the call completes. Safe to share
+    between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._coalesced = 0
+
+    @property
+    def coalesced(self):
+        """Number of calls served by another in-flight call"""
+
+        return self._coalesced
+
+    def do(self, key, func):
+        """
+        Runs `func()` or waits for in-flight call with same key
+
+        :param key: Hashable call key
+        :param callable func: Function without arguments
+        :return: Result of `func()`
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _AsyncCall:
+    """In-flight call shared by coroutines with the same key"""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of :py:class:`speechkit._singleflight.SingleFlight` for calls on one event loop. Function runs
+    as separate task, so cancellation of any caller, including the first one, doesn't cancel others. Task is
+    cancelled when all callers are cancelled.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._coalesced = 0
+
+    @property
+    def coalesced(self):
+        """Number of calls served by another in-flight call"""
+
+        return self._coalesced
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key, func):
+        """
+        Awaits `func()` or waits for in-flight call with same key
+
+        :param key: Hashable call key
+        :param func: Coroutine function without arguments
+        :return: Result of `await func()`
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self._coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+                self._forget(key, call)
@@ -1,40 +1,351 @@
-import requests
+import asyncio
+import collections
+import os
+import re
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+from speechkit._batch import iter_bounded, aiter_bounded
+from speechkit._cache import SynthesisCache
+from speechkit._ogg import concatenate_opus
+from speechkit._pcm import splice, trim_silence, to_array
+from speechkit._prefetch import Prefetcher
+from speechkit._singleflight import SingleFlight, AsyncSingleFlight
+from speechkit._wav import wav_header, write_wav, STREAMING_SIZE, HEADER_SIZE, _seekable
 from speechkit.exceptions import RequestError
 
+SYNTHESIS_URL = 'https://tts.api.cloud.yandex.net/speech/v1/tts:synthesize'
+MAX_TEXT_LENGTH = 5000
+
+_PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…;])\s+')
+_SSML_TAG = re.compile(r'(<[^>]*>)')
+_SSML_SPEAK = re.compile(r'\s*(<speak\b[^>]*>)(.*)(</speak>)\s*$', re.S)
+_SSML_ELEMENT = re.compile(r'(<(\w+)\b[^>]*>)(.*)(</\2>)$', re.S)
+_SSML_PARAGRAPH = re.compile(r'\s*<p\b')
+
+
+def _pack(units, max_length, separator):
+    """Greedily joins units into pieces not longer than max_length"""
+
+    pieces = []
+    current = ''
+    for unit in units:
+        if not unit.strip():
+            continue
+        candidate = current + separator + unit if current else unit
+        if len(candidate) <= max_length:
+            current = candidate
+        else:
+            if current:
+                pieces.append(current)
+            current = unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_words(text, max_length):
+    """Splits text on whitespace, cuts words longer than max_length"""
+
+    units = []
+    for word in text.split():
+        units.extend(word[i:i + max_length] for i in range(0, len(word), max_length))
+    return _pack(units, max_length, ' ')
+
+
+def _split_text(text, max_length=MAX_TEXT_LENGTH, pack=True):
+    """
+    Splits text into pieces not longer than max_length at paragraph boundaries, sentence boundaries
+    if paragraph is too long, whitespace if sentence is too long.
+
+    :param boolean pack: Join consecutive pieces while they fit in max_length, otherwise return every sentence
+    :rtype: list[string]
+    """
+    units = []
+    for paragraph in _PARAGRAPH_BOUNDARY.split(text.strip()):
+        if pack and len(paragraph) <= max_length:
+            units.append(paragraph)
+            continue
+        for sentence in _SENTENCE_BOUNDARY.split(paragraph):
+            if len(sentence) <= max_length:
+                units.append(sentence)
+            else:
+                units.extend(_split_words(sentence, max_length))
+    return _pack(units, max_length, ' ') if pack else [unit for unit in units if unit.strip()]
+
+
+def _ssml_units(body):
+    """Splits SSML body into top-level elements and sentences of top-level text"""
+
+    units = []
+    current = ''
+    depth = 0
+    for token in _SSML_TAG.split(body):
+        if not token:
+            continue
+        if token.startswith('<'):
+            current += token
+            if token.startswith('</'):
+                depth -= 1
+                if depth == 0:
+                    units.append(current)
+                    current = ''
+            elif not token.endswith('/>') and not token.startswith(('<!', '<?')):
+                depth += 1
+        elif depth > 0:
+            current += token
+        else:
+            sentences = _SENTENCE_BOUNDARY.split(token)
+            for sentence in sentences[:-1]:
+                units.append(current + sentence)
+                current = ''
+            current += sentences[-1]
+    if current:
+        units.append(current)
+    return units
+
+
+def _split_ssml_body(body, max_length, pack=True):
+    """Splits SSML body, too long elements are split inside and each piece is wrapped with the same element"""
+
+    pieces = []
+    for unit in _ssml_units(body):
+        if len(unit) <= max_length and (pack or not _SSML_PARAGRAPH.match(unit)):
+            pieces.append(unit)
+            continue
+
+        element = _SSML_ELEMENT.match(unit.strip())
+        if element is not None:
+            open_tag, _, inner, close_tag = element.groups()
+            inner_length = max_length - len(open_tag) - len(close_tag)
+            if inner_length > 0:
+                pieces.extend(open_tag + piece + close_tag for piece in _split_ssml_body(inner, inner_length, pack))
+                continue
+        elif '<' not in unit:
+            pieces.extend(_split_words(unit, max_length))
+            continue
+        raise ValueError("Can't split SSML fragment to pieces shorter than {} characters.".format(max_length))
+    return _pack(pieces, max_length, ' ') if pack else [piece for piece in pieces if piece.strip()]
+
+
+def _split_ssml(ssml, max_length=MAX_TEXT_LENGTH, pack=True):
+    """
+    Splits SSML into valid SSML documents not longer than max_length at paragraph and sentence boundaries.
+
+    :param boolean pack: Join consecutive pieces while they fit in max_length, otherwise return every sentence
+    :rtype: list[string]
+    """
+    speak = _SSML_SPEAK.match(ssml)
+    if speak is None:
+        raise ValueError("SSML must be wrapped with <speak> tag.")
+
+    open_tag, body, close_tag = speak.groups()
+    pieces = _split_ssml_body(body, max_length - len(open_tag) - len(close_tag), pack)
+    return [open_tag + piece + close_tag for piece in pieces]
+
+
+def _split_request(params, max_length, pack=True):
+    """
+    Pops `text` or `ssml` from request params and splits it
+
+    :return: tuple (field name, pieces)
+    """
+    if 'text' in params:
+        return 'text', _split_text(params.pop('text'), max_length, pack)
+    if 'ssml' in params:
+        return 'ssml', _split_ssml(params.pop('ssml'), max_length, pack)
+    raise ValueError("`text` or `ssml` required.")
+
+
+def _wav_request(params):
+    """Replaces `wav` format with `lpcm` in request params, returns sample rate for WAV header or None"""
+
+    if params.get('format') != 'wav':
+        return None
+    params['format'] = 'lpcm'
+    return int(params.get('sampleRateHertz', 48000))
+
+
+def _join_audio(pieces, audio_format):
+    """Joins synthesized audio pieces, Ogg Opus streams are merged into one logical stream"""
+
+    if audio_format == 'oggopus':
+        return concatenate_opus(pieces)
+    return b''.join(pieces)
+
 
 class SpeechSynthesis:
     """Generates speech from received text."""
 
-    def __init__(self, session):
+    CHUNK_SIZE = 8192
+    """Default size of audio chunks in bytes for streaming output, value: 8192"""
+
+    FRAGMENT_CACHE_BYTES = 16 * 1024 * 1024
+    """Size limit of cached fixed fragments of templates in bytes, value: 16 MiB"""
+
+    _single_flight_class = SingleFlight
+
+    def __init__(self, session, cache=None, coalesce=False):
         """
         Initialize :py:class:`speechkit.SpeechSynthesis`
 
         :param speechkit.Session session: Session instance for auth
+        :param speechkit.SynthesisCache cache: Cache of synthesized audio, repeated requests are served from it
+            without network. Disabled by default
+        :param boolean coalesce: Coalesce identical concurrent requests: while request with same text and params
+            is in flight, other callers wait for its result instead of making new API calls. Default False
         """
-        self._headers = session.header
+        self._session = session
         self._folder_id = session.folder_id
+        self._cache = cache
+        self._single_flight = self._single_flight_class() if coalesce else None
+        self._prefetcher = None
+        self._fragments = SynthesisCache(max_memory_bytes=self.FRAGMENT_CACHE_BYTES)
+        self._local = threading.local()
 
-    def _synthesize_stream(self, **kwargs):
-        """Creates request to generate speech from text"""
+    @property
+    def _headers(self):
+        """Actual auth headers, read from session on every request so refreshed IAM token is used"""
+
+        return self._session.header
+
+    def _request_params(self, **kwargs):
+        """Request form data with folder id from session"""
 
-        url = 'https://tts.api.cloud.yandex.net/speech/v1/tts:synthesize'
         params = {'folderId': self._folder_id} if self._folder_id else {}
         params.update(kwargs)
-        answer = requests.post(url, headers=self._headers, data=params, stream=True)
+        return params
+
+    def _open_stream(self, **kwargs):
+        """Creates request to generate speech from text, returns response with not yet read body"""
+
+        answer = self._session.transport.post(
+            SYNTHESIS_URL, headers=self._headers, data=self._request_params(**kwargs), stream=True
+        )
 
         if not answer.ok:
-            raise RequestError(answer.json())
+            raise RequestError(answer.json(), status_code=answer.status_code)
 
         answer.raw.decode_content = True
-        return answer.content
+        return answer
+
+    @staticmethod
+    def _iter_content(answer, chunk_size):
+        """Yields response body chunks as they arrive and releases connection"""
+
+        try:
+            for chunk in answer.iter_content(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            answer.close()
+
+    def _cache_lookup(self, params, wait_prefetch=True):
+        """Returns cache key and audio from cache or prefetched audio, key is None if cache is disabled"""
+
+        key = data = None
+        if self._cache is not None:
+            key = self._cache.make_key(params)
+            data = self._cache.get(key)
+        if data is None and self._prefetcher is not None:
+            data = self._prefetcher.get(key or SynthesisCache.make_key(params), wait=wait_prefetch)
+        return key, data
+
+    def enable_prefetch(self, max_bytes=16 * 1024 * 1024, ttl=300, max_pending=16):
+        """
+        Starts background worker for :py:meth:`speechkit.SpeechSynthesis.prefetch` hints. One worker renders hints
+        one by one, so prefetching never takes more than one connection from foreground requests.
+
+        :param integer max_bytes: Size limit of prefetched audio in bytes. Default 16 MiB
+        :param float ttl: Seconds prefetched audio is kept if not used. Default 300
+        :param integer max_pending: Maximum number of queued hints, oldest hints are dropped. Default 16
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+
+        def fetch(params):
+            key = self._cache.make_key(params) if self._cache is not None else None
+            return SpeechSynthesis._fetch(self, key, params)
+
+        self._prefetcher = Prefetcher(fetch, max_bytes=max_bytes, ttl=ttl, max_pending=max_pending)
+
+    def disable_prefetch(self):
+        """Stops background worker and drops prefetched audio"""
+
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def prefetch(self, **kwargs):
+        """
+        Hints request that may be needed soon. It is rendered in background, following
+        :py:meth:`speechkit.SpeechSynthesis.synthesize_stream` call with same params returns prefetched audio
+        without waiting for API, or waits for the hinted request if it is still being rendered.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`.
+
+        :Example:
+
+        >>> synthesize_audio.enable_prefetch()
+        >>> synthesize_audio.prefetch(text='Please say your account number.')
+        >>> synthesize_audio.prefetch(text='Sorry, I did not understand.')
+        >>> audio = synthesize_audio.synthesize_stream(text='Please say your account number.')
+        """
+        if self._prefetcher is None:
+            raise RuntimeError("Prefetch is disabled, call `enable_prefetch` first.")
+        if 'text' in kwargs and len(kwargs.get('text', '')) > MAX_TEXT_LENGTH:
+            raise ValueError("Text must be less than 5000 characters")
+
+        # `wav` is synthesized as `lpcm`, key must match the one looked up by `synthesize_stream`
+        _wav_request(kwargs)
+        self._prefetcher.hint(SynthesisCache.make_key(kwargs), kwargs)
+
+    def _iter_audio(self, chunk_size, **kwargs):
+        """Yields audio chunks from cache or as they arrive from API, complete audio is stored in cache"""
+
+        key, data = self._cache_lookup(kwargs)
+        if data is not None:
+            for i in range(0, len(data), chunk_size):
+                yield data[i:i + chunk_size]
+            return
+
+        chunks = self._iter_content(self._open_stream(**kwargs), chunk_size)
+        if key is None:
+            yield from chunks
+            return
+
+        received = bytearray()
+        for chunk in chunks:
+            received += chunk
+            yield chunk
+        self._cache.put(key, received)
+
+    def _fetch(self, key, params):
+        """Requests audio from API and stores it in cache"""
+
+        data = self._open_stream(**params).content
+        if key is not None:
+            self._cache.put(key, data)
+        return data
+
+    def _synthesize_stream(self, **kwargs):
+        """Creates request to generate speech from text"""
+
+        key, data = self._cache_lookup(kwargs)
+        if data is not None:
+            return data
+        if self._single_flight is None:
+            return self._fetch(key, kwargs)
+        return self._single_flight.do(key or SynthesisCache.make_key(kwargs), lambda: self._fetch(key, kwargs))
 
     def synthesize(self, file_path, **kwargs):
         """
         Generates speech from received text and saves it to file
 
-        :type file_path: string
-        :param file_path: The path to file where store data
+        :type file_path: string | io.RawIOBase
+        :param file_path: The path to file where store data or any object with `write` method.
+            Audio is written incrementally, as it arrives.
 
         :type text: string
         :param text: UTF-8 encoded text to be converted to speech.
@@ -88,6 +399,9 @@ class SpeechSynthesis:
             * `oggopus` (default) — Data in the audio file is encoded using the OPUS audio codec and compressed using
                 the OGG container format (OggOpus).
 
+            * `wav` — LPCM audio with WAV header. Header is written first and audio is streamed after it, sizes in
+                header are patched at the end if file is seekable.
+
         :type sampleRateHertz: string
         :param sample_rate_hertz: The sampling frequency of the synthesized audio. Used
             if format is set to lpcm. Acceptable values: * `48000` (default): Sampling rate of 48 kHz. * `16000`:
@@ -102,9 +416,23 @@ class SpeechSynthesis:
         if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
             raise ValueError("Text must be less than 5000 characters")
 
-        with open(file_path, "wb") as f:
-            audio_data = self._synthesize_stream(**kwargs)
-            f.write(audio_data)
+        sample_rate = _wav_request(kwargs)
+        chunks = self._iter_audio(self.CHUNK_SIZE, **kwargs)
+        if hasattr(file_path, 'write'):
+            self._write_audio(file_path, chunks, sample_rate)
+        else:
+            with open(file_path, "wb") as f:
+                self._write_audio(f, chunks, sample_rate)
+
+    @staticmethod
+    def _write_audio(f, chunks, sample_rate):
+        """Writes audio chunks to file, with WAV header if sample_rate is set"""
+
+        if sample_rate is not None:
+            write_wav(f, chunks, sample_rate)
+            return
+        for chunk in chunks:
+            f.write(chunk)
 
     def synthesize_stream(self, **kwargs):
         """
@@ -162,6 +490,8 @@ class SpeechSynthesis:
             - `oggopus` (default) — Data in the audio file is encoded using the OPUS audio codec and compressed using
                 the OGG container format (OggOpus).
 
+            - `wav` — LPCM audio with WAV header.
+
         :type sampleRateHertz: string
         :param sampleRateHertz: The sampling frequency of the synthesized audio.
             Used if format is set to lpcm. Acceptable values:
@@ -180,4 +510,692 @@ class SpeechSynthesis:
         if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
             raise ValueError("Text must be less than 5000 characters")
 
-        return self._synthesize_stream(**kwargs)
\ No newline at end of file
+        sample_rate = _wav_request(kwargs)
+        data = self._synthesize_stream(**kwargs)
+        if sample_rate is not None:
+            return wav_header(len(data), sample_rate) + data
+        return data
+
+    def synthesize_array(self, dtype='int16', **kwargs):
+        """
+        Generates speech in `lpcm` format and returns it as NumPy array, requires `numpy`.
+        `int16` array is a read-only view over received data without copy.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`, `format` is `lpcm`.
+
+        :Example:
+
+        >>> samples, sample_rate = synthesize_audio.synthesize_array(text='Text', sampleRateHertz='16000')
+
+        :param string dtype: `int16` for raw samples or `float32` for samples normalized to [-1.0, 1.0).
+            Default `int16`
+        :return: tuple (samples, sample rate)
+        :rtype: tuple[numpy.ndarray, integer]
+        """
+        if kwargs.setdefault('format', 'lpcm') != 'lpcm':
+            raise ValueError("Array output supports only `format='lpcm'`.")
+
+        data = self.synthesize_stream(**kwargs)
+        return to_array(data, dtype), int(kwargs.get('sampleRateHertz', 48000))
+
+    def synthesize_long_stream(self, max_workers=8, max_length=MAX_TEXT_LENGTH, **kwargs):
+        """
+        Generates speech from text or SSML of any length. Text is split at paragraph and sentence boundaries into
+        pieces not longer than `max_length`, pieces are synthesized concurrently and joined in order: `lpcm` audio
+        is concatenated, `oggopus` streams are merged into one Ogg stream.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`.
+
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :param integer max_length: Maximum length of one piece in characters. Default 5000
+        :return: Audio data
+        :rtype: bytes
+        """
+        field, pieces = _split_request(kwargs, max_length)
+        sample_rate = _wav_request(kwargs)
+        if not pieces:
+            return b''
+
+        def synthesize_piece(piece):
+            return self._synthesize_stream(**{field: piece}, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pieces))) as executor:
+            audio = list(executor.map(synthesize_piece, pieces))
+        if sample_rate is not None:
+            audio.insert(0, wav_header(sum(map(len, audio)), sample_rate))
+        return _join_audio(audio, kwargs.get('format', 'oggopus'))
+
+    def synthesize_long(self, file_path, max_workers=8, max_length=MAX_TEXT_LENGTH, **kwargs):
+        """
+        Generates speech from text or SSML of any length and saves it to file,
+        see :py:meth:`speechkit.SpeechSynthesis.synthesize_long_stream`.
+
+        :param string | io.RawIOBase file_path: The path to file where store data or any object with `write` method
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :param integer max_length: Maximum length of one piece in characters. Default 5000
+        """
+        audio_data = self.synthesize_long_stream(max_workers=max_workers, max_length=max_length, **kwargs)
+        if hasattr(file_path, 'write'):
+            file_path.write(audio_data)
+        else:
+            with open(file_path, "wb") as f:
+                f.write(audio_data)
+
+    def synthesize_chunks(self, chunk_size=CHUNK_SIZE, **kwargs):
+        """
+        Generates speech from received text and yields audio chunks as they arrive, so playback can start
+        before whole audio is synthesized.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`.
+
+        :Example:
+
+        >>> for chunk in synthesize_audio.synthesize_chunks(text='Text', format='lpcm', sampleRateHertz='16000'):
+        ...     player.write(chunk)
+        ...
+
+        :param integer chunk_size: Maximum size of yielded chunks in bytes. Default 8192
+        :return: Yields audio chunks, for `wav` format first chunk is WAV header with length of stream unknown
+        :rtype: bytes
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        sample_rate = _wav_request(kwargs)
+        if sample_rate is not None:
+            yield wav_header(STREAMING_SIZE, sample_rate)
+        yield from self._iter_audio(chunk_size, **kwargs)
+
+    def _read_buffer(self):
+        """Per-thread reusable buffer for reading response body"""
+
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = memoryview(bytearray(self.CHUNK_SIZE))
+        return buffer
+
+    def _iter_into(self, buffer, **kwargs):
+        """
+        Yields audio as slices of buffer filled with `readinto`, slice is valid until next iteration. urllib3
+        still reads each chunk into temporary bytes and copies it into buffer, only per-chunk slices are spared.
+        """
+
+        if self._cache is not None or self._prefetcher is not None:
+            yield from self._iter_audio(len(buffer), **kwargs)
+            return
+
+        answer = self._open_stream(**kwargs)
+        try:
+            while True:
+                size = answer.raw.readinto(buffer)
+                if not size:
+                    return
+                yield buffer[:size]
+        finally:
+            answer.close()
+
+    def _fill(self, view, **kwargs):
+        """Reads audio into memoryview with `readinto` (urllib3 copies through temporary bytes), returns its size"""
+
+        overflow = ValueError("Audio doesn't fit into destination buffer of {} bytes.".format(len(view)))
+        if self._cache is not None or self._prefetcher is not None:
+            offset = 0
+            for chunk in self._iter_audio(self.CHUNK_SIZE, **kwargs):
+                if offset + len(chunk) > len(view):
+                    raise overflow
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+            return offset
+
+        answer = self._open_stream(**kwargs)
+        offset = 0
+        try:
+            while True:
+                if offset == len(view):
+                    if answer.raw.read(1):
+                        raise overflow
+                    return offset
+                size = answer.raw.readinto(view[offset:])
+                if not size:
+                    return offset
+                offset += size
+        finally:
+            answer.close()
+
+    @staticmethod
+    def _writer(dest):
+        """Returns function writing whole memoryview to destination"""
+
+        if isinstance(dest, int):
+            def write(data):
+                while data:
+                    data = data[os.write(dest, data):]
+        elif hasattr(dest, 'sendall'):
+            write = dest.sendall
+        elif hasattr(dest, 'write'):
+            def write(data):
+                while data:
+                    written = dest.write(data)
+                    data = data[written:] if written is not None else b''
+        else:
+            raise TypeError("Destination must be file descriptor, socket, object with `write` method or writable "
+                            "buffer, but got {}".format(type(dest)))
+        return write
+
+    @staticmethod
+    def _position(dest):
+        """Returns (tell, seek) functions of seekable file descriptor or file object, None for pipes and sockets"""
+
+        if isinstance(dest, int):
+            try:
+                os.lseek(dest, 0, os.SEEK_CUR)
+            except OSError:
+                return None
+            return lambda: os.lseek(dest, 0, os.SEEK_CUR), lambda offset: os.lseek(dest, offset, os.SEEK_SET)
+        if not hasattr(dest, 'sendall') and _seekable(dest):
+            return dest.tell, dest.seek
+        return None
+
+    def _write_header(self, dest, write, sample_rate):
+        """Writes streaming WAV header, returns function patching sizes in it or None if dest is not seekable"""
+
+        position = self._position(dest)
+        start = position[0]() if position is not None else None
+        write(memoryview(wav_header(STREAMING_SIZE, sample_rate)))
+        if position is None:
+            return None
+
+        tell, seek = position
+
+        def patch(size):
+            end = tell()
+            seek(start)
+            write(memoryview(wav_header(size, sample_rate)))
+            seek(end)
+
+        return patch
+
+    def synthesize_into(self, dest, **kwargs):
+        """
+        Generates speech and writes it to destination as it arrives. Response body is read with `readinto` into
+        reusable per-thread buffer, or into destination buffer, so no bytes objects are kept or joined per chunk.
+        Note that urllib3 implements `readinto` on top of `read`, so each chunk is still copied once internally.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`.
+
+        :Example:
+
+        >>> buffer = bytearray(1024 * 1024)
+        >>> size = synthesize_audio.synthesize_into(buffer, text='Text', format='lpcm', sampleRateHertz='8000')
+        >>> audio = memoryview(buffer)[:size]
+
+        :param dest: Open file descriptor, socket (data is sent with `sendall`), object with `write` method or
+            pre-allocated writable buffer like `bytearray` or `memoryview`. ValueError is raised if audio doesn't
+            fit into buffer. Data passed to `write` is a view of reused buffer, it must be consumed in the call.
+            For `wav` sizes in header are patched after the last chunk if destination is seekable, pipes and
+            sockets get header with :py:data:`speechkit._wav.STREAMING_SIZE`.
+        :type dest: int | socket.socket | io.RawIOBase | bytearray | memoryview
+        :return: Number of bytes written
+        :rtype: integer
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        sample_rate = _wav_request(kwargs)
+        header_size = HEADER_SIZE if sample_rate is not None else 0
+
+        if isinstance(dest, (bytearray, memoryview)):
+            view = memoryview(dest).cast('B')
+            if len(view) < header_size:
+                raise ValueError("Audio doesn't fit into destination buffer of {} bytes.".format(len(view)))
+            size = self._fill(view[header_size:], **kwargs)
+            if sample_rate is not None:
+                view[:header_size] = wav_header(size, sample_rate)
+            return header_size + size
+
+        write = self._writer(dest)
+        patch = self._write_header(dest, write, sample_rate) if sample_rate is not None else None
+        size = 0
+        for chunk in self._iter_into(self._read_buffer(), **kwargs):
+            write(chunk)
+            size += len(chunk)
+        if patch is not None:
+            patch(size)
+        return header_size + size
+
+    def synthesize_pipelined(self, lookahead=2, **kwargs):
+        """
+        Generates speech sentence by sentence for low time to first audio: first sentence is requested at once and
+        yielded as soon as it is ready, while next `lookahead` sentences are synthesized in background.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`, text may be of any length.
+
+        Every yielded item is complete audio of one sentence: `lpcm` items can be concatenated, `oggopus` items are
+        separate Ogg streams to play one after another. For `wav` the first item is WAV header with
+        :py:data:`speechkit._wav.STREAMING_SIZE`, followed by `lpcm` items.
+
+        :Example:
+
+        >>> for audio in synthesize_audio.synthesize_pipelined(text=reply, format='lpcm', sampleRateHertz='16000'):
+        ...     player.write(audio)
+        ...
+
+        :param integer lookahead: Number of sentences synthesized ahead of yielded one. Default 2
+        :return: Yields audio of sentences in order
+        :rtype: bytes
+        """
+        if not isinstance(lookahead, int) or lookahead < 0:
+            raise ValueError("lookahead must be non-negative int, but got {}".format(lookahead))
+
+        field, pieces = _split_request(kwargs, MAX_TEXT_LENGTH, pack=False)
+        sample_rate = _wav_request(kwargs)
+        if sample_rate is not None:
+            yield wav_header(STREAMING_SIZE, sample_rate)
+
+        pieces = iter(pieces)
+        pending = collections.deque()
+        with ThreadPoolExecutor(max_workers=lookahead + 1) as executor:
+            def submit_next():
+                piece = next(pieces, None)
+                if piece is not None:
+                    pending.append(executor.submit(self._synthesize_stream, **{field: piece}, **kwargs))
+
+            try:
+                for _ in range(lookahead + 1):
+                    submit_next()
+                while pending:
+                    data = pending.popleft().result()
+                    submit_next()
+                    yield data
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _template_parts(template, values):
+        """
+        Splits template into fixed fragments and filled slots
+
+        :return: List of tuples (text, fixed)
+        """
+        formatter = string.Formatter()
+        parts = []
+        for literal, field, spec, conversion in formatter.parse(template):
+            if literal.strip():
+                parts.append((literal.strip(), True))
+            if field is not None:
+                name = re.match(r'[^.\[]*', field).group()
+                if not name or name.isdigit():
+                    raise ValueError("Template slots must be named, but got {{{}}}".format(field))
+                value = formatter.convert_field(formatter.get_field(field, (), values)[0], conversion)
+                try:
+                    spec = formatter.vformat(spec, (), values)
+                except IndexError:
+                    raise ValueError("Template slots must be named, but got {{{}:{}}}".format(field, spec))
+                value = formatter.format_field(value, spec)
+                if value.strip():
+                    parts.append((value.strip(), False))
+        return parts
+
+    def _template_params(self, template, values, kwargs):
+        """Validates template request, returns parts, fragment cache keys and sample rate"""
+
+        if kwargs.get('format') != 'lpcm':
+            raise ValueError("Template synthesis supports only `format='lpcm'`.")
+        if 'text' in kwargs or 'ssml' in kwargs:
+            raise ValueError("Text is set by template, `text` and `ssml` are not allowed.")
+
+        parts = self._template_parts(template, values)
+        keys = [SynthesisCache.make_key(dict(kwargs, text=text)) if fixed else None for text, fixed in parts]
+        return parts, keys, int(kwargs.get('sampleRateHertz', 48000))
+
+    def synthesize_template(self, template, values, crossfade_ms=10, max_workers=8, **kwargs):
+        """
+        Generates speech from template like `'Your balance is {amount} rubles'`. Fixed fragments are synthesized
+        once and cached, only slots are synthesized on every call. Fragments are trimmed of edge silence and
+        spliced with short crossfade. Only `lpcm` format is supported.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream` except `text` and `ssml`.
+
+        :Example:
+
+        >>> audio = synthesize_audio.synthesize_template('Your balance is {amount} rubles', {'amount': 150},
+        ...                                              format='lpcm', sampleRateHertz='16000')
+
+        :param string template: Text with named slots in :py:meth:`str.format` syntax
+        :param dict values: Slot values
+        :param integer crossfade_ms: Crossfade between fragments in milliseconds. Default 10
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :return: Audio data
+        :rtype: bytes
+        """
+        parts, keys, sample_rate = self._template_params(template, values, kwargs)
+        audio = [self._fragments.get(key) if key is not None else None for key in keys]
+        missing = [i for i, data in enumerate(audio) if data is None]
+
+        def synthesize_part(i):
+            return trim_silence(self._synthesize_stream(text=parts[i][0], **kwargs), sample_rate)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                for i, data in zip(missing, executor.map(synthesize_part, missing)):
+                    audio[i] = data
+                    if keys[i] is not None:
+                        self._fragments.put(keys[i], data)
+
+        return splice(audio, sample_rate, crossfade_ms)
+
+    def synthesize_many(self, requests, max_workers=8, ordered=True):
+        """
+        Synthesizes many texts concurrently. Requests are taken from iterable lazily, so it may be a generator
+        of any length. Errors are reported per item and don't stop the batch.
+
+        :Example:
+
+        >>> prompts = ({'text': text, 'format': 'lpcm'} for text in texts)
+        >>> for result in synthesize_audio.synthesize_many(prompts, max_workers=16):
+        ...     if result.error is None:
+        ...         save(result.index, result.data)
+        ...
+
+        :param iterable requests: Iterable of dicts with params of
+            :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :param boolean ordered: Yield results in input order if True, as soon as they are ready otherwise.
+            Default True
+        :return: Yields named tuples `(index, request, data, error)`, `error` is an exception or None
+        """
+        return iter_bounded(self.synthesize_stream, requests, max_workers=max_workers, ordered=ordered)
+
+
+class AsyncSpeechSynthesis(SpeechSynthesis):
+    """
+    asyncio version of :py:class:`speechkit.SpeechSynthesis`. Requests share
+    :py:meth:`speechkit.Session.async_transport` connection pool and don't block event loop.
+    :py:meth:`speechkit.SpeechSynthesis.prefetch` hints are rendered on background worker thread with
+    :py:meth:`speechkit.Session.transport`, async methods take prefetched audio without waiting for it.
+
+    :Example:
+
+    >>> synthesize_audio = AsyncSpeechSynthesis(session)
+    >>> data = await synthesize_audio.synthesize_stream(text='Text', format='lpcm', sampleRateHertz='16000')
+    """
+
+    _single_flight_class = AsyncSingleFlight
+
+    async def _fetch(self, key, params):
+        """Requests audio from API and stores it in cache"""
+
+        async with self._session.async_transport.post(
+                SYNTHESIS_URL, headers=self._headers, data=self._request_params(**params)
+        ) as answer:
+            if not answer.ok:
+                raise RequestError(await answer.json(content_type=None), status_code=answer.status)
+
+            data = await answer.read()
+
+        if key is not None:
+            self._cache.put(key, data)
+        return data
+
+    async def _synthesize_stream(self, **kwargs):
+        """Creates request to generate speech from text"""
+
+        key, data = self._cache_lookup(kwargs, wait_prefetch=False)
+        if data is not None:
+            return data
+        if self._single_flight is None:
+            return await self._fetch(key, kwargs)
+        return await self._single_flight.do(key or SynthesisCache.make_key(kwargs), lambda: self._fetch(key, kwargs))
+
+    async def _iter_audio(self, chunk_size, **kwargs):
+        """Yields audio chunks from cache or as they arrive from API, complete audio is stored in cache"""
+
+        key, data = self._cache_lookup(kwargs, wait_prefetch=False)
+        if data is not None:
+            for i in range(0, len(data), chunk_size):
+                yield data[i:i + chunk_size]
+            return
+
+        received = bytearray() if key is not None else None
+        async with self._session.async_transport.post(
+                SYNTHESIS_URL, headers=self._headers, data=self._request_params(**kwargs)
+        ) as answer:
+            if not answer.ok:
+                raise RequestError(await answer.json(content_type=None), status_code=answer.status)
+
+            async for chunk in answer.content.iter_chunked(chunk_size):
+                if received is not None:
+                    received += chunk
+                yield chunk
+
+        if key is not None:
+            self._cache.put(key, received)
+
+    async def synthesize(self, file_path, **kwargs):
+        """
+        Generates speech from received text and saves it to file.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize`.
+
+        :type file_path: string | io.RawIOBase
+        :param file_path: The path to file where store data or any object with `write` method
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        audio_data = await self.synthesize_stream(**kwargs)
+        if hasattr(file_path, 'write'):
+            file_path.write(audio_data)
+        else:
+            with open(file_path, "wb") as f:
+                f.write(audio_data)
+
+    async def synthesize_chunks(self, chunk_size=SpeechSynthesis.CHUNK_SIZE, **kwargs):
+        """
+        Generates speech and yields audio chunks as they arrive.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_chunks`.
+
+        :Example:
+
+        >>> async for chunk in synthesize_audio.synthesize_chunks(text='Text', format='lpcm'):
+        ...     await player.write(chunk)
+        ...
+
+        :return: Asynchronously yields audio chunks, for `wav` format first chunk is WAV header with length of
+            stream unknown
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        sample_rate = _wav_request(kwargs)
+        if sample_rate is not None:
+            yield wav_header(STREAMING_SIZE, sample_rate)
+        async for chunk in self._iter_audio(chunk_size, **kwargs):
+            yield chunk
+
+    async def synthesize_into(self, dest, **kwargs):
+        """
+        Generates speech and writes it to destination as it arrives.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_into`. Writes to file descriptor,
+        socket or file object are blocking, use :py:meth:`speechkit.AsyncSpeechSynthesis.synthesize_chunks` for
+        asyncio streams.
+
+        :type dest: int | socket.socket | io.RawIOBase | bytearray | memoryview
+        :return: Number of bytes written
+        :rtype: integer
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        sample_rate = _wav_request(kwargs)
+        header_size = HEADER_SIZE if sample_rate is not None else 0
+
+        if isinstance(dest, (bytearray, memoryview)):
+            view = memoryview(dest).cast('B')
+            overflow = ValueError("Audio doesn't fit into destination buffer of {} bytes.".format(len(view)))
+            if len(view) < header_size:
+                raise overflow
+            offset = header_size
+            async for chunk in self._iter_audio(self.CHUNK_SIZE, **kwargs):
+                if offset + len(chunk) > len(view):
+                    raise overflow
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+            if sample_rate is not None:
+                view[:header_size] = wav_header(offset - header_size, sample_rate)
+            return offset
+
+        write = self._writer(dest)
+        patch = self._write_header(dest, write, sample_rate) if sample_rate is not None else None
+        size = 0
+        async for chunk in self._iter_audio(self.CHUNK_SIZE, **kwargs):
+            write(memoryview(chunk))
+            size += len(chunk)
+        if patch is not None:
+            patch(size)
+        return header_size + size
+
+    async def synthesize_stream(self, **kwargs):
+        """
+        Generates speech from received text and return bytes with data.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_stream`.
+
+        :rtype: bytes
+        """
+        if 'text' in kwargs and len(kwargs.get('text', '')) > 5000:
+            raise ValueError("Text must be less than 5000 characters")
+
+        sample_rate = _wav_request(kwargs)
+        data = await self._synthesize_stream(**kwargs)
+        if sample_rate is not None:
+            return wav_header(len(data), sample_rate) + data
+        return data
+
+    def synthesize_many(self, requests, max_workers=8, ordered=True):
+        """
+        Synthesizes many texts concurrently on event loop.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_many`.
+
+        :Example:
+
+        >>> async for result in synthesize_audio.synthesize_many(prompts, max_workers=16):
+        ...     print(result.index, result.error)
+        ...
+
+        :return: Asynchronously yields named tuples `(index, request, data, error)`
+        """
+        return aiter_bounded(self.synthesize_stream, requests, max_workers=max_workers, ordered=ordered)
+
+    async def synthesize_long_stream(self, max_workers=8, max_length=MAX_TEXT_LENGTH, **kwargs):
+        """
+        Generates speech from text or SSML of any length, pieces are synthesized concurrently on event loop.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_long_stream`.
+
+        :param integer max_workers: Maximum number of concurrent requests. Default 8
+        :param integer max_length: Maximum length of one piece in characters. Default 5000
+        :return: Audio data
+        :rtype: bytes
+        """
+        field, pieces = _split_request(kwargs, max_length)
+        sample_rate = _wav_request(kwargs)
+        if not pieces:
+            return b''
+
+        async def synthesize_piece(**piece):
+            return await self._synthesize_stream(**piece, **kwargs)
+
+        audio = []
+        async for result in aiter_bounded(synthesize_piece, ({field: piece} for piece in pieces),
+                                          max_workers=max_workers):
+            if result.error is not None:
+                raise result.error
+            audio.append(result.data)
+        if sample_rate is not None:
+            audio.insert(0, wav_header(sum(map(len, audio)), sample_rate))
+        return _join_audio(audio, kwargs.get('format', 'oggopus'))
+
+    async def synthesize_long(self, file_path, max_workers=8, max_length=MAX_TEXT_LENGTH, **kwargs):
+        """
+        Generates speech from text or SSML of any length and saves it to file.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_long`.
+
+        :param string | io.RawIOBase file_path: The path to file where store data or any object with `write` method
+        """
+        audio_data = await self.synthesize_long_stream(max_workers=max_workers, max_length=max_length, **kwargs)
+        if hasattr(file_path, 'write'):
+            file_path.write(audio_data)
+        else:
+            with open(file_path, "wb") as f:
+                f.write(audio_data)
+
+    async def synthesize_pipelined(self, lookahead=2, **kwargs):
+        """
+        Generates speech sentence by sentence on event loop.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_pipelined`.
+
+        :Example:
+
+        >>> async for audio in synthesize_audio.synthesize_pipelined(text=reply, format='lpcm'):
+        ...     await player.write(audio)
+        ...
+
+        :return: Asynchronously yields audio of sentences in order
+        """
+        if not isinstance(lookahead, int) or lookahead < 0:
+            raise ValueError("lookahead must be non-negative int, but got {}".format(lookahead))
+
+        field, pieces = _split_request(kwargs, MAX_TEXT_LENGTH, pack=False)
+        sample_rate = _wav_request(kwargs)
+        if sample_rate is not None:
+            yield wav_header(STREAMING_SIZE, sample_rate)
+
+        pieces = iter(pieces)
+        pending = collections.deque()
+
+        def submit_next():
+            piece = next(pieces, None)
+            if piece is not None:
+                pending.append(asyncio.ensure_future(self._synthesize_stream(**{field: piece}, **kwargs)))
+
+        try:
+            for _ in range(lookahead + 1):
+                submit_next()
+            while pending:
+                data = await pending.popleft()
+                submit_next()
+                yield data
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def synthesize_template(self, template, values, crossfade_ms=10, max_workers=8, **kwargs):
+        """
+        Generates speech from template, fixed fragments are cached.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_template`.
+
+        :rtype: bytes
+        """
+        parts, keys, sample_rate = self._template_params(template, values, kwargs)
+        audio = [self._fragments.get(key) if key is not None else None for key in keys]
+        missing = [i for i, data in enumerate(audio) if data is None]
+
+        async def synthesize_part(i):
+            return await self._synthesize_stream(text=parts[i][0], **kwargs)
+
+        async for result in aiter_bounded(synthesize_part, ({'i': i} for i in missing), max_workers=max_workers):
+            if result.error is not None:
+                raise result.error
+            i = result.request['i']
+            audio[i] = trim_silence(result.data, sample_rate)
+            if keys[i] is not None:
+                self._fragments.put(keys[i], audio[i])
+
+        return splice(audio, sample_rate, crossfade_ms)
+
+    async def synthesize_array(self, dtype='int16', **kwargs):
+        """
+        Generates speech in `lpcm` format and returns it as NumPy array.
+        Accepts same params as :py:meth:`speechkit.SpeechSynthesis.synthesize_array`.
+
+        :return: tuple (samples, sample rate)
+        :rtype: tuple[numpy.ndarray, integer]
+        """
+        if kwargs.setdefault('format', 'lpcm') != 'lpcm':
+            raise ValueError("Array output supports only `format='lpcm'`.")
+
+        data = await self.synthesize_stream(**kwargs)
+        return to_array(data, dtype), int(kwargs.get('sampleRateHertz', 48000))
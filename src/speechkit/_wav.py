@@ -0,0 +1,57 @@
+import struct
+
+_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+HEADER_SIZE = _HEADER.size
+STREAMING_SIZE = 0xFFFFFFFF
+"""Size written to header when length is unknown in advance, readers treat it as "until end of stream" """
+
+
+def wav_header(data_size, sample_rate, channels=1, sample_width=2):
+    """
+    Canonical 44 bytes RIFF WAVE header for PCM audio
+
+    :param integer data_size: Size of PCM data in bytes or :py:data:`STREAMING_SIZE` if unknown
+    :param integer sample_rate: Sample rate in Hz
+    :param integer channels: Number of channels. Default 1
+    :param integer sample_width: Bytes per sample. Default 2
+    :rtype: bytes
+    """
+    riff_size = STREAMING_SIZE if data_size == STREAMING_SIZE else min(data_size + HEADER_SIZE - 8, STREAMING_SIZE)
+    block_align = channels * sample_width
+    return _HEADER.pack(b'RIFF', riff_size, b'WAVE', b'fmt ', 16, 1, channels, sample_rate,
+                        sample_rate * block_align, block_align, sample_width * 8, b'data', data_size)
+
+
+def _seekable(f):
+    try:
+        return f.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def write_wav(f, chunks, sample_rate):
+    """
+    Writes WAV header and then PCM chunks as they come. If `f` is seekable, sizes in header are patched after
+    the last chunk, otherwise header keeps :py:data:`STREAMING_SIZE` that is safe for pipes.
+
+    :param f: Object with `write` method
+    :param iterable chunks: PCM chunks
+    :param integer sample_rate: Sample rate in Hz
+    :return: Size of PCM data in bytes
+    :rtype: integer
+    """
+    seekable = _seekable(f)
+    start = f.tell() if seekable else None
+    f.write(wav_header(STREAMING_SIZE, sample_rate))
+
+    data_size = 0
+    for chunk in chunks:
+        f.write(chunk)
+        data_size += len(chunk)
+
+    if seekable:
+        end = f.tell()
+        f.seek(start)
+        f.write(wav_header(data_size, sample_rate))
+        f.seek(end)
+    return data_size
@@ -4,6 +4,6 @@ Utilities for Yandex Cloud authorisation
 `Api-Key <https://cloud.yandex.com/en/docs/iam/concepts/authorization/api-key>`_
 """
 
-from speechkit._auth import generate_jwt, get_iam_token, get_api_key
+from speechkit._auth import generate_jwt, get_iam_token, get_api_key, IamTokenProvider, JwtSigner
 
-__all__ = ['generate_jwt', 'get_iam_token', 'get_api_key']
+__all__ = ['generate_jwt', 'get_iam_token', 'get_api_key', 'IamTokenProvider', 'JwtSigner']
@@ -4,7 +4,11 @@
 class RequestError(Exception):
     """Exception raised for errors while yandex api request"""
 
-    def __init__(self, answer: dict, *args):
+    status_code = None
+    """HTTP status of response if it is known"""
+
+    def __init__(self, answer: dict, *args, status_code=None):
+        self.status_code = status_code
         self.error_code = str(answer.get('code', '')) + str(answer.get('error_code', ''))
         self.message = str(answer.get('message', '')) + str(answer.get('error_message', ''))
         if self.error_code + self.message == '':
@@ -1,7 +1,5 @@
 """Utilities functions, tht allow to use different api methods."""
 
-import requests
-
 from speechkit.exceptions import RequestError
 
 
@@ -22,9 +20,9 @@ def list_of_service_accounts(session, **kwargs):
     headers = session.header
     url = 'https://iam.api.cloud.yandex.net/iam/v1/serviceAccounts'
     data = {'folderId': session.folder_id, **kwargs}
-    answer = requests.get(url, headers=headers, json=data)
+    answer = session.transport.get(url, headers=headers, json=data)
 
     if answer.ok:
         return answer.json().get('serviceAccounts', [])
     else:
-        raise RequestError(answer.json())
+        raise RequestError(answer.json(), status_code=answer.status_code)
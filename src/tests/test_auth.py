@@ -1,9 +1,10 @@
 import os
+import time
 import unittest
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from speechkit.auth import generate_jwt, get_iam_token, get_api_key
-from speechkit import Session
+from speechkit.auth import generate_jwt, get_iam_token, get_api_key, IamTokenProvider, JwtSigner
+from speechkit import Session, SpeechSynthesis
 
 
 def get_private_key():
@@ -30,6 +31,35 @@ class GenerateJwtTestCase(unittest.TestCase):
             generate_jwt('s', '', '')
 
 
+class JwtSignerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_key = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+
+    def test_reuse(self):
+        signer = JwtSigner('service_account_id', 'key_id', self.private_key)
+        first = signer.get_jwt()
+        self.assertIsInstance(first, str)
+        self.assertEqual(signer.get_jwt(), first)
+        self.assertEqual((signer.hits, signer.misses), (1, 1))
+
+    def test_expired(self):
+        signer = JwtSigner('service_account_id', 'key_id', self.private_key, exp_time=10, reuse_margin=0)
+        signer.get_jwt()
+        signer._exp = 0
+        signer.get_jwt()
+        self.assertEqual((signer.hits, signer.misses), (0, 2))
+
+    def test_assert_invalid_reuse_margin(self):
+        with self.assertRaises(ValueError):
+            JwtSigner('service_account_id', 'key_id', self.private_key, exp_time=60, reuse_margin=60)
+
+
 class GetIamTokenTestCase(unittest.TestCase):
     def test_assert_empty_data(self):
         with self.assertRaises(ValueError):
@@ -101,6 +131,15 @@ class SessionTestCase(TestCase):
         session = Session(Session.IAM_TOKEN, 'hello', None)
         self.assertEqual(session.header, {'Authorization': 'Bearer hello'})
 
+    def test_transport(self):
+        session = Session(Session.API_KEY, 'hello', None, pool_maxsize=4)
+        self.assertEqual(session.transport.pool_maxsize, 4)
+        self.assertIs(SpeechSynthesis(session)._session.transport, session.transport)
+        session.close()
+
+        with self.assertRaises(ValueError):
+            Session(Session.API_KEY, 'hello', None, pool_maxsize=0)
+
     def test_auth_method(self):
         session = Session(Session.API_KEY, 'hello', None)
         self.assertEqual(session.auth_method, Session.API_KEY)
@@ -109,5 +148,60 @@ class SessionTestCase(TestCase):
         self.assertEqual(session.auth_method, Session.IAM_TOKEN)
 
 
+class IamTokenProviderTestCase(TestCase):
+    def test_assert_invalid_credentials(self):
+        with self.assertRaises(ValueError):
+            IamTokenProvider()
+
+        with self.assertRaises(ValueError):
+            IamTokenProvider(yandex_passport_oauth_token='oauth', service_account_id='id')
+
+        with self.assertRaises(ValueError):
+            IamTokenProvider(service_account_id='id', key_id='key')
+
+    @mock.patch('speechkit._auth._create_iam_token')
+    def test_refresh(self, create_iam_token):
+        create_iam_token.return_value = {'iamToken': 'first', 'expiresAt': '2100-01-01T00:00:00.000000Z'}
+        provider = IamTokenProvider(yandex_passport_oauth_token='oauth')
+        session = Session(Session.IAM_TOKEN, provider, None)
+        self.assertEqual(session.header, {'Authorization': 'Bearer first'})
+
+        create_iam_token.return_value = {'iamToken': 'second', 'expiresAt': '2100-01-01T00:00:00.000000Z'}
+        provider.refresh()
+        self.assertEqual(session.header, {'Authorization': 'Bearer second'})
+        self.assertEqual(session.streaming_recognition_header, ('authorization', 'Bearer second'))
+        session.close()
+
+    @mock.patch('speechkit._auth._create_iam_token')
+    def test_background_refresh(self, create_iam_token):
+        create_iam_token.return_value = {'iamToken': 'first', 'expiresAt': '2000-01-01T00:00:00Z'}
+        provider = IamTokenProvider(yandex_passport_oauth_token='oauth')
+
+        create_iam_token.return_value = {'iamToken': 'second', 'expiresAt': '2100-01-01T00:00:00Z'}
+        for _ in range(100):
+            if provider.token == 'second':
+                break
+            time.sleep(0.01)
+        self.assertEqual(provider.token, 'second')
+        provider.close()
+
+    def test_parse_expires_at(self):
+        from speechkit._auth import _parse_expires_at
+
+        self.assertEqual(_parse_expires_at('2019-02-15T09:18:36Z'), 1550222316)
+        self.assertAlmostEqual(_parse_expires_at('2019-02-15T09:18:36.284733574Z'), 1550222316.284733574)
+        self.assertEqual(_parse_expires_at('2019-02-15T12:18:36+03:00'), 1550222316)
+        self.assertEqual(_parse_expires_at('2019-02-15T06:48:36-02:30'), 1550222316)
+        self.assertGreater(_parse_expires_at('invalid'), time.time())
+        self.assertGreater(_parse_expires_at(None), time.time())
+
+    def test_assert_provider_with_api_key(self):
+        with mock.patch('speechkit._auth._create_iam_token', return_value={'iamToken': 'token'}):
+            provider = IamTokenProvider(yandex_passport_oauth_token='oauth')
+        with self.assertRaises(ValueError):
+            Session(Session.API_KEY, provider, None)
+        provider.close()
+
+
 if __name__ == '__main__':
     unittest.main()
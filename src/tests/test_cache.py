@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from speechkit import RecognitionCache, SynthesisCache
+
+
+class SynthesisCacheTestCase(unittest.TestCase):
+    def test_make_key(self):
+        self.assertEqual(SynthesisCache.make_key({'text': 'Hello'}),
+                         SynthesisCache.make_key({'text': 'Hello', 'voice': 'oksana', 'speed': 1, 'folderId': 'a'}))
+        self.assertNotEqual(SynthesisCache.make_key({'text': 'Hello'}),
+                            SynthesisCache.make_key({'text': 'Hello', 'voice': 'alena'}))
+        self.assertNotEqual(SynthesisCache.make_key({'text': 'Hello', 'format': 'lpcm'}),
+                            SynthesisCache.make_key({'text': 'Hello', 'format': 'lpcm', 'sampleRateHertz': 8000}))
+
+    def test_memory_eviction(self):
+        cache = SynthesisCache(max_memory_bytes=10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        self.assertEqual(cache.get('a'), b'12345')
+        cache.put('c', b'12345')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'12345')
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (2, 1, 1))
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SynthesisCache(max_memory_bytes=0, directory=directory, max_disk_bytes=10)
+            cache.put('a', b'12345')
+            cache.put('b', b'12345')
+            cache.put('c', b'12345')
+            self.assertEqual(cache.evictions, 1)
+
+            cache = SynthesisCache(directory=directory, max_disk_bytes=10)
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.get('c'), b'12345')
+            self.assertEqual(cache.stats()['disk_items'], 2)
+            self.assertEqual(cache.stats()['memory_items'], 1)
+
+            cache.clear()
+            self.assertIsNone(cache.get('c'))
+
+    def test_disk_io_outside_lock(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SynthesisCache(max_memory_bytes=0, directory=directory)
+            locked = []
+            for name in ('read', 'write', 'unlink'):
+                method = getattr(cache._disk, name)
+                setattr(cache._disk, name, lambda *args, method=method: locked.append(cache._lock.locked()) or
+                        method(*args))
+
+            cache.put('a', b'12345')
+            self.assertEqual(cache.get('a'), b'12345')
+            cache.clear()
+            self.assertEqual(locked, [False] * 3)
+            self.assertEqual(os.listdir(directory), [])
+
+
+class RecognitionCacheTestCase(unittest.TestCase):
+    def test_make_key(self):
+        audio = b'audio'
+        self.assertEqual(RecognitionCache.make_key(audio, {}),
+                         RecognitionCache.make_key(memoryview(audio), {'lang': 'ru-RU', 'profanityFilter': False,
+                                                                       'sampleRateHertz': 8000, 'folderId': 'a'}))
+        self.assertNotEqual(RecognitionCache.make_key(audio, {}), RecognitionCache.make_key(b'other', {}))
+        self.assertNotEqual(RecognitionCache.make_key(audio, {}), RecognitionCache.make_key(audio, {'lang': 'en-US'}))
+        self.assertNotEqual(RecognitionCache.make_key(audio, {'format': 'lpcm'}),
+                            RecognitionCache.make_key(audio, {'format': 'lpcm', 'sampleRateHertz': '8000'}))
+
+    def test_ttl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RecognitionCache(directory=directory, ttl=60)
+            with mock.patch('speechkit._cache.time.time', return_value=1000):
+                cache.put('a', 'привет')
+                self.assertEqual(cache.get('a'), 'привет')
+                self.assertEqual(RecognitionCache(directory=directory).get('a'), 'привет')
+            with mock.patch('speechkit._cache.time.time', return_value=1061):
+                self.assertIsNone(cache.get('a'))
+            self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(cache.stats()['disk_items'], 0)
+
+        with self.assertRaises(ValueError):
+            RecognitionCache(ttl=0)
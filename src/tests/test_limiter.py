@@ -0,0 +1,35 @@
+import unittest
+
+from speechkit._limiter import AdaptiveLimiter, is_overloaded, backoff_delay
+from speechkit.exceptions import RequestError
+
+
+class AdaptiveLimiterTestCase(unittest.TestCase):
+    def test_aimd(self):
+        limiter = AdaptiveLimiter(8, min_limit=2)
+        tokens = [limiter.acquire() for _ in range(8)]
+        for token in tokens[:3]:
+            limiter.release(token, overloaded=True)
+        self.assertEqual(limiter.limit, 4)
+        for token in tokens[3:]:
+            limiter.release(token)
+        self.assertEqual(limiter.limit, 5)
+
+        limiter.release(limiter.acquire(), overloaded=True)
+        self.assertEqual(limiter.limit, 2)
+        limiter.release(limiter.acquire(), overloaded=True)
+        self.assertEqual(limiter.limit, 2)
+
+        for _ in range(40):
+            limiter.release(limiter.acquire())
+        self.assertEqual(limiter.limit, 8)
+
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(2, min_limit=3)
+
+    def test_overload(self):
+        self.assertTrue(is_overloaded(RequestError({}, status_code=503)))
+        self.assertFalse(is_overloaded(RequestError({}, status_code=400)))
+        self.assertFalse(is_overloaded(ValueError()))
+        self.assertTrue(0.25 <= backoff_delay(0) <= 0.5)
+        self.assertLessEqual(backoff_delay(20, cap=1), 1)
@@ -0,0 +1,108 @@
+import importlib.util
+import struct
+import unittest
+from unittest import mock
+
+from speechkit._pcm import splice, trim_silence, to_array, vad_segments, PcmPreprocessor, pause_map, trim_pauses
+
+NUMPY_INSTALLED = importlib.util.find_spec('numpy') is not None
+
+
+def _pcm(*samples):
+    return struct.pack('<{}h'.format(len(samples)), *samples)
+
+
+class PcmTestCase(unittest.TestCase):
+    def test_trim_silence(self):
+        data = _pcm(0, 1, -2, 0, 1000, -1000, 500, 3, 0, 0)
+        self.assertEqual(trim_silence(data, 1000, pad_ms=0), _pcm(1000, -1000, 500))
+        self.assertEqual(trim_silence(data, 1000, pad_ms=2), _pcm(-2, 0, 1000, -1000, 500, 3, 0))
+        self.assertEqual(trim_silence(_pcm(0, 5, -5), 1000), b'')
+
+        loud = _pcm(*range(-3000, 3000, 3))
+        data = bytes(2 * 3000) + loud + bytes(2 * 1500)
+        self.assertEqual(trim_silence(data, 1000, pad_ms=0), loud)
+        self.assertEqual(trim_silence(bytes(2 * 3000) + _pcm(100) + bytes(2 * 3000), 1000, pad_ms=0), _pcm(100))
+        self.assertEqual(trim_silence(data, 1000, pad_ms=1000), data[2 * 2000:-2 * 500])
+        self.assertEqual(trim_silence(bytes(2 * 5000), 1000), b'')
+
+    def test_splice(self):
+        self.assertEqual(splice([_pcm(1, 2), _pcm(3)], 1000, crossfade_ms=0), _pcm(1, 2, 3))
+        self.assertEqual(splice([_pcm(300, 300, 300), _pcm(0, 0, 0, 7)], 1000, crossfade_ms=2),
+                         _pcm(300, 200, 100, 0, 7))
+
+        pieces = [_pcm(*range(-500, 500, 7)), _pcm(*range(900, -900, -11))]
+        with mock.patch('speechkit._pcm._find_numpy', return_value=None):
+            expected = splice(pieces, 8000, crossfade_ms=5)
+        self.assertEqual(splice(pieces, 8000, crossfade_ms=5), expected)
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_to_array(self):
+        data = _pcm(0, 16384, -32768)
+        samples = to_array(data)
+        self.assertEqual(samples.tolist(), [0, 16384, -32768])
+        self.assertFalse(samples.flags.owndata)
+        self.assertEqual(to_array(data, 'float32').tolist(), [0.0, 0.5, -1.0])
+        self.assertEqual(str(to_array(data, 'float32').dtype), 'float32')
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_vad_segments(self):
+        import numpy as np
+
+        rate = 1000
+        tone = (np.sin(np.arange(rate) / 3) * 10000).astype('<i2').tobytes()
+        silence = bytes(rate)
+        data = silence + tone + silence + tone * 3 + silence * 4
+
+        self.assertEqual(vad_segments(data, rate), [(0, 7000)])
+        segments = vad_segments(data, rate, max_seconds=2.5)
+        self.assertEqual(segments[0], (0, 1740))
+        self.assertTrue(all(end - start <= 2500 for start, end in segments))
+        self.assertEqual([end for _, end in segments[:-1]], [start for start, _ in segments[1:]])
+        self.assertEqual(segments[-1][1], 5000)
+        self.assertEqual(vad_segments(silence * 10, rate), [])
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_preprocessor(self):
+        import numpy as np
+
+        def sine(rate, channels=1):
+            samples = (np.sin(2 * np.pi * 440 * np.arange(rate) / rate) * 10000).astype('<i2')
+            return np.repeat(samples, channels).tobytes()
+
+        expected = np.frombuffer(sine(16000), dtype='<i2')
+        for rate, channels in ((48000, 2), (44100, 1), (8000, 1), (16000, 2)):
+            output = np.frombuffer(PcmPreprocessor(rate, channels).process(sine(rate, channels)), dtype='<i2')
+            self.assertEqual(len(output), 16000)
+            self.assertLess(np.abs(output[200:-200] - expected[200:-200]).max(), 10)
+
+        aliased = (np.sin(2 * np.pi * 12000 * np.arange(48000) / 48000) * 10000).astype('<i2').tobytes()
+        output = np.frombuffer(PcmPreprocessor(48000).process(aliased), dtype='<i2')
+        self.assertLess(np.abs(output[200:-200]).max(), 100)
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_preprocessor_stream(self):
+        data = bytes(range(256)) * 300
+        preprocessor = PcmPreprocessor(44100, channels=2)
+        chunks = [data[i:i + 1001] for i in range(0, len(data), 1001)]
+        self.assertEqual(b''.join(preprocessor.stream(chunks)), preprocessor.process(data))
+        self.assertEqual(b''.join([preprocessor.feed(chunk) for chunk in chunks] + [preprocessor.flush()]),
+                         preprocessor.process(data))
+        self.assertEqual(preprocessor.params, {'format': 'lpcm', 'sampleRateHertz': '16000'})
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_trim_pauses(self):
+        import numpy as np
+
+        tone = (np.sin(np.arange(1000) / 3) * 10000).astype('<i2').tobytes()
+        data = bytes(3000) + tone + bytes(4000) + tone + bytes(500)
+        trimmed, time_map = trim_pauses(data, 1000, min_silence_ms=1000, keep_ms=250)
+        self.assertEqual(time_map.spans, [(1250, 0, 1500), (4250, 1500, 1500)])
+        self.assertEqual(trimmed, data[2500:5500] + data[8500:])
+        self.assertEqual((time_map.original_seconds, time_map.trimmed_seconds), (5.75, 3.0))
+        self.assertEqual([time_map.to_original(t) for t in (0, 1.4, 1.5, 3.0)], [1.25, 2.65, 4.25, 5.75])
+
+        self.assertEqual(pause_map(bytes(2000), 1000).spans, [])
+        self.assertEqual(pause_map(tone, 1000).spans, [(0, 0, 1000)])
+        with self.assertRaises(ValueError):
+            pause_map(tone, 1000, min_silence_ms=400, keep_ms=200)
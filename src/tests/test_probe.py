@@ -0,0 +1,46 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from speechkit import probe_audio
+from speechkit._wav import wav_header, STREAMING_SIZE
+from tests.test_speech_synthesis import _opus_stream
+
+
+class ProbeAudioTestCase(unittest.TestCase):
+    def test_wav(self):
+        samples = bytes(range(200)) * 40
+        data = wav_header(len(samples), 8000) + samples
+        info = probe_audio(data)
+        self.assertEqual(info, ('lpcm', 1, 8000, 0.5, 44, 8000))
+
+        streaming = wav_header(STREAMING_SIZE, 16000, channels=2) + samples
+        self.assertEqual(probe_audio(streaming)[1:], (2, 16000, 0.125, 44, 8000))
+
+        list_chunk = b'LIST' + struct.pack('<I', 3) + b'abc\x00'
+        with_list = data[:36] + list_chunk + data[36:]
+        self.assertEqual(probe_audio(with_list).data_offset, 44 + len(list_chunk))
+
+        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+            f.write(data)
+        try:
+            self.assertEqual(probe_audio(f.name), info)
+        finally:
+            os.remove(f.name)
+
+        float_wav = bytearray(data)
+        struct.pack_into('<H', float_wav, 20, 3)
+        with self.assertRaises(ValueError):
+            probe_audio(float_wav)
+
+    def test_ogg(self):
+        data = _opus_stream(7, [b'x'] * 50, pre_skip=312, trim=100)
+        info = probe_audio(data)
+        self.assertEqual(info.encoding, 'oggopus')
+        self.assertEqual(info.channels, 1)
+        self.assertEqual(info.duration, (50 * 960 - 100 - 312) / 48000)
+        self.assertEqual((info.data_offset, info.data_size), (0, len(data)))
+
+        with self.assertRaises(ValueError):
+            probe_audio(b'not audio at all')
@@ -1,8 +1,28 @@
+import asyncio
+import importlib.util
+import io
 import os
 import pathlib
+import socket
+import struct
+import tempfile
+import threading
+import time
 import unittest
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs
 
-from speechkit import SpeechSynthesis, Session
+from speechkit import SpeechSynthesis, AsyncSpeechSynthesis, Session, SynthesisCache
+from speechkit._limiter import is_overloaded
+from speechkit._ogg import OggPage, concatenate_opus, iter_pages
+from speechkit._singleflight import SingleFlight, AsyncSingleFlight
+from speechkit._synthesis import _split_text, _split_ssml
+from speechkit._wav import HEADER_SIZE
+
+NUMPY_INSTALLED = importlib.util.find_spec('numpy') is not None
+AIOHTTP_INSTALLED = importlib.util.find_spec('aiohttp') is not None
 
 
 class SynthesizeAudio(unittest.TestCase):
@@ -44,3 +64,498 @@ class SynthesizeAudio(unittest.TestCase):
             sampleRateHertz='16000'
         )
         self.assertIsInstance(data, bytes)
+
+
+class LocalSynthesisServer:
+    """Local stand-in for synthesis API, responds with requested text encoded as audio"""
+
+    def __init__(self):
+        self.requests = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                form = {k: v[0] for k, v in parse_qs(body).items()}
+                server.requests.append(form)
+                data = form.get('text', form.get('ssml', '')).encode()
+                status = 200
+                if data == b'overloaded':
+                    status, data = 429, b'{"error_code": "RESOURCE_EXHAUSTED", "error_message": "overloaded"}'
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self.url = 'http://127.0.0.1:{}/synthesize'.format(self._httpd.server_address[1])
+
+    def __enter__(self):
+        self._thread.start()
+        self._patch = mock.patch('speechkit._synthesis.SYNTHESIS_URL', self.url)
+        self._patch.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._patch.stop()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class LocalSynthesizeAudio(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = LocalSynthesisServer().__enter__()
+        self.session = Session(Session.API_KEY, 'hello', None)
+        self.synthesize_audio = SpeechSynthesis(self.session)
+
+    def tearDown(self) -> None:
+        self.session.close()
+        self.server.__exit__(None, None, None)
+
+    def test_synthesize_chunks(self):
+        chunks = list(self.synthesize_audio.synthesize_chunks(chunk_size=4, text='0123456789'))
+        self.assertEqual(chunks, [b'0123', b'4567', b'89'])
+
+    def test_synthesize_to_writable(self):
+        buffer = io.BytesIO()
+        self.synthesize_audio.synthesize(buffer, text='text')
+        self.assertEqual(buffer.getvalue(), b'text')
+
+    def test_cache(self):
+        synthesize_audio = SpeechSynthesis(self.session, cache=SynthesisCache())
+        self.assertEqual(synthesize_audio.synthesize_stream(text='text'), b'text')
+        self.assertEqual(list(synthesize_audio.synthesize_chunks(chunk_size=3, text='text')), [b'tex', b't'])
+        self.assertEqual(list(synthesize_audio.synthesize_chunks(text='other')), [b'other'])
+        self.assertEqual(synthesize_audio.synthesize_stream(text='other', voice='oksana'), b'other')
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_synthesize_pipelined(self):
+        text = 'First sentence. Second sentence!\n\nThird one?'
+        audio = list(self.synthesize_audio.synthesize_pipelined(lookahead=1, text=text, format='lpcm'))
+        self.assertEqual(audio, [b'First sentence.', b'Second sentence!', b'Third one?'])
+        self.assertTrue(all(r['format'] == 'lpcm' for r in self.server.requests))
+
+        audio = list(self.synthesize_audio.synthesize_pipelined(text='One. Two.', format='wav', sampleRateHertz=8000))
+        self.assertEqual(audio[1:], [b'One.', b'Two.'])
+        with wave.open(io.BytesIO(b''.join(audio))) as f:
+            self.assertEqual((f.getframerate(), f.readframes(10)), (8000, b'One.Two.'))
+        self.assertEqual(self.server.requests[-1]['format'], 'lpcm')
+
+    def test_prefetch(self):
+        with self.assertRaises(RuntimeError):
+            self.synthesize_audio.prefetch(text='hint')
+
+        self.synthesize_audio.enable_prefetch(max_bytes=8, ttl=60)
+        self.synthesize_audio.prefetch(text='hint')
+        self.synthesize_audio.prefetch(text='hint')
+        while not self.server.requests:
+            time.sleep(0.01)
+        self.assertEqual(self.synthesize_audio.synthesize_stream(text='hint'), b'hint')
+        self.assertEqual(self.synthesize_audio.synthesize_stream(text='hint', voice='oksana'), b'hint')
+        self.assertEqual(self.synthesize_audio._prefetcher.hits, 2)
+        self.assertEqual(len(self.server.requests), 1)
+
+        self.synthesize_audio.prefetch(text='other')
+        while len(self.server.requests) < 2:
+            time.sleep(0.01)
+        self.assertEqual(self.synthesize_audio.synthesize_stream(text='other'), b'other')
+        self.assertEqual(self.synthesize_audio._prefetcher.evictions, 1)
+
+        self.synthesize_audio.prefetch(text='wav', format='wav')
+        while len(self.server.requests) < 3:
+            time.sleep(0.01)
+        self.assertEqual(self.synthesize_audio.synthesize_stream(text='wav', format='wav')[HEADER_SIZE:], b'wav')
+        self.assertEqual(self.server.requests[2]['format'], 'lpcm')
+        self.assertEqual(len(self.server.requests), 3)
+        self.synthesize_audio.disable_prefetch()
+
+    def test_synthesize_template(self):
+        template = 'Total is {amount:.1f} rubles'
+        data = self.synthesize_audio.synthesize_template(template, {'amount': 15}, crossfade_ms=0, format='lpcm')
+        self.assertEqual(data, b'Total is15.0rubles')
+        data = self.synthesize_audio.synthesize_template(template, {'amount': 20}, crossfade_ms=0, format='lpcm')
+        self.assertEqual(data, b'Total is20.0rubles')
+        self.assertEqual(sorted(r['text'] for r in self.server.requests), ['15.0', '20.0', 'Total is', 'rubles'])
+        with self.assertRaises(ValueError):
+            self.synthesize_audio.synthesize_template(template, {'amount': 1})
+        for template in ('Total is {} rubles', 'Total is {0} rubles', 'Total is {amount:{}} rubles'):
+            with self.assertRaises(ValueError):
+                self.synthesize_audio.synthesize_template(template, {'amount': 1}, format='lpcm')
+        data = self.synthesize_audio.synthesize_template('{a} plus {b}', {'a': 'xx', 'b': 'yy'}, crossfade_ms=0,
+                                                         max_workers=1, format='lpcm')
+        self.assertEqual(data, b'xxplusyy')
+
+    @unittest.skipUnless(NUMPY_INSTALLED, 'requires numpy')
+    def test_synthesize_array(self):
+        samples, sample_rate = self.synthesize_audio.synthesize_array(text='\x01\x00\x02\x00', sampleRateHertz=8000)
+        self.assertEqual(samples.tolist(), [1, 2])
+        self.assertEqual(sample_rate, 8000)
+        self.assertEqual(self.server.requests[0]['format'], 'lpcm')
+
+    def test_synthesize_wav(self):
+        buffer = io.BytesIO(b'prefix')
+        buffer.seek(0, io.SEEK_END)
+        self.synthesize_audio.synthesize(buffer, text='0123456789', format='wav', sampleRateHertz='16000')
+        self.assertEqual(buffer.getvalue()[:6], b'prefix')
+        with wave.open(io.BytesIO(buffer.getvalue()[6:])) as f:
+            self.assertEqual((f.getframerate(), f.getnchannels(), f.getsampwidth(), f.getnframes()), (16000, 1, 2, 5))
+            self.assertEqual(f.readframes(5), b'0123456789')
+        self.assertEqual(self.server.requests[0]['format'], 'lpcm')
+
+        class Pipe:
+            def __init__(self):
+                self.data = b''
+
+            def write(self, data):
+                self.data += data
+
+        pipe = Pipe()
+        self.synthesize_audio.synthesize(pipe, text='0123', format='wav')
+        self.assertEqual(pipe.data[40:], b'\xff\xff\xff\xff0123')
+
+        chunks = list(self.synthesize_audio.synthesize_chunks(text='0123', format='wav'))
+        self.assertEqual(b''.join(chunks), pipe.data)
+
+        data = self.synthesize_audio.synthesize_stream(text='0123', format='wav')
+        self.assertEqual(data[40:], b'\x04\x00\x00\x000123')
+
+    def test_synthesize_into(self):
+        buffer = bytearray(16)
+        self.assertEqual(self.synthesize_audio.synthesize_into(buffer, text='0123456789'), 10)
+        self.assertEqual(buffer[:10], b'0123456789')
+        self.assertEqual(self.synthesize_audio.synthesize_into(memoryview(buffer), text='x' * 16), 16)
+        with self.assertRaises(ValueError):
+            self.synthesize_audio.synthesize_into(buffer, text='x' * 17)
+
+        buffer = bytearray(64)
+        size = self.synthesize_audio.synthesize_into(buffer, text='0123', format='wav', sampleRateHertz=8000)
+        with wave.open(io.BytesIO(bytes(buffer[:size]))) as f:
+            self.assertEqual((f.getframerate(), f.readframes(10)), (8000, b'0123'))
+
+        read_fd, write_fd = os.pipe()
+        try:
+            self.assertEqual(self.synthesize_audio.synthesize_into(write_fd, text='pipe'), 4)
+            self.assertEqual(os.read(read_fd, 10), b'pipe')
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        left, right = socket.socketpair()
+        with left, right:
+            self.assertEqual(self.synthesize_audio.synthesize_into(left, text='socket'), 6)
+            self.assertEqual(right.recv(10), b'socket')
+
+        with self.assertRaises(TypeError):
+            self.synthesize_audio.synthesize_into(object(), text='text')
+
+        with tempfile.TemporaryFile() as f:
+            f.write(b'prefix')
+            self.assertEqual(self.synthesize_audio.synthesize_into(f, text='0123', format='wav'), HEADER_SIZE + 4)
+            os.lseek(f.fileno(), 0, os.SEEK_END)
+            self.synthesize_audio.synthesize_into(f.fileno(), text='4567', format='wav', sampleRateHertz=8000)
+            f.seek(0)
+            data = f.read()
+        self.assertEqual(data[:6], b'prefix')
+        first = data[6:6 + HEADER_SIZE + 4]
+        with wave.open(io.BytesIO(first)) as w:
+            self.assertEqual((w.getnframes(), w.readframes(10)), (2, b'0123'))
+        with wave.open(io.BytesIO(data[6 + len(first):])) as w:
+            self.assertEqual((w.getframerate(), w.getnframes(), w.readframes(10)), (8000, 2, b'4567'))
+
+        read_fd, write_fd = os.pipe()
+        try:
+            self.synthesize_audio.synthesize_into(write_fd, text='pipe', format='wav')
+            self.assertEqual(os.read(read_fd, 100)[40:], b'\xff\xff\xff\xffpipe')
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_synthesize_many(self):
+        requests = [{'text': str(i)} for i in range(20)] + [{'text': 'x' * 5001}]
+        results = list(self.synthesize_audio.synthesize_many(requests, max_workers=4))
+        self.assertEqual([r.index for r in results], list(range(21)))
+        self.assertEqual([r.data for r in results[:20]], [str(i).encode() for i in range(20)])
+        self.assertIsInstance(results[20].error, ValueError)
+
+        results = list(self.synthesize_audio.synthesize_many(iter(requests), max_workers=4, ordered=False))
+        self.assertEqual(sorted(r.index for r in results), list(range(21)))
+
+        error = next(self.synthesize_audio.synthesize_many([{'text': 'overloaded'}])).error
+        self.assertEqual(error.status_code, 429)
+        self.assertTrue(is_overloaded(error))
+
+    def test_synthesize_long_stream(self):
+        text = ' '.join('Sentence number {}.'.format(i) for i in range(100))
+        data = self.synthesize_audio.synthesize_long_stream(text=text, max_length=100, format='lpcm',
+                                                            max_workers=4)
+        pieces = _split_text(text, 100)
+        self.assertEqual(data.decode(), ''.join(pieces))
+        self.assertCountEqual([r['text'] for r in self.server.requests], pieces)
+        self.assertTrue(all(len(piece) <= 100 for piece in pieces))
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def test_coalesce(self):
+        release = threading.Event()
+        calls = []
+
+        def fetch(key, params):
+            calls.append(params)
+            release.wait(5)
+            return params['text'].encode()
+
+        synthesize_audio = SpeechSynthesis(Session(Session.API_KEY, 'hello', None), coalesce=True)
+        synthesize_audio._fetch = fetch
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(synthesize_audio.synthesize_stream(text='text')))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        while synthesize_audio._single_flight.coalesced < 9:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [b'text'] * 10)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(synthesize_audio.synthesize_stream(text='text'), b'text')
+        self.assertEqual(len(calls), 2)
+
+    def test_error(self):
+        flight = SingleFlight()
+        with self.assertRaises(KeyError):
+            flight.do('key', lambda: {}['missing'])
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+
+
+class AsyncSingleFlightTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_leader_cancelled(self):
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await release.wait()
+            return b'audio'
+
+        leader = asyncio.ensure_future(flight.do('key', fetch))
+        follower = asyncio.ensure_future(flight.do('key', fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await follower, b'audio')
+        self.assertTrue(leader.cancelled())
+        self.assertEqual((len(calls), flight.coalesced), (1, 1))
+
+    async def test_all_cancelled(self):
+        flight = AsyncSingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(flight.do('key', fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        self.assertEqual(flight._calls, {})
+
+        async def error():
+            raise KeyError('missing')
+
+        with self.assertRaises(KeyError):
+            await flight.do('key', error)
+
+
+class SplitTextTestCase(unittest.TestCase):
+    def test_split_text(self):
+        text = 'First sentence. Second one!\n\nNew paragraph. ' + 'word ' * 30
+        pieces = _split_text(text, 40)
+        self.assertEqual(pieces[:2], ['First sentence. Second one!', 'New paragraph.'])
+        self.assertTrue(all(len(piece) <= 40 for piece in pieces))
+        self.assertEqual(' '.join(pieces).split(), text.split())
+
+    def test_split_ssml(self):
+        ssml = '<speak><p><s>First sentence.</s><s>Second sentence is here.</s></p>' \
+               '<break time="1s"/> Tail text. More tail.</speak>'
+        self.assertEqual(_split_ssml(ssml, 60), [
+            '<speak><p><s>First sentence.</s></p></speak>',
+            '<speak><p><s>Second sentence is here.</s></p></speak>',
+            '<speak><break time="1s"/> Tail text. More tail.</speak>',
+        ])
+        self.assertEqual(len(_split_ssml(ssml)), 1)
+        with self.assertRaises(ValueError):
+            _split_ssml('no speak tag')
+
+
+def _opus_stream(serial, packets, pre_skip=312, trim=0):
+    """Builds Ogg Opus stream of 20 ms single frame packets, one packet per page"""
+
+    head = b'OpusHead' + struct.pack('<BBHIhB', 1, 1, pre_skip, 48000, 0, 0)
+    pages = [OggPage(0x02, 0, serial, 0, bytes([len(head)]), head),
+             OggPage(0, 0, serial, 1, bytes([8]), b'OpusTags')]
+    for i, payload in enumerate(packets):
+        packet = bytes([9 << 3]) + payload
+        pages.append(OggPage(0, (i + 1) * 960 - (trim if i == len(packets) - 1 else 0), serial, i + 2,
+                             bytes([len(packet)]), packet))
+    pages[-1].header_type |= 0x04
+    return b''.join(page.to_bytes() for page in pages)
+
+
+class ConcatenateOpusTestCase(unittest.TestCase):
+    def test_crc(self):
+        page = _opus_stream(1, [b'a'])[:47]
+        crc = 0
+        for byte in page[:22] + bytes(4) + page[26:]:
+            crc ^= byte << 24
+            for _ in range(8):
+                crc = ((crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1) & 0xFFFFFFFF
+        self.assertEqual(struct.unpack_from('<I', page, 22)[0], crc)
+
+    def test_concatenate(self):
+        data = concatenate_opus([_opus_stream(1, [b'a', b'b']), _opus_stream(2, [b'c', b'd', b'e'], trim=100)])
+        pages = list(iter_pages(data))
+        self.assertEqual([page.sequence for page in pages], list(range(7)))
+        self.assertEqual({page.serial for page in pages}, {1})
+        self.assertEqual([page.body[1:] for page in pages[2:]], [b'a', b'b', b'c', b'd', b'e'])
+        self.assertEqual([page.granule_position for page in pages[2:]], [960, 1920, 2880, 3840, 4700])
+        self.assertEqual([page.header_type for page in pages], [0x02, 0, 0, 0, 0, 0, 0x04])
+        self.assertEqual(concatenate_opus([data]), data)
+
+
+@unittest.skipUnless(AIOHTTP_INSTALLED, 'requires aiohttp')
+class AsyncSynthesizeAudio(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from aiohttp import web
+
+        async def synthesize(request):
+            form = await request.post()
+            if form.get('text') == 'error':
+                return web.json_response({'error_code': 'BAD_REQUEST', 'error_message': 'error'}, status=400)
+            return web.Response(body=form['text'].encode())
+
+        app = web.Application()
+        app.router.add_post('/synthesize', synthesize)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url_patch = mock.patch('speechkit._synthesis.SYNTHESIS_URL', 'http://127.0.0.1:{}/synthesize'.format(port))
+        self.url_patch.start()
+        self.session = Session(Session.API_KEY, 'hello', 'folder')
+
+    async def asyncTearDown(self):
+        self.url_patch.stop()
+        await self.session.aclose()
+        await self.runner.cleanup()
+
+    async def test_synthesize_stream(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        data = await synthesize_audio.synthesize_stream(text='text', format='lpcm')
+        self.assertEqual(data, b'text')
+
+    async def test_request_error(self):
+        from speechkit.exceptions import RequestError
+
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        with self.assertRaises(RequestError):
+            await synthesize_audio.synthesize_stream(text='error')
+
+    async def test_synthesize_many(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        requests = [{'text': 'a'}, {'text': 'error'}, {'text': 'b'}]
+        results = [r async for r in synthesize_audio.synthesize_many(requests, max_workers=2)]
+        self.assertEqual([r.data for r in results], [b'a', None, b'b'])
+        self.assertEqual(results[1].error.status_code, 400)
+
+    async def test_coalesce(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session, coalesce=True)
+        results = await asyncio.gather(*(synthesize_audio.synthesize_stream(text='text') for _ in range(5)))
+        self.assertEqual(results, [b'text'] * 5)
+        self.assertEqual(synthesize_audio._single_flight.coalesced, 4)
+
+    async def test_synthesize_chunks(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session, cache=SynthesisCache())
+        chunks = [c async for c in synthesize_audio.synthesize_chunks(chunk_size=4, text='0123456789')]
+        self.assertEqual(b''.join(chunks), b'0123456789')
+        self.assertTrue(all(len(c) <= 4 for c in chunks))
+        chunks = [c async for c in synthesize_audio.synthesize_chunks(chunk_size=4, text='0123456789')]
+        self.assertEqual(chunks, [b'0123', b'4567', b'89'])
+
+        chunks = [c async for c in synthesize_audio.synthesize_chunks(text='0123', format='wav')]
+        self.assertEqual(chunks[1:], [b'0123'])
+        self.assertEqual(len(chunks[0]), HEADER_SIZE)
+
+        from speechkit.exceptions import RequestError
+
+        with self.assertRaises(RequestError):
+            async for _ in synthesize_audio.synthesize_chunks(text='error'):
+                pass
+
+    async def test_synthesize_into(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        buffer = bytearray(64)
+        size = await synthesize_audio.synthesize_into(buffer, text='0123', format='wav', sampleRateHertz=8000)
+        with wave.open(io.BytesIO(bytes(buffer[:size]))) as f:
+            self.assertEqual((f.getframerate(), f.readframes(10)), (8000, b'0123'))
+        with self.assertRaises(ValueError):
+            await synthesize_audio.synthesize_into(bytearray(2), text='0123')
+
+        with tempfile.TemporaryFile() as f:
+            self.assertEqual(await synthesize_audio.synthesize_into(f, text='0123', format='wav'), HEADER_SIZE + 4)
+            f.seek(0)
+            with wave.open(io.BytesIO(f.read())) as w:
+                self.assertEqual((w.getnframes(), w.readframes(10)), (2, b'0123'))
+
+        buffer = io.BytesIO()
+        await synthesize_audio.synthesize(buffer, text='text')
+        self.assertEqual(buffer.getvalue(), b'text')
+
+    async def test_synthesize_template(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        data = await synthesize_audio.synthesize_template('{a} plus {b}', {'a': 'xx', 'b': 'yy'}, crossfade_ms=0,
+                                                          max_workers=1, format='lpcm')
+        self.assertEqual(data, b'xxplusyy')
+
+    async def test_prefetch(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        synthesize_audio.enable_prefetch()
+        synthesize_audio.prefetch(text='hint')
+        while not synthesize_audio._prefetcher._store:
+            await asyncio.sleep(0.01)
+        self.assertEqual(await synthesize_audio.synthesize_stream(text='hint'), b'hint')
+        self.assertEqual(synthesize_audio._prefetcher.hits, 1)
+        synthesize_audio.disable_prefetch()
+
+    async def test_synthesize_pipelined(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        audio = [a async for a in synthesize_audio.synthesize_pipelined(text='One. Two. Three.')]
+        self.assertEqual(audio, [b'One.', b'Two.', b'Three.'])
+        audio = [a async for a in synthesize_audio.synthesize_pipelined(text='One. Two.', format='wav')]
+        self.assertEqual(audio[1:], [b'One.', b'Two.'])
+        self.assertEqual(len(audio[0]), HEADER_SIZE)
+
+    async def test_synthesize_long_stream(self):
+        synthesize_audio = AsyncSpeechSynthesis(self.session)
+        text = ' '.join('Sentence number {}.'.format(i) for i in range(20))
+        data = await synthesize_audio.synthesize_long_stream(text=text, max_length=50, format='lpcm', max_workers=2)
+        self.assertEqual(data.decode(), ''.join(_split_text(text, 50)))
+
+        buffer = io.BytesIO()
+        await synthesize_audio.synthesize_long(buffer, text='A. B.', format='wav', max_length=3)
+        with wave.open(io.BytesIO(buffer.getvalue())) as f:
+            self.assertEqual(f.readframes(10), b'A.B.')
@@ -1,7 +1,9 @@
 import os
-from unittest import TestCase
+from unittest import TestCase, IsolatedAsyncioTestCase, mock
 
-from speechkit import Session, DataStreamingRecognition
+import grpc
+
+from speechkit import Session, DataStreamingRecognition, AsyncDataStreamingRecognition, ChannelPool
 from speechkit.auth import generate_jwt
 import speechkit
 
@@ -52,3 +54,164 @@ class DataStreamingRecognitionTestCase(TestCase):
     #
     # def test_recognize(self):
     #     self.fail()
+
+
+class ChannelPoolTestCase(TestCase):
+    def test_round_robin(self):
+        with ChannelPool(size=2, max_message_length=1024) as channel_pool:
+            first = channel_pool.get_stub()
+            second = channel_pool.get_stub()
+            self.assertIsNot(first, second)
+            self.assertIs(channel_pool.get_stub(), first)
+
+        with self.assertRaises(RuntimeError):
+            channel_pool.get_stub()
+
+    def test_own_pool(self):
+        session = Session(Session.API_KEY, 'hello', None)
+        shared_pool = ChannelPool()
+        with DataStreamingRecognition(session, channel_pool=shared_pool) as data_streaming_recognition:
+            self.assertIs(data_streaming_recognition._get_channel_pool(), shared_pool)
+        shared_pool.get_stub()
+        shared_pool.close()
+
+        with DataStreamingRecognition(session) as data_streaming_recognition:
+            own_pool = data_streaming_recognition._get_channel_pool()
+        with self.assertRaises(RuntimeError):
+            own_pool.get_stub()
+
+
+class FakeStreamingCall:
+    """Emits final result with one word for every `utterance_size` bytes of received audio"""
+
+    def __init__(self, requests, utterance_size, bytes_per_second):
+        self._requests = requests
+        self._utterance_size = utterance_size
+        self._bytes_per_second = bytes_per_second
+
+    def __iter__(self):
+        stt_service_pb2 = speechkit._recognition.yandex.cloud.ai.stt.v2.stt_service_pb2
+        received = 0
+        utterance_start = 0
+        for request in self._requests:
+            received += len(request.audio_content)
+            if received - utterance_start >= self._utterance_size:
+                response = stt_service_pb2.StreamingRecognitionResponse()
+                chunk = response.chunks.add(final=True, end_of_utterance=True)
+                word = chunk.alternatives.add(text='word').words.add(word='word')
+                word.start_time.FromNanoseconds(utterance_start * 10 ** 9 // self._bytes_per_second)
+                word.end_time.FromNanoseconds(received * 10 ** 9 // self._bytes_per_second)
+                utterance_start = received
+                yield response
+
+    def cancel(self):
+        pass
+
+    def code(self):
+        return grpc.StatusCode.OK
+
+
+class FakeChannelPool:
+    def __init__(self):
+        self.calls = 0
+
+    def get_stub(self):
+        return self
+
+    def StreamingRecognize(self, requests, metadata=None, timeout=None):
+        self.calls += 1
+        return FakeStreamingCall(requests, utterance_size=8000, bytes_per_second=16000)
+
+
+class RolloverTestCase(TestCase):
+    def test_assert_invalid_options(self):
+        session = Session(Session.API_KEY, 'hello', None)
+        with self.assertRaises(ValueError):
+            DataStreamingRecognition(session, audio_encoding='OGG_OPUS', rollover=True)
+
+        with self.assertRaises(ValueError):
+            DataStreamingRecognition(session, audio_encoding='LINEAR16_PCM', sample_rate_hertz=8000,
+                                     single_utterance=True, rollover=True)
+
+    def test_continuous_timestamps(self):
+        channel_pool = FakeChannelPool()
+        data_streaming_recognition = DataStreamingRecognition(
+            Session(Session.API_KEY, 'hello', None), audio_encoding='LINEAR16_PCM', sample_rate_hertz=8000,
+            channel_pool=channel_pool, rollover=True, rollover_after=1,
+        )
+
+        def gen_audio():
+            for _ in range(40):
+                yield bytes(1600)
+
+        end_times = []
+        for response in data_streaming_recognition.recognize_raw(gen_audio):
+            word = response.chunks[0].alternatives[0].words[0]
+            self.assertEqual(word.start_time.ToNanoseconds(), end_times[-1] if end_times else 0)
+            end_times.append(word.end_time.ToNanoseconds())
+
+        self.assertGreater(channel_pool.calls, 1)
+        self.assertEqual(end_times[-1], 4 * 10 ** 9)
+
+
+class AsyncDataStreamingRecognitionTestCase(IsolatedAsyncioTestCase):
+    async def test__gen(self):
+        async def gen_audio():
+            yield b'audio'
+
+        data_streaming_recognition = AsyncDataStreamingRecognition(
+            Session(Session.API_KEY, 'hello', None),
+            language_code='ru-RU',
+            audio_encoding='LINEAR16_PCM',
+            sample_rate_hertz=8000,
+        )
+        requests = [request async for request in data_streaming_recognition._gen(gen_audio())]
+        self.assertEqual(requests[0].config.specification.sample_rate_hertz, 8000)
+        self.assertEqual(requests[1].audio_content, b'audio')
+
+    async def test_assert_sync_iterator(self):
+        data_streaming_recognition = AsyncDataStreamingRecognition(Session(Session.API_KEY, 'hello', None))
+        with self.assertRaises(RuntimeError):
+            async for _ in data_streaming_recognition.recognize_raw([b'audio']):
+                pass
+
+    async def test_cancel_on_early_exit(self):
+        class FakeAsyncCall:
+            cancelled = False
+
+            async def __aiter__(self):
+                for _ in range(10):
+                    yield 'response'
+
+            def cancel(self):
+                self.cancelled = True
+
+        call = FakeAsyncCall()
+        data_streaming_recognition = AsyncDataStreamingRecognition(Session(Session.API_KEY, 'hello', None))
+        data_streaming_recognition._stub = mock.Mock(**{'StreamingRecognize.return_value': call})
+
+        async def gen_audio():
+            yield b'audio'
+
+        responses = data_streaming_recognition.recognize_raw(gen_audio())
+        async for _ in responses:
+            break
+        await responses.aclose()
+        self.assertTrue(call.cancelled)
+
+    async def test_channel_options(self):
+        session = Session(Session.API_KEY, 'hello', None)
+        with self.assertRaises(ValueError):
+            AsyncDataStreamingRecognition(session, channel_pool=ChannelPool())
+
+        data_streaming_recognition = AsyncDataStreamingRecognition(session, keepalive_time_ms=30000,
+                                                                   max_message_length=1024)
+        with self.assertRaises(TypeError):
+            with data_streaming_recognition:
+                pass
+
+        with mock.patch('grpc.aio.secure_channel') as secure_channel:
+            data_streaming_recognition._get_stub()
+        options = dict(secure_channel.call_args[0][2])
+        self.assertEqual(options['grpc.keepalive_time_ms'], 30000)
+        self.assertEqual(options['grpc.max_receive_message_length'], 1024)